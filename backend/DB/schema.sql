@@ -40,6 +40,44 @@ create table if not exists public.account_deletion_requests (
 create index if not exists account_deletion_requests_user_id_idx on public.account_deletion_requests(user_id);
 create index if not exists account_deletion_requests_scheduled_idx on public.account_deletion_requests(scheduled_for);
 
+-- profile bundle: auth user, profile row and active deletion request in one round trip
+create or replace function public.get_profile_bundle(p_user_id uuid)
+returns jsonb
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select jsonb_build_object(
+    'user', (
+      select jsonb_build_object(
+        'id', u.id,
+        'email', u.email,
+        'created_at', u.created_at,
+        'last_sign_in_at', u.last_sign_in_at,
+        'user_metadata', u.raw_user_meta_data,
+        'app_metadata', u.raw_app_meta_data
+      )
+      from auth.users u
+      where u.id = p_user_id
+    ),
+    'profile', (
+      select to_jsonb(p) from public.profiles p where p.id = p_user_id
+    ),
+    'deletion_request', (
+      select to_jsonb(d)
+      from public.account_deletion_requests d
+      where d.user_id = p_user_id
+        and d.cancelled_at is null
+        and d.completed_at is null
+      order by d.scheduled_for asc
+      limit 1
+    )
+  );
+$$;
+revoke all on function public.get_profile_bundle(uuid) from public, anon, authenticated;
+grant execute on function public.get_profile_bundle(uuid) to service_role;
+
 -- onboarding questionnaire responses
 create table if not exists public.onboarding_responses (
   id uuid primary key default gen_random_uuid(),
@@ -93,6 +131,8 @@ create table if not exists public.scraped_content (
 );
 create index if not exists scraped_content_user_id_idx on public.scraped_content(user_id);
 create index if not exists scraped_content_url_idx on public.scraped_content(url);
+-- serves keyset pagination (user_id, created_at desc, id desc)
+create index if not exists scraped_content_user_created_idx on public.scraped_content(user_id, created_at desc, id desc);
 
 drop trigger if exists set_updated_at_scraped_content on public.scraped_content;
 create trigger set_updated_at_scraped_content
@@ -114,6 +154,8 @@ create table if not exists public.podcast_scripts (
 );
 create index if not exists podcast_scripts_user_id_idx on public.podcast_scripts(user_id);
 create index if not exists podcast_scripts_source_idx on public.podcast_scripts(source_content_id);
+-- serves keyset pagination (user_id, created_at desc, id desc)
+create index if not exists podcast_scripts_user_created_idx on public.podcast_scripts(user_id, created_at desc, id desc);
 
 drop trigger if exists set_updated_at_podcast_scripts on public.podcast_scripts;
 create trigger set_updated_at_podcast_scripts
@@ -134,6 +176,8 @@ create table if not exists public.generated_podcasts (
 );
 create index if not exists generated_podcasts_user_id_idx on public.generated_podcasts(user_id);
 create index if not exists generated_podcasts_script_id_idx on public.generated_podcasts(script_id);
+-- serves keyset pagination (user_id, created_at desc, id desc)
+create index if not exists generated_podcasts_user_created_idx on public.generated_podcasts(user_id, created_at desc, id desc);
 
 drop trigger if exists set_updated_at_generated_podcasts on public.generated_podcasts;
 create trigger set_updated_at_generated_podcasts
@@ -152,16 +196,157 @@ create table if not exists public.processing_jobs (
   created_at timestamptz not null default timezone('utc', now()),
   updated_at timestamptz not null default timezone('utc', now()),
   started_at timestamptz,
-  finished_at timestamptz
+  finished_at timestamptz,
+  leased_by text,
+  lease_expires_at timestamptz,
+  attempts integer not null default 0,
+  tier text not null default 'standard',
+  priority smallint not null default 100,
+  progress jsonb,
+  idempotency_key text,
+  fingerprint text,
+  next_run_at timestamptz
 );
+alter table public.processing_jobs add column if not exists leased_by text;
+alter table public.processing_jobs add column if not exists lease_expires_at timestamptz;
+alter table public.processing_jobs add column if not exists attempts integer not null default 0;
+alter table public.processing_jobs add column if not exists tier text not null default 'standard';
+alter table public.processing_jobs add column if not exists priority smallint not null default 100;
+alter table public.processing_jobs add column if not exists progress jsonb;
+alter table public.processing_jobs add column if not exists idempotency_key text;
+alter table public.processing_jobs add column if not exists fingerprint text;
+alter table public.processing_jobs add column if not exists next_run_at timestamptz;
 create index if not exists processing_jobs_user_id_idx on public.processing_jobs(user_id);
 create index if not exists processing_jobs_status_idx on public.processing_jobs(status);
+-- serves keyset pagination (user_id, created_at desc, id desc)
+create index if not exists processing_jobs_user_created_idx on public.processing_jobs(user_id, created_at desc, id desc);
+-- a retried POST /jobs with the same Idempotency-Key maps to the same job
+create unique index if not exists processing_jobs_idempotency_key_idx on public.processing_jobs(user_id, idempotency_key)
+  where idempotency_key is not null;
+-- serves result reuse: the user's latest job with the same (job_type, payload, handler version)
+create index if not exists processing_jobs_fingerprint_idx on public.processing_jobs(user_id, fingerprint, created_at desc)
+  where fingerprint is not null;
+
+-- serves claim_processing_jobs: queued work and leases that may have expired
+create index if not exists processing_jobs_claimable_idx on public.processing_jobs(created_at)
+  where status in ('queued', 'running');
 
 drop trigger if exists set_updated_at_processing_jobs on public.processing_jobs;
 create trigger set_updated_at_processing_jobs
 before update on public.processing_jobs
 for each row execute procedure public.set_updated_at();
 
+-- durable job queue: workers lease jobs, extend the lease while running, and pick up
+-- jobs whose lease expired (the worker died). SKIP LOCKED lets workers on any number
+-- of nodes claim concurrently without blocking on each other. Claims are fair across
+-- users: by priority, then by the job's position in its user's backlog divided by the
+-- user's tier weight. A queued job waiting out a retry backoff is skipped until next_run_at.
+-- p_type_limits caps how many jobs of a type one call may lease ({"audio_render": 2}).
+drop function if exists public.claim_processing_jobs(text, text[], integer, integer);
+drop function if exists public.claim_processing_jobs(text, text[], integer, integer, jsonb);
+create or replace function public.claim_processing_jobs(
+  p_worker_id text,
+  p_job_types text[],
+  p_limit integer,
+  p_lease_seconds integer,
+  p_tier_weights jsonb default '{}'::jsonb,
+  p_type_limits jsonb default '{}'::jsonb
+)
+returns setof public.processing_jobs
+language sql
+volatile
+security definer
+set search_path = public
+as $$
+  update public.processing_jobs as jobs
+     set status = 'running',
+         leased_by = p_worker_id,
+         lease_expires_at = now() + make_interval(secs => p_lease_seconds),
+         started_at = coalesce(jobs.started_at, now()),
+         attempts = jobs.attempts + 1
+   where jobs.id in (
+     with ranked as (
+       select candidate.id,
+              candidate.job_type,
+              candidate.priority,
+              candidate.created_at,
+              row_number() over (partition by candidate.user_id order by candidate.created_at)
+                / coalesce((p_tier_weights ->> candidate.tier)::numeric, 1) as fair_rank
+         from public.processing_jobs candidate
+        where candidate.job_type = any(p_job_types)
+          and (
+            (candidate.status = 'queued' and (candidate.next_run_at is null or candidate.next_run_at <= now()))
+            or (candidate.status = 'running' and candidate.lease_expires_at < now())
+          )
+     ),
+     capped as (
+       select ranked.*,
+              row_number() over (partition by ranked.job_type order by ranked.priority, ranked.fair_rank, ranked.created_at)
+                as type_rank
+         from ranked
+     )
+     select locked.id
+       from public.processing_jobs locked
+       join capped on capped.id = locked.id
+      where capped.type_rank <= coalesce((p_type_limits ->> capped.job_type)::integer, p_limit)
+      order by capped.priority, capped.fair_rank, capped.created_at
+      limit p_limit
+      for update of locked skip locked
+   )
+  returning jobs.*;
+$$;
+
+-- extends the leases a worker still holds; returns the ids it still owns
+create or replace function public.heartbeat_processing_jobs(
+  p_worker_id text,
+  p_job_ids text[],
+  p_lease_seconds integer
+)
+returns setof text
+language sql
+volatile
+security definer
+set search_path = public
+as $$
+  update public.processing_jobs
+     set lease_expires_at = now() + make_interval(secs => p_lease_seconds)
+   where id = any(p_job_ids)
+     and leased_by = p_worker_id
+     and status = 'running'
+  returning id;
+$$;
+
+-- applies a batch of coalesced status writes in one statement. p_updates is an array of
+-- {"id": ..., "changes": {...}, "leased_by": ...}; keys missing from "changes" keep their
+-- value, and when "leased_by" is given the row is only updated while that worker holds
+-- the lease. Returns the ids that were updated.
+create or replace function public.update_processing_jobs(p_updates jsonb)
+returns setof text
+language sql
+volatile
+security definer
+set search_path = public
+as $$
+  update public.processing_jobs as jobs
+     set (status, error, result, progress, started_at, finished_at, leased_by, lease_expires_at,
+          attempts, next_run_at) = (
+           select merged.status, merged.error, merged.result, merged.progress,
+                  merged.started_at, merged.finished_at, merged.leased_by, merged.lease_expires_at,
+                  merged.attempts, merged.next_run_at
+             from jsonb_populate_record(jobs, item -> 'changes') as merged
+         )
+    from jsonb_array_elements(p_updates) as updates(item)
+   where jobs.id = item ->> 'id'
+     and (not item ? 'leased_by' or jobs.leased_by = item ->> 'leased_by')
+  returning jobs.id;
+$$;
+revoke all on function public.claim_processing_jobs(text, text[], integer, integer, jsonb, jsonb) from public, anon, authenticated;
+revoke all on function public.heartbeat_processing_jobs(text, text[], integer) from public, anon, authenticated;
+revoke all on function public.update_processing_jobs(jsonb) from public, anon, authenticated;
+grant execute on function public.claim_processing_jobs(text, text[], integer, integer, jsonb, jsonb) to service_role;
+grant execute on function public.heartbeat_processing_jobs(text, text[], integer) to service_role;
+grant execute on function public.update_processing_jobs(jsonb) to service_role;
+
 -- usage events
 create table if not exists public.usage_events (
   id uuid primary key default gen_random_uuid(),
@@ -1,9 +1,13 @@
 """Reusable FastAPI dependencies."""
+import secrets
+from typing import Optional
+
 from fastapi import Depends, Header, HTTPException, status
 
 from ..core.config import Settings, get_settings
 from ..core.database import SupabaseAsyncClient, get_supabase_client
-from ..services.auth_service import AuthService
+from ..core.security import get_token_verifier
+from ..services.auth_service import AuthService, get_profile_cache
 
 
 async def get_settings_dep() -> Settings:
@@ -18,7 +22,7 @@ def get_auth_service(
     settings: Settings = Depends(get_settings_dep),
     client: SupabaseAsyncClient = Depends(get_supabase_client_dep),
 ) -> AuthService:
-    return AuthService(client, settings)
+    return AuthService(client, settings, get_token_verifier(), get_profile_cache())
 
 
 async def get_current_user(
@@ -30,3 +34,18 @@ async def get_current_user(
     token = authorization.split(" ", 1)[1]
     result = await auth_service.verify_access_token(token)
     return result.user
+
+
+async def require_metrics_token(
+    authorization: Optional[str] = Header(None, alias="Authorization"),
+    settings: Settings = Depends(get_settings_dep),
+) -> None:
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.metrics_token}"
+    if authorization is None or not secrets.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
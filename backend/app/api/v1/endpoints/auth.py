@@ -83,5 +83,7 @@ async def sign_out(
     authorization: str = Header(..., alias="Authorization"),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> None:
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token")
     token = authorization.split(" ", 1)[1]
     await auth_service.sign_out(token)
@@ -1,8 +1,16 @@
 """Content ingestion endpoints."""
+from typing import Optional, Union
+
 from fastapi import APIRouter, Depends, Query, status
 
 from ....schemas.auth import UserProfile
-from ....schemas.content import ScrapedContentCreate, ScrapedContentList, ScrapedContentResponse
+from ....schemas.common import CountMode, ListView
+from ....schemas.content import (
+    ScrapedContentCreate,
+    ScrapedContentList,
+    ScrapedContentResponse,
+    ScrapedContentSummaryList,
+)
 from ...deps import get_current_user, get_supabase_client_dep
 from ....services.content_service import ContentService
 
@@ -22,14 +30,19 @@ async def create_content(
     return await service.create_scraped_content(current_user.id, payload)
 
 
-@router.get("", response_model=ScrapedContentList)
+@router.get("", response_model=Union[ScrapedContentList, ScrapedContentSummaryList])
 async def list_content(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="How Postgres computes the total: exact, planned or estimated"),
+    view: ListView = Query("full", description="summary omits large fields such as bodies and payloads"),
     current_user: UserProfile = Depends(get_current_user),
     service: ContentService = Depends(get_content_service),
-) -> ScrapedContentList:
-    return await service.list_scraped_content(current_user.id, limit=limit, offset=offset)
+) -> Union[ScrapedContentList, ScrapedContentSummaryList]:
+    return await service.list_scraped_content(
+        current_user.id, limit=limit, offset=offset, cursor=cursor, count=count, view=view
+    )
 
 
 @router.get("/{content_id}", response_model=ScrapedContentResponse)
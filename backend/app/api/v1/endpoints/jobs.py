@@ -1,17 +1,37 @@
 """Job orchestration endpoints."""
-from typing import List
+import asyncio
+import contextlib
+from typing import AsyncIterator, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from starlette.requests import HTTPConnection
 
+from ....core.config import Settings
 from ....schemas.auth import UserProfile
-from ....schemas.jobs import JobCreate, JobStatus
-from ...deps import get_current_user
-from ....services.jobs import JobManager
+from ....schemas.common import CountMode, ListView
+from ....schemas.jobs import JobCreate, JobEvent, JobStatus, JobSummary
+from ....services.auth_service import AuthService
+from ....utils.pagination import set_page_headers
+from ...deps import get_auth_service, get_current_user, get_settings_dep
+from ....services.jobs import IdempotencyKeyReusedError, JobManager, JobQueueFullError
+from ....services.jobs.events import TERMINAL_STATUSES, Subscription, status_event
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-def get_job_manager(request: Request) -> JobManager:
+def get_job_manager(request: HTTPConnection) -> JobManager:
     job_manager = getattr(request.app.state, "job_manager", None)
     if job_manager is None:
         raise RuntimeError("Job manager not configured")
@@ -21,23 +41,47 @@ def get_job_manager(request: Request) -> JobManager:
 @router.post("", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def enqueue_job(
     payload: JobCreate,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key; retries with the same key return the original job",
+    ),
     current_user: UserProfile = Depends(get_current_user),
     manager: JobManager = Depends(get_job_manager),
 ) -> JobStatus:
     try:
-        return await manager.enqueue_job(current_user.id, payload)
+        return await manager.enqueue_job(
+            current_user.id, payload, tier=current_user.plan, idempotency_key=idempotency_key
+        )
+    except IdempotencyKeyReusedError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    except JobQueueFullError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(exc),
+            headers={"Retry-After": str(int(exc.retry_after_seconds))},
+        ) from exc
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
-@router.get("", response_model=List[JobStatus])
+@router.get("", response_model=Union[List[JobStatus], List[JobSummary]])
 async def list_jobs(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="How Postgres computes the total: exact, planned or estimated"),
+    view: ListView = Query("full", description="summary omits large fields such as bodies and payloads"),
     current_user: UserProfile = Depends(get_current_user),
     manager: JobManager = Depends(get_job_manager),
-) -> List[JobStatus]:
-    return await manager.list_jobs(current_user.id, limit=limit, offset=offset)
+) -> Union[List[JobStatus], List[JobSummary]]:
+    page = await manager.list_jobs(
+        current_user.id, limit=limit, offset=offset, cursor=cursor, count=count, view=view
+    )
+    set_page_headers(response, page)
+    return page.items
 
 
 @router.get("/{job_id}", response_model=JobStatus)
@@ -50,3 +94,123 @@ async def get_job(
         return await manager.get_job(current_user.id, job_id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+@router.post("/{job_id}/cancel", response_model=JobStatus)
+@router.delete("/{job_id}", response_model=JobStatus)
+async def cancel_job(
+    job_id: str,
+    current_user: UserProfile = Depends(get_current_user),
+    manager: JobManager = Depends(get_job_manager),
+) -> JobStatus:
+    """Stop a queued or running job; a job that already finished is returned as is."""
+
+    try:
+        return await manager.cancel_job(current_user.id, job_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+def _sse(event: JobEvent) -> str:
+    return f"event: {event.event}\ndata: {event.model_dump_json()}\n\n"
+
+
+async def _job_event_stream(
+    request: Request, manager: JobManager, subscription: Subscription, job: JobStatus, keepalive: float
+) -> AsyncIterator[str]:
+    last_status = job.status
+    try:
+        yield _sse(status_event(job))
+        if job.status in TERMINAL_STATUSES:
+            return
+        while True:
+            event = await subscription.get(keepalive)
+            if event is None:
+                if await request.is_disconnected():
+                    return
+                # The job may be running in another worker, whose events never reach this process.
+                job = await manager.get_job(subscription.user_id, job.id)
+                if job.status != last_status:
+                    last_status = job.status
+                    yield _sse(status_event(job))
+                    if job.status in TERMINAL_STATUSES:
+                        return
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event)
+            if event.event == "status":
+                last_status = event.status or last_status
+                if last_status in TERMINAL_STATUSES:
+                    return
+    finally:
+        manager.events.close(subscription)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse)
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    current_user: UserProfile = Depends(get_current_user),
+    manager: JobManager = Depends(get_job_manager),
+    settings: Settings = Depends(get_settings_dep),
+) -> StreamingResponse:
+    """Server-Sent Events: the job's current status, then progress and status changes until it finishes."""
+
+    # Subscribe before reading the row so no transition between the two is missed.
+    subscription = manager.events.open(current_user.id, job_id)
+    try:
+        job = await manager.get_job(current_user.id, job_id)
+    except ValueError as exc:
+        manager.events.close(subscription)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except BaseException:
+        manager.events.close(subscription)
+        raise
+    return StreamingResponse(
+        _job_event_stream(request, manager, subscription, job, settings.job_events_keepalive_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def job_events_socket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot set headers"),
+    auth_service: AuthService = Depends(get_auth_service),
+    manager: JobManager = Depends(get_job_manager),
+    settings: Settings = Depends(get_settings_dep),
+) -> None:
+    """Push status and progress events for all of the caller's jobs as JSON messages."""
+
+    authorization = websocket.headers.get("authorization", "")
+    if token is None and authorization.startswith("Bearer "):
+        token = authorization.split(" ", 1)[1]
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token")
+        user = (await auth_service.verify_access_token(token)).user
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    with manager.events.subscribe(user.id) as subscription:
+        # Incoming messages are ignored; reading them is how a disconnect is noticed.
+        receiver = asyncio.create_task(_drain(websocket))
+        try:
+            while not receiver.done():
+                event = await subscription.get(settings.job_events_keepalive_seconds)
+                if event is not None:
+                    await websocket.send_text(event.model_dump_json())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+            with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect):
+                await receiver
+
+
+async def _drain(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
@@ -1,10 +1,12 @@
 """Endpoints for generated podcasts."""
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 
 from ....schemas.auth import UserProfile
+from ....schemas.common import CountMode
 from ....schemas.podcasts import PodcastCreate, PodcastDetailResponse, PodcastResponse
+from ....utils.pagination import set_page_headers
 from ...deps import get_current_user, get_settings_dep, get_supabase_client_dep
 from ....services.podcast_service import PodcastService
 from ....services.storage_service import StorageService
@@ -31,12 +33,17 @@ async def create_podcast(
 
 @router.get("", response_model=List[PodcastResponse])
 async def list_podcasts(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="How Postgres computes the total: exact, planned or estimated"),
     current_user: UserProfile = Depends(get_current_user),
     service: PodcastService = Depends(get_podcast_service),
 ) -> List[PodcastResponse]:
-    return await service.list_podcasts(current_user.id, limit=limit, offset=offset)
+    page = await service.list_podcasts(current_user.id, limit=limit, offset=offset, cursor=cursor, count=count)
+    set_page_headers(response, page)
+    return page.items
 
 
 @router.get("/{podcast_id}", response_model=PodcastResponse)
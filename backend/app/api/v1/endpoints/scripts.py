@@ -1,10 +1,12 @@
 """Endpoints for managing podcast scripts."""
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
 
 from ....schemas.auth import UserProfile
-from ....schemas.scripts import ScriptCreate, ScriptResponse
+from ....schemas.common import CountMode, ListView
+from ....schemas.scripts import ScriptCreate, ScriptResponse, ScriptSummary
+from ....utils.pagination import set_page_headers
 from ...deps import get_current_user, get_supabase_client_dep
 from ....services.script_service import ScriptService
 
@@ -24,14 +26,22 @@ async def create_script(
     return await service.create_script(current_user.id, payload)
 
 
-@router.get("", response_model=List[ScriptResponse])
+@router.get("", response_model=Union[List[ScriptResponse], List[ScriptSummary]])
 async def list_scripts(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; overrides offset"),
+    count: CountMode = Query("exact", description="How Postgres computes the total: exact, planned or estimated"),
+    view: ListView = Query("full", description="summary omits large fields such as bodies and payloads"),
     current_user: UserProfile = Depends(get_current_user),
     service: ScriptService = Depends(get_script_service),
-) -> List[ScriptResponse]:
-    return await service.list_scripts(current_user.id, limit=limit, offset=offset)
+) -> Union[List[ScriptResponse], List[ScriptSummary]]:
+    page = await service.list_scripts(
+        current_user.id, limit=limit, offset=offset, cursor=cursor, count=count, view=view
+    )
+    set_page_headers(response, page)
+    return page.items
 
 
 @router.get("/{script_id}", response_model=ScriptResponse)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 from pydantic import AnyHttpUrl, field_validator
@@ -32,7 +33,26 @@ class Settings(BaseSettings):
 
     jwt_secret: str
     jwt_algorithm: str = "HS256"
+    jwt_audience: str = "authenticated"
+    # "local" validates access tokens in-process and only asks Supabase when that is
+    # inconclusive; "remote" always calls Supabase Auth's /user endpoint.
+    auth_token_verification: str = "local"
+    jwks_cache_ttl_seconds: float = 600.0
+    # Supabase's JWT expiry; revocations from sign-out are never kept longer than this.
+    jwt_access_token_lifetime_seconds: int = 3600
+    profile_cache_max_entries: int = 10_000
+    profile_cache_ttl_seconds: float = 60.0
+    # Hydrate profiles through the get_profile_bundle RPC (see DB/schema.sql).
+    auth_profile_bundle_rpc: bool = True
+    # Wall-clock budget per read-only auth flow; a flow that overruns fails with 504.
+    auth_flow_budgets_seconds: Dict[str, float] = {
+        "sign_in": 5.0,
+        "verify_token": 3.0,
+        "profile": 5.0,
+    }
     api_rate_limit_per_minute: int = 120
+    # Bearer token for GET /metrics; the endpoint answers 404 while this is unset.
+    metrics_token: Optional[str] = None
 
     environment: str = "local"
     backend_base_url: AnyHttpUrl | None = None
@@ -53,7 +73,102 @@ class Settings(BaseSettings):
     # Development Environment Configuration
     app_environment: str = "development"
     api_timeout_seconds: int = 30
+
+    # Supabase HTTP connection pool (shared by the REST, Auth and Storage clients)
+    supabase_http_max_connections: int = 100
+    supabase_http_max_keepalive_connections: int = 20
+    supabase_http_keepalive_expiry_seconds: float = 30.0
+    supabase_http2: bool = False
+    supabase_connect_timeout_seconds: float = 5.0
+    supabase_pool_timeout_seconds: float = 10.0
+
+    # Supabase retries (attempts beyond the first are capped by max_retries) and circuit breaker
+    supabase_retry_backoff_seconds: float = 0.2
+    supabase_retry_max_backoff_seconds: float = 5.0
+    supabase_circuit_failure_threshold: int = 5
+    supabase_circuit_reset_seconds: float = 30.0
+    # Share one upstream request between identical concurrent PostgREST reads.
+    supabase_coalesce_reads: bool = True
+    # Bulk insert/upsert chunking and parallelism
+    supabase_bulk_chunk_rows: int = 500
+    supabase_bulk_chunk_bytes: int = 1_000_000
+    supabase_bulk_concurrency: int = 4
     max_retries: int = 3
+
+    # Background jobs. "inline" runs each job as a task in the API process that
+    # enqueued it; "durable" leaves it in processing_jobs for any worker to lease.
+    job_queue_mode: str = "inline"
+    # Whether this process leases and runs jobs in durable mode (disable on API-only replicas).
+    job_worker_enabled: bool = True
+    job_max_concurrency: int = 10
+    # Per job type caps below job_max_concurrency, e.g. {"audio_render": 4}.
+    job_type_concurrency: Dict[str, int] = {"audio_render": 4}
+    # Jobs allowed to wait for a slot (durable mode: queued rows in processing_jobs)
+    # before POST /jobs answers 429.
+    job_max_pending: int = 1000
+    # Interleave users' pending jobs (deficit round-robin) instead of plain FIFO.
+    job_fair_scheduling: bool = True
+    # Priority class per job type; lower values start first (default 100).
+    job_type_priority: Dict[str, int] = {"script_generation": 50}
+    # Jobs a user may start per scheduling round, by tier.
+    job_tier_weights: Dict[str, float] = {"free": 1.0, "standard": 1.0, "pro": 2.0}
+    # Executors for handlers registered with executor="thread" / "process".
+    job_thread_workers: int = 4
+    job_process_workers: int = 2
+    # Upper bound on the pickled (handler, job) sent to, and result returned from, a worker process.
+    job_process_max_payload_bytes: int = 8_000_000
+    job_process_start_method: str = "spawn"
+    # Events buffered per SSE/WebSocket subscriber before the oldest are dropped.
+    job_events_queue_size: int = 100
+    # Idle SSE/WebSocket streams send a keep-alive and re-check the job table this often.
+    job_events_keepalive_seconds: float = 15.0
+    # Write-behind buffer for job status/progress: non-terminal updates are merged per job and
+    # written every job_status_flush_seconds (0 = next loop iteration); outcomes are written at once.
+    job_status_flush_seconds: float = 1.0
+    job_status_batch_size: int = 200
+    # How long an identical script_generation job (same payload) reuses an earlier result.
+    job_result_cache_ttl_seconds: float = 86_400.0
+    # Deadline per job type in seconds (handlers may override); past it the job is
+    # stopped and marked timed_out. None disables the default deadline.
+    job_type_timeouts: Dict[str, float] = {"script_generation": 600.0}
+    job_default_timeout_seconds: Optional[float] = 3600.0
+    # Transient failures (provider 429/5xx, connection errors, RetryableJobError) run again
+    # after jittered exponential backoff, up to job_max_attempts runs in total (handlers may
+    # override); a job still failing then ends as dead_letter.
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: float = 5.0
+    job_retry_max_backoff_seconds: float = 300.0
+    # Server-side audio rendering (audio_render jobs). "gemini" uses gemini_api_key;
+    # "fake" synthesizes placeholder audio without network access.
+    tts_provider: str = "gemini"
+    tts_gemini_model: str = "gemini-2.5-flash-preview-tts"
+    # Characters of script text per provider request, and requests in flight per job.
+    tts_max_chunk_chars: int = 6000
+    tts_concurrency: int = 4
+    tts_request_timeout_seconds: float = 300.0
+    # Cache of synthesized speech per speaker turn, so re-rendering an edited script only
+    # pays for changed lines: a local LRU directory (max_bytes 0 disables it; default dir
+    # is under the system temp dir) and optionally objects in the audio bucket shared by all nodes.
+    # Off by default: while it is on every turn is its own provider request instead of being
+    # packed into tts_max_chunk_chars, which only pays off when scripts are re-rendered often.
+    tts_cache_dir: Optional[str] = None
+    tts_cache_max_bytes: int = 0
+    tts_cache_storage: bool = False
+    # Post-processing of rendered chunks: level each to a target RMS over its speech,
+    # trim silence quieter than the threshold and crossfade chunk boundaries.
+    tts_postprocess: bool = True
+    tts_target_dbfs: float = -20.0
+    tts_silence_threshold_dbfs: float = -50.0
+    tts_crossfade_ms: int = 20
+    # Format podcasts are stored in: "mp3" or "opus" (encoded with lameenc or ffmpeg in
+    # audio_encode_workers processes) or "wav". Bitrate None picks 64 kbps MP3 / 32 kbps Opus.
+    audio_format: str = "mp3"
+    audio_bitrate_kbps: Optional[int] = None
+    audio_encode_workers: int = 2
+    audio_ffmpeg_path: Optional[str] = None
+    job_lease_seconds: float = 60.0
+    job_heartbeat_seconds: float = 20.0
+    job_poll_interval_seconds: float = 2.0
     debug_mode: bool = False
 
     @field_validator("supabase_anon_key", "supabase_service_role_key")
@@ -2,29 +2,212 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import json
 from asyncio import AbstractEventLoop
 from contextlib import suppress
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 
 import httpx
 
 from .config import Settings, get_settings
+from .logging import get_logger
+from .resilience import (
+    IDEMPOTENT_METHODS,
+    RETRYABLE_STATUS_CODES,
+    UNSENT_REQUEST_ERRORS,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    RetryPolicy,
+)
+
+logger = get_logger(__name__)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body wrapper that reports when the connection is handed back."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that tracks connection pool saturation.
+
+    A request counts as in flight from the moment it is handed to the pool until its
+    response body is closed, i.e. for as long as it occupies (or waits for) a
+    connection.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limits: httpx.Limits, http2: bool) -> None:
+        self._transport = transport
+        self._limits = limits
+        self._http2 = http2
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.pool_timeouts = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.requests_total += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as exc:
+            self.in_flight -= 1
+            if isinstance(exc, httpx.PoolTimeout):
+                self.pool_timeouts += 1
+            raise
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TrackedStream(response.stream, self._release),  # type: ignore[arg-type]
+            extensions=response.extensions,
+        )
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    @property
+    def waiters(self) -> int:
+        """Requests queued for a free connection (exact for HTTP/1.1, upper bound for HTTP/2)."""
+
+        if self._http2 or self._limits.max_connections is None:
+            return 0
+        return max(0, self.in_flight - self._limits.max_connections)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self._http2,
+            "max_connections": self._limits.max_connections,
+            "max_keepalive_connections": self._limits.max_keepalive_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waiters": self.waiters,
+            "requests_total": self.requests_total,
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# PostgREST ``Prefer: count=`` modes: ``exact`` runs COUNT(*), ``planned`` reads the
+# planner's row estimate and ``estimated`` is exact up to db-max-rows, planned beyond.
+COUNT_MODES = frozenset({"exact", "planned", "estimated"})
 
 
 @dataclass
 class SupabaseRequestOptions:
     """Options that control Supabase REST requests."""
 
+    # One of COUNT_MODES; sent as ``Prefer: count=...``.
     count: Optional[str] = None
     prefer: Optional[str] = None
+    # Sent as ``Idempotency-Key`` and makes POST requests eligible for retries.
+    idempotency_key: Optional[str] = None
+    # Columns a write returns with ``prefer="return=representation"`` (PostgREST ``select``).
+    select: Optional[str] = None
+    # Reads share an identical in-flight request; turn off for reads that must see a
+    # write this caller just made.
+    coalesce: bool = True
+
+
+@dataclass
+class CountedRows:
+    """Rows returned by :meth:`SupabaseAsyncClient.select_with_count`."""
+
+    rows: List[Dict[str, Any]]
+    # ``None`` when PostgREST could not report a total (``Content-Range: 0-9/*``).
+    total: Optional[int]
+
+
+@dataclass
+class BulkChunkFailure:
+    """A chunk of a bulk write that Supabase rejected."""
+
+    chunk_index: int
+    row_offset: int
+    row_count: int
+    error: str
+    status_code: Optional[int] = None
+
+
+@dataclass
+class BulkWriteResult:
+    """Outcome of :meth:`SupabaseAsyncClient.bulk_insert` / :meth:`SupabaseAsyncClient.upsert`."""
+
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    failures: List[BulkChunkFailure] = field(default_factory=list)
+    chunks: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failures
+
+
+class _InflightRead:
+    """A GET shared by every concurrent caller issuing the identical query."""
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 1
 
 
 class SupabaseAsyncClient:
-    """Minimal asynchronous Supabase REST client."""
+    """Minimal asynchronous Supabase REST client.
+
+    The REST, Auth and Storage clients talk to the same host, so they share one
+    connection pool sized from settings.
+    """
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
         self._settings = settings
+        self._retry_policy = RetryPolicy(
+            max_retries=settings.max_retries,
+            backoff_seconds=settings.supabase_retry_backoff_seconds,
+            max_backoff_seconds=settings.supabase_retry_max_backoff_seconds,
+        )
+        self._breakers = CircuitBreakerRegistry(
+            failure_threshold=settings.supabase_circuit_failure_threshold,
+            reset_timeout_seconds=settings.supabase_circuit_reset_seconds,
+        )
+        self.retries_total = 0
+        self._inflight_reads: Dict[Hashable, _InflightRead] = {}
+        self.leader_reads = 0
+        self.coalesced_reads = 0
+        limits = httpx.Limits(
+            max_connections=settings.supabase_http_max_connections,
+            max_keepalive_connections=settings.supabase_http_max_keepalive_connections,
+            keepalive_expiry=settings.supabase_http_keepalive_expiry_seconds,
+        )
+        timeout = httpx.Timeout(
+            connect=settings.supabase_connect_timeout_seconds,
+            read=settings.api_timeout_seconds,
+            write=settings.api_timeout_seconds,
+            pool=settings.supabase_pool_timeout_seconds,
+        )
+        self._transport = InstrumentedTransport(
+            transport or httpx.AsyncHTTPTransport(limits=limits, http2=settings.supabase_http2),
+            limits,
+            http2=settings.supabase_http2,
+        )
         self._rest_client = httpx.AsyncClient(
             base_url=settings.supabase_rest_url,
             headers={
@@ -33,7 +216,8 @@ class SupabaseAsyncClient:
                 "Content-Type": "application/json",
                 "Accept": "application/json",
             },
-            timeout=30.0,
+            timeout=timeout,
+            transport=self._transport,
         )
         self._auth_client = httpx.AsyncClient(
             base_url=settings.supabase_auth_url,
@@ -42,7 +226,8 @@ class SupabaseAsyncClient:
                 "Authorization": f"Bearer {settings.supabase_anon_key}",
                 "Content-Type": "application/json",
             },
-            timeout=30.0,
+            timeout=timeout,
+            transport=self._transport,
         )
         self._storage_client = httpx.AsyncClient(
             base_url=settings.supabase_storage_url,
@@ -50,7 +235,8 @@ class SupabaseAsyncClient:
                 "apikey": settings.supabase_service_role_key,
                 "Authorization": f"Bearer {settings.supabase_service_role_key}",
             },
-            timeout=30.0,
+            timeout=timeout,
+            transport=self._transport,
         )
 
     @property
@@ -65,7 +251,21 @@ class SupabaseAsyncClient:
     def storage(self) -> httpx.AsyncClient:
         return self._storage_client
 
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._transport.stats()
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {"retries_total": self.retries_total, "circuits": self._breakers.stats()}
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        return {
+            "leader_reads": self.leader_reads,
+            "coalesced_reads": self.coalesced_reads,
+            "in_flight_keys": len(self._inflight_reads),
+        }
+
     async def close(self) -> None:
+        # Each client closes the shared transport; closing an idle pool twice is a no-op.
         await self._rest_client.aclose()
         await self._auth_client.aclose()
         await self._storage_client.aclose()
@@ -81,6 +281,40 @@ class SupabaseAsyncClient:
         offset: Optional[int] = None,
         options: Optional[SupabaseRequestOptions] = None,
     ) -> List[Dict[str, Any]]:
+        params = self._select_params(columns, filters, order, limit, offset)
+        coalesce = options.coalesce if options else True
+        return await self._read(table, params, self._headers(options), self._get_json, coalesce)
+
+    async def select_with_count(
+        self,
+        table: str,
+        *,
+        count: str = "exact",
+        columns: str = "*",
+        filters: Optional[Dict[str, str]] = None,
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        options: Optional[SupabaseRequestOptions] = None,
+    ) -> CountedRows:
+        """Select a page of rows together with the total number of matching rows.
+
+        The total is computed by Postgres according to ``count`` and read from the
+        ``Content-Range`` header, so no extra rows are transferred.
+        """
+
+        options = replace(options, count=count) if options else SupabaseRequestOptions(count=count)
+        params = self._select_params(columns, filters, order, limit, offset)
+        return await self._read(table, params, self._headers(options), self._get_counted, options.coalesce)
+
+    @staticmethod
+    def _select_params(
+        columns: str,
+        filters: Optional[Dict[str, str]],
+        order: Optional[str],
+        limit: Optional[int],
+        offset: Optional[int],
+    ) -> Dict[str, Any]:
         params: Dict[str, Any] = {"select": columns}
         if filters:
             params.update(filters)
@@ -90,17 +324,58 @@ class SupabaseAsyncClient:
             params["limit"] = str(limit)
         if offset is not None:
             params["offset"] = str(offset)
-        if options and options.count:
-            params["count"] = options.count
-
-        headers = {}
-        if options and options.prefer:
-            headers["Prefer"] = options.prefer
+        return params
 
-        response = await self._rest_client.get(f"/{table}", params=params, headers=headers)
-        response.raise_for_status()
+    async def _read(
+        self,
+        table: str,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        fetch: Callable[[str, Dict[str, Any], Dict[str, str]], Awaitable[Any]],
+        coalesce: bool = True,
+    ) -> Any:
+        path = f"/{table}"
+        if not (coalesce and self._settings.supabase_coalesce_reads):
+            return await fetch(path, params, headers)
+        key = (fetch.__name__, table, tuple(sorted(params.items())), tuple(sorted(headers.items())))
+        return await self._single_flight(key, lambda: fetch(path, params, headers))
+
+    async def _get_json(self, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> Any:
+        response = await self._send("GET", path, params=params, headers=headers)
         return response.json()
 
+    async def _get_counted(self, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> CountedRows:
+        response = await self._send("GET", path, params=params, headers=headers)
+        return CountedRows(rows=response.json(), total=_content_range_total(response.headers.get("Content-Range")))
+
+    async def _single_flight(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Share one upstream request between concurrent callers with the same key.
+
+        The upstream request runs in its own task so a cancelled caller does not
+        cancel it for the others. When the result is shared each caller receives its
+        own deep copy, since services mutate the rows they get back.
+        """
+
+        entry = self._inflight_reads.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(fetch())
+            entry = _InflightRead(task)
+            self._inflight_reads[key] = entry
+            task.add_done_callback(lambda done: self._finish_read(key, done))
+            self.leader_reads += 1
+        else:
+            entry.waiters += 1
+            self.coalesced_reads += 1
+
+        result = await asyncio.shield(entry.task)
+        return copy.deepcopy(result) if entry.waiters > 1 else result
+
+    def _finish_read(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        self._inflight_reads.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
+
     async def insert(
         self,
         table: str,
@@ -108,16 +383,74 @@ class SupabaseAsyncClient:
         *,
         options: Optional[SupabaseRequestOptions] = None,
     ) -> List[Dict[str, Any]]:
-        headers = {"Prefer": "return=representation"}
-        if options and options.prefer:
-            headers["Prefer"] = options.prefer
-
-        response = await self._rest_client.post(f"/{table}", json=payload, headers=headers)
-        response.raise_for_status()
+        headers = {"Prefer": "return=representation", **self._headers(options)}
+        response = await self._send(
+            "POST",
+            f"/{table}",
+            idempotent=bool(options and options.idempotency_key),
+            json=payload,
+            headers=headers,
+        )
         if not response.content:
             return []
         return response.json()
 
+    async def bulk_insert(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        *,
+        returning: bool = True,
+        chunk_rows: Optional[int] = None,
+        chunk_bytes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        options: Optional[SupabaseRequestOptions] = None,
+    ) -> BulkWriteResult:
+        """Insert many rows in chunks sent concurrently.
+
+        Chunks are bounded by row count and encoded size. A failed chunk does not
+        abort the others; it is reported in ``BulkWriteResult.failures``. Chunks are
+        only retried when ``options.idempotency_key`` is set.
+        """
+
+        return await self._write_chunks(
+            table,
+            rows,
+            prefer=["return=representation" if returning else "return=minimal"],
+            params={},
+            idempotency_key=options.idempotency_key if options else None,
+            chunk_rows=chunk_rows,
+            chunk_bytes=chunk_bytes,
+            concurrency=concurrency,
+        )
+
+    async def upsert(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        *,
+        on_conflict: Optional[str] = None,
+        ignore_duplicates: bool = False,
+        returning: bool = True,
+        chunk_rows: Optional[int] = None,
+        chunk_bytes: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> BulkWriteResult:
+        """Insert rows or merge them into existing ones matching ``on_conflict`` (default: primary key)."""
+
+        resolution = "resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates"
+        return await self._write_chunks(
+            table,
+            rows,
+            prefer=[resolution, "return=representation" if returning else "return=minimal"],
+            params={"on_conflict": on_conflict} if on_conflict else {},
+            idempotency_key=None,
+            idempotent=True,
+            chunk_rows=chunk_rows,
+            chunk_bytes=chunk_bytes,
+            concurrency=concurrency,
+        )
+
     async def update(
         self,
         table: str,
@@ -126,35 +459,231 @@ class SupabaseAsyncClient:
         filters: Optional[Dict[str, str]] = None,
         options: Optional[SupabaseRequestOptions] = None,
     ) -> List[Dict[str, Any]]:
-        headers = {}
-        if options and options.prefer:
-            headers["Prefer"] = options.prefer
-
-        response = await self._rest_client.patch(
-            f"/{table}", params=filters or {}, json=payload, headers=headers
-        )
-        response.raise_for_status()
+        params = dict(filters or {})
+        if options and options.select:
+            params["select"] = options.select
+        response = await self._send("PATCH", f"/{table}", params=params, json=payload, headers=self._headers(options))
         if not response.content:
             return []
         return response.json()
 
+    async def _write_chunks(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        *,
+        prefer: List[str],
+        params: Dict[str, str],
+        idempotency_key: Optional[str],
+        idempotent: bool = False,
+        chunk_rows: Optional[int],
+        chunk_bytes: Optional[int],
+        concurrency: Optional[int],
+    ) -> BulkWriteResult:
+        chunks = list(
+            _chunk_rows(
+                rows,
+                max_rows=chunk_rows or self._settings.supabase_bulk_chunk_rows,
+                max_bytes=chunk_bytes or self._settings.supabase_bulk_chunk_bytes,
+            )
+        )
+        semaphore = asyncio.Semaphore(concurrency or self._settings.supabase_bulk_concurrency)
+        # Rows may have different keys; missing columns take their database default.
+        prefer_header = ",".join([*prefer, "missing=default"])
+
+        async def send_chunk(index: int, offset: int, columns: List[str], body: bytes, count: int) -> Any:
+            headers = {"Prefer": prefer_header, "Content-Type": "application/json"}
+            if idempotency_key:
+                headers["Idempotency-Key"] = f"{idempotency_key}:{index}"
+            async with semaphore:
+                try:
+                    response = await self._send(
+                        "POST",
+                        f"/{table}",
+                        idempotent=idempotent or bool(idempotency_key),
+                        params={**params, "columns": ",".join(columns)},
+                        content=body,
+                        headers=headers,
+                    )
+                except httpx.HTTPError as exc:
+                    status_code = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+                    return BulkChunkFailure(index, offset, count, str(exc), status_code)
+            return response.json() if response.content else []
+
+        outcomes = await asyncio.gather(
+            *(send_chunk(index, *chunk) for index, chunk in enumerate(chunks))
+        )
+        result = BulkWriteResult(chunks=len(chunks))
+        for outcome in outcomes:
+            if isinstance(outcome, BulkChunkFailure):
+                result.failures.append(outcome)
+            else:
+                result.rows.extend(outcome)
+        if result.failures:
+            logger.warning(
+                "Bulk write to Supabase partially failed",
+                table=table,
+                failed_chunks=len(result.failures),
+                chunks=len(chunks),
+            )
+        return result
+
     async def delete(
         self,
         table: str,
         *,
         filters: Optional[Dict[str, str]] = None,
     ) -> List[Dict[str, Any]]:
-        response = await self._rest_client.delete(f"/{table}", params=filters or {})
-        response.raise_for_status()
+        response = await self._send("DELETE", f"/{table}", params=filters or {})
         if not response.content:
             return []
         return response.json()
 
-    async def rpc(self, function: str, *, payload: Optional[Dict[str, Any]] = None) -> Any:
-        response = await self._rest_client.post(f"/rpc/{function}", json=payload or {})
-        response.raise_for_status()
+    async def rpc(
+        self,
+        function: str,
+        *,
+        payload: Optional[Dict[str, Any]] = None,
+        idempotent: bool = False,
+    ) -> Any:
+        """Call a Postgres function; pass ``idempotent=True`` for read-only functions to allow retries."""
+
+        response = await self._send("POST", f"/rpc/{function}", idempotent=idempotent, json=payload or {})
         return response.json()
 
+    async def _send(
+        self, method: str, path: str, *, idempotent: Optional[bool] = None, **kwargs: Any
+    ) -> httpx.Response:
+        """Issue a REST request with retries and a per-endpoint circuit breaker.
+
+        Idempotent requests are retried on transport errors and on 429/502/503/504
+        responses with jittered exponential backoff. Other requests are only retried
+        when they provably never left this process (connect or pool timeouts).
+        """
+
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        breaker = self._breakers.get(path)
+        send = getattr(self._rest_client, method.lower())
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Supabase circuit open for {path}",
+                    request=httpx.Request(method, f"{self._settings.supabase_rest_url}{path}"),
+                )
+            try:
+                response = await send(path, **kwargs)
+            except httpx.TransportError as exc:
+                breaker.record_failure()
+                if attempt >= self._retry_policy.max_retries or not (
+                    idempotent or isinstance(exc, UNSENT_REQUEST_ERRORS)
+                ):
+                    raise
+                await self._backoff(method, path, attempt, reason=type(exc).__name__)
+                attempt += 1
+                continue
+            except httpx.HTTPError:
+                # e.g. DecodingError or TooManyRedirects: the endpoint misbehaved.
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled or timed out by the caller; no verdict on the endpoint, but a
+                # half-open probe must not keep its slot forever.
+                breaker.release_probe()
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if (
+                response.status_code in RETRYABLE_STATUS_CODES
+                and idempotent
+                and attempt < self._retry_policy.max_retries
+            ):
+                await self._backoff(
+                    method,
+                    path,
+                    attempt,
+                    reason=str(response.status_code),
+                    retry_after=RetryPolicy.retry_after(response),
+                )
+                attempt += 1
+                continue
+            response.raise_for_status()
+            return response
+
+    async def _backoff(
+        self, method: str, path: str, attempt: int, *, reason: str, retry_after: Optional[float] = None
+    ) -> None:
+        delay = self._retry_policy.delay(attempt, retry_after)
+        self.retries_total += 1
+        logger.info(
+            "Retrying Supabase request",
+            method=method,
+            path=path,
+            attempt=attempt + 1,
+            reason=reason,
+            delay_seconds=round(delay, 3),
+        )
+        await asyncio.sleep(delay)
+
+    @staticmethod
+    def _headers(options: Optional[SupabaseRequestOptions]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        prefer: List[str] = []
+        if options and options.prefer:
+            prefer.append(options.prefer)
+        if options and options.count:
+            if options.count not in COUNT_MODES:
+                raise ValueError(f"Unsupported count mode '{options.count}'")
+            prefer.append(f"count={options.count}")
+        if prefer:
+            headers["Prefer"] = ",".join(prefer)
+        if options and options.idempotency_key:
+            headers["Idempotency-Key"] = options.idempotency_key
+        return headers
+
+
+def _content_range_total(content_range: Optional[str]) -> Optional[int]:
+    """Parse the total from a PostgREST ``Content-Range`` header such as ``0-24/3573``."""
+
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+def _chunk_rows(
+    rows: Iterable[Dict[str, Any]], *, max_rows: int, max_bytes: int
+) -> Iterator[Tuple[int, List[str], bytes, int]]:
+    """Yield ``(row_offset, columns, json_body, row_count)`` chunks bounded by rows and bytes.
+
+    A single row larger than ``max_bytes`` is sent on its own.
+    """
+
+    offset = 0
+    encoded: List[bytes] = []
+    columns: Dict[str, None] = {}
+    size = 2  # enclosing brackets
+
+    def flush() -> Tuple[int, List[str], bytes, int]:
+        return offset, list(columns), b"[" + b",".join(encoded) + b"]", len(encoded)
+
+    for row in rows:
+        body = json.dumps(row, separators=(",", ":")).encode()
+        if encoded and (len(encoded) >= max_rows or size + len(body) + 1 > max_bytes):
+            chunk = flush()
+            yield chunk
+            offset += chunk[3]
+            encoded, columns, size = [], {}, 2
+        encoded.append(body)
+        columns.update(dict.fromkeys(row))
+        size += len(body) + 1
+    if encoded:
+        yield flush()
+
 
 _client: Optional[SupabaseAsyncClient] = None
 _client_loop: Optional[AbstractEventLoop] = None
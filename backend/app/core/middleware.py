@@ -17,7 +17,7 @@ def register_middlewares(app: FastAPI, settings: Settings) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["X-Request-ID", "X-Job-ID"],
+        expose_headers=["X-Request-ID", "X-Job-ID", "X-Next-Cursor", "X-Total-Count"],
     )
 
     # Additional middleware (metrics, rate limiting, request ID) can be registered here
@@ -0,0 +1,120 @@
+"""Retry and circuit breaker primitives for calls to Supabase."""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+# Methods that can be replayed without changing the outcome. POST is only retried
+# when the caller supplies an idempotency key.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+# Failures raised before the request left this process; safe to retry for any method.
+UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without contacting Supabase while an endpoint's circuit is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter")."""
+
+    max_retries: int
+    backoff_seconds: float
+    max_backoff_seconds: float
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        ceiling = min(self.max_backoff_seconds, self.backoff_seconds * (2**attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff_seconds))
+        return delay
+
+    @staticmethod
+    def retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return None
+
+
+class CircuitBreaker:
+    """Classic closed → open → half-open breaker for a single endpoint."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout_seconds
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            # Let exactly one probe through; everyone else keeps failing fast.
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self._consecutive_failures >= self._failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot without an outcome (the caller was cancelled)."""
+
+        self._probe_in_flight = False
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one breaker per endpoint key."""
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self._failure_threshold, self._reset_timeout)
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            endpoint: {"state": breaker.state, "rejected": breaker.rejected}
+            for endpoint, breaker in self._breakers.items()
+        }
@@ -0,0 +1,172 @@
+"""Local verification of Supabase access tokens."""
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import httpx
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from .config import Settings, get_settings
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+HMAC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is definitively invalid (expired, revoked, wrong audience)."""
+
+
+class TokenRevocationStore:
+    """In-process record of sessions revoked via sign-out.
+
+    Entries are kept only until the revoked token would have expired anyway. The
+    methods are async so a shared backend (e.g. Redis) can be dropped in when the
+    API runs on more than one node.
+    """
+
+    def __init__(self) -> None:
+        self._revoked: Dict[str, float] = {}
+
+    async def revoke(self, key: str, expires_at: float) -> None:
+        self._purge()
+        self._revoked[key] = expires_at
+
+    async def is_revoked(self, key: str) -> bool:
+        expires_at = self._revoked.get(key)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._revoked.pop(key, None)
+            return False
+        return True
+
+    def _purge(self) -> None:
+        now = time.time()
+        for key in [key for key, expires_at in self._revoked.items() if expires_at <= now]:
+            self._revoked.pop(key, None)
+
+
+class TokenVerifier:
+    """Validate Supabase JWTs locally, falling back to the caller when inconclusive.
+
+    ``verify`` returns the decoded claims when the token is valid, raises
+    :class:`InvalidTokenError` when it is definitively not, and returns ``None`` when
+    it cannot decide locally (unknown key id, unsupported algorithm, JWKS endpoint
+    unavailable, signature mismatch against the configured secret). Callers should
+    treat ``None`` as "ask Supabase".
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        revocation_store: Optional[TokenRevocationStore] = None,
+    ) -> None:
+        self._settings = settings
+        self._revocations = revocation_store or TokenRevocationStore()
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._jwks_fetched_at = 0.0
+        self._jwks_lock = asyncio.Lock()
+
+    @property
+    def revocations(self) -> TokenRevocationStore:
+        return self._revocations
+
+    async def verify(self, token: str, auth_client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as exc:
+            raise InvalidTokenError("Malformed token") from exc
+
+        algorithm = header.get("alg")
+        key = await self._resolve_key(algorithm, header.get("kid"), auth_client)
+        if key is None:
+            return None
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self._settings.jwt_audience,
+                options={"require_aud": True, "require_exp": True, "require_sub": True},
+            )
+        except ExpiredSignatureError as exc:
+            raise InvalidTokenError("Token has expired") from exc
+        except JWTClaimsError as exc:
+            raise InvalidTokenError(str(exc)) from exc
+        except JWTError:
+            # A signature mismatch may just mean our secret is stale or misconfigured.
+            logger.debug("Local token verification inconclusive", algorithm=algorithm)
+            return None
+
+        if await self._revocations.is_revoked(self._revocation_key(claims)):
+            raise InvalidTokenError("Session has been signed out")
+        return claims
+
+    async def revoke(self, claims: Dict[str, Any]) -> None:
+        """Record the session of a token :meth:`verify` accepted as revoked until it expires.
+
+        The entry is kept no longer than the configured access-token lifetime,
+        whatever ``exp`` says.
+        """
+
+        latest = time.time() + self._settings.jwt_access_token_lifetime_seconds
+        expires_at = min(float(claims.get("exp") or latest), latest)
+        await self._revocations.revoke(self._revocation_key(claims), expires_at)
+
+    async def _resolve_key(
+        self, algorithm: Optional[str], key_id: Optional[str], auth_client: httpx.AsyncClient
+    ) -> Optional[Any]:
+        if algorithm in HMAC_ALGORITHMS:
+            if algorithm != self._settings.jwt_algorithm:
+                return None
+            return self._settings.jwt_secret
+        if algorithm in ASYMMETRIC_ALGORITHMS and key_id:
+            return await self._get_jwk(key_id, auth_client)
+        return None
+
+    async def _get_jwk(self, key_id: str, auth_client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+        if key_id in self._jwks and not self._jwks_expired():
+            return self._jwks[key_id]
+
+        async with self._jwks_lock:
+            # Another coroutine may have refreshed the cache while we waited.
+            if key_id in self._jwks and not self._jwks_expired():
+                return self._jwks[key_id]
+            if not self._jwks_expired() and time.monotonic() - self._jwks_fetched_at < 30:
+                # Unknown kid right after a refresh: don't hammer the JWKS endpoint.
+                return None
+            await self._refresh_jwks(auth_client)
+        return self._jwks.get(key_id)
+
+    async def _refresh_jwks(self, auth_client: httpx.AsyncClient) -> None:
+        try:
+            response = await auth_client.get("/.well-known/jwks.json")
+            response.raise_for_status()
+            keys: List[Dict[str, Any]] = response.json().get("keys", [])
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("Unable to refresh Supabase JWKS", error=str(exc))
+            return
+        self._jwks = {key["kid"]: key for key in keys if key.get("kid")}
+        self._jwks_fetched_at = time.monotonic()
+
+    def _jwks_expired(self) -> bool:
+        return time.monotonic() - self._jwks_fetched_at > self._settings.jwks_cache_ttl_seconds
+
+    @staticmethod
+    def _revocation_key(claims: Dict[str, Any]) -> str:
+        return str(claims.get("session_id") or claims.get("jti") or f"{claims.get('sub')}:{claims.get('iat')}")
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier:
+    """Return the process-wide token verifier (shares the JWKS and revocation caches)."""
+
+    return TokenVerifier(get_settings())
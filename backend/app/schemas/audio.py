@@ -0,0 +1,21 @@
+"""Schemas for server-side audio rendering."""
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from .scripts import ScriptSegment
+
+
+class AudioRenderPayload(BaseModel):
+    """``payload`` of an ``audio_render`` job."""
+
+    script_id: Optional[str] = Field(None, description="Stored script to render")
+    segments: Optional[List[ScriptSegment]] = Field(None, description="Segments to render instead of a stored script")
+    voices: Dict[str, str] = Field(default_factory=dict, description="Provider voice per speaker name")
+    language: Optional[str] = Field(None, description="Defaults to the script's language, then 'en'")
+
+    @model_validator(mode="after")
+    def _require_source(self) -> "AudioRenderPayload":
+        if not self.script_id and not self.segments:
+            raise ValueError("Either script_id or segments is required")
+        return self
@@ -104,6 +104,8 @@ class UserProfile(BaseModel):
     pending_account_deletion: Optional[AccountDeletionStatus] = Field(
         default=None, alias="pendingAccountDeletion"
     )
+    # Billing plan from Supabase ``app_metadata.plan``, which only the service role can set.
+    plan: Optional[str] = None
 
 
 class AuthResponse(BaseModel):
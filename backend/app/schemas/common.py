@@ -1,9 +1,11 @@
 """Common Pydantic models shared across endpoints."""
 from datetime import datetime
-from typing import Optional
+from typing import Generic, List, Literal, Optional, TypeVar
 
 from pydantic import BaseModel, Field
 
+T = TypeVar("T")
+
 
 class MessageResponse(BaseModel):
     message: str = Field(..., description="Human readable response message")
@@ -14,6 +16,17 @@ class Pagination(BaseModel):
     offset: int = Field(0, ge=0)
 
 
+CountMode = Literal["exact", "planned", "estimated"]
+# ``summary`` list views leave out large columns such as article bodies and script segments.
+ListView = Literal["summary", "full"]
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    total: Optional[int] = Field(None, description="Rows matching the query; omitted on cursor pages")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, if any")
+
+
 class JobMetadata(BaseModel):
     job_id: str = Field(..., description="Server generated job identifier")
     status: str = Field(..., description="Current job status")
@@ -20,18 +20,28 @@ class ScrapedContentCreate(BaseModel):
     metadata: dict = Field(default_factory=dict)
 
 
-class ScrapedContentResponse(BaseModel):
+class ScrapedContentSummary(BaseModel):
     id: str
     user_id: str
     url: HttpUrl
     title: str
-    markdown: str
     provider: str
-    metadata: dict
     created_at: datetime
     updated_at: datetime
 
 
+class ScrapedContentResponse(ScrapedContentSummary):
+    markdown: str
+    metadata: dict
+
+
 class ScrapedContentList(BaseModel):
     items: List[ScrapedContentResponse]
-    total: int
+    total: Optional[int] = Field(None, description="Rows matching the query; omitted on cursor pages")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, if any")
+
+
+class ScrapedContentSummaryList(BaseModel):
+    items: List[ScrapedContentSummary]
+    total: Optional[int] = Field(None, description="Rows matching the query; omitted on cursor pages")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, if any")
@@ -1,6 +1,6 @@
 """Schemas representing async job execution."""
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -10,14 +10,34 @@ class JobCreate(BaseModel):
     payload: Dict[str, Any] = Field(default_factory=dict)
 
 
-class JobStatus(BaseModel):
+class JobSummary(BaseModel):
     id: str
     job_type: str
     status: str
-    payload: Dict[str, Any]
-    result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
+    attempts: int = 0
+    next_run_at: Optional[datetime] = None
+
+
+class JobStatus(JobSummary):
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    progress: Optional[Dict[str, Any]] = None
+
+
+class JobEvent(BaseModel):
+    """Status change or progress report pushed to job event subscribers."""
+
+    job_id: str
+    event: Literal["status", "progress"]
+    status: Optional[str] = None
+    percent: Optional[float] = Field(default=None, ge=0, le=100)
+    stage: Optional[str] = None
+    partial: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    at: datetime = Field(default_factory=datetime.utcnow)
@@ -12,6 +12,10 @@ class PodcastCreate(BaseModel):
     audio_storage_path: str = Field(..., description="Supabase Storage path to the audio file")
     cover_art_storage_path: Optional[str] = Field(None, description="Storage path for cover art")
     duration_seconds: Optional[int] = None
+    audio_format: Optional[str] = Field(
+        None, description="Container/codec of the audio file (mp3, opus, wav); defaults to its extension"
+    )
+    audio_bitrate_kbps: Optional[int] = Field(None, description="Bitrate of the audio file in kbit/s")
     metadata: dict = Field(default_factory=dict)
 
 
@@ -21,14 +21,17 @@ class ScriptCreate(BaseModel):
     metadata: dict = Field(default_factory=dict)
 
 
-class ScriptResponse(BaseModel):
+class ScriptSummary(BaseModel):
     id: str
     user_id: str
     source_content_id: Optional[str]
     prompt: str
     model: str
     language: str
-    segments: List[ScriptSegment]
     metadata: dict
     created_at: datetime
     updated_at: datetime
+
+
+class ScriptResponse(ScriptSummary):
+    segments: List[ScriptSegment]
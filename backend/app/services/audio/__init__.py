@@ -0,0 +1,44 @@
+from .cache import (
+    DiskSegmentCache,
+    SegmentCache,
+    StorageSegmentCache,
+    TieredSegmentCache,
+    build_segment_cache,
+    segment_cache_key,
+)
+from .chunking import SpeechChunk, split_segments
+from .encoding import AudioEncoder, EncodedAudio, build_audio_encoder, detect_backend
+from .postprocess import AudioPostProcessor, PostProcessStream, build_post_processor
+from .providers import FakeTTSProvider, GeminiTTSProvider, TTSProvider, build_tts_provider
+from .render_job import AudioRenderHandler
+from .renderer import AudioRenderer, PcmSink, RenderedAudio, RenderSummary
+from .wav import WavWriter, wav_header
+
+__all__ = [
+    "AudioEncoder",
+    "AudioPostProcessor",
+    "AudioRenderer",
+    "AudioRenderHandler",
+    "DiskSegmentCache",
+    "EncodedAudio",
+    "FakeTTSProvider",
+    "GeminiTTSProvider",
+    "PcmSink",
+    "PostProcessStream",
+    "RenderedAudio",
+    "RenderSummary",
+    "SegmentCache",
+    "SpeechChunk",
+    "StorageSegmentCache",
+    "TieredSegmentCache",
+    "TTSProvider",
+    "WavWriter",
+    "build_audio_encoder",
+    "build_post_processor",
+    "build_segment_cache",
+    "build_tts_provider",
+    "detect_backend",
+    "segment_cache_key",
+    "split_segments",
+    "wav_header",
+]
@@ -0,0 +1,232 @@
+"""Content-addressed cache of synthesized speech, one entry per speaker turn."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+import httpx
+
+from ...core.config import Settings
+from ...core.logging import get_logger
+from ..storage_service import StorageService
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with whitespace collapsed, so reflowing a line does not miss the cache."""
+
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def segment_cache_key(provider: str, model: str, voice: str, text: str, audio_format: str) -> str:
+    """SHA-256 over everything that changes the synthesized audio of one turn."""
+
+    canonical = json.dumps(
+        [provider, model, voice, normalize_text(text), audio_format], separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SegmentCache(Protocol):
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def put(self, key: str, audio: bytes) -> None: ...
+
+    def stats(self) -> Dict[str, object]: ...
+
+
+class DiskSegmentCache:
+    """Files under ``directory`` with least-recently-used eviction above ``max_bytes``.
+
+    The index is rebuilt from the directory (oldest modification first) on first
+    use and kept per process; a hit refreshes the file's modification time so the
+    order survives restarts. Writes are atomic, so several workers may share it.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await self._load()
+        try:
+            audio = await asyncio.to_thread(self._read, self._path(key))
+        except FileNotFoundError:
+            self._forget(key)
+            self.misses += 1
+            return None
+        if key not in self._entries:
+            # Written by another process sharing the directory.
+            self._size += len(audio)
+        self._entries[key] = len(audio)
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return audio
+
+    async def put(self, key: str, audio: bytes) -> None:
+        await self._load()
+        await asyncio.to_thread(self._write, self._path(key), audio)
+        self._forget(key)
+        self._entries[key] = len(audio)
+        self._size += len(audio)
+        evicted: List[str] = []
+        while self._size > self._max_bytes and len(self._entries) > 1:
+            old_key, size = self._entries.popitem(last=False)
+            self._size -= size
+            evicted.append(old_key)
+        if evicted:
+            self.evictions += len(evicted)
+            await asyncio.to_thread(self._remove, [self._path(old_key) for old_key in evicted])
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "tier": "disk",
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small.
+        return self._directory / key[:2] / f"{key}.pcm"
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    async def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        for key, size in await asyncio.to_thread(self._scan):
+            self._entries[key] = size
+            self._size += size
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for path in self._directory.glob("*/*.pcm"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        return [(key, size) for _, key, size in sorted(files)]
+
+    @staticmethod
+    def _read(path: Path) -> bytes:
+        audio = path.read_bytes()
+        os.utime(path)
+        return audio
+
+    @staticmethod
+    def _write(path: Path, audio: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(audio)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @staticmethod
+    def _remove(paths: Sequence[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+class StorageSegmentCache:
+    """Entries as objects under ``prefix/`` in a Supabase Storage bucket, shared by every node."""
+
+    def __init__(self, storage: StorageService, bucket: str, prefix: str = "tts-cache") -> None:
+        self._storage = storage
+        self._bucket = bucket
+        self._prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = await self._storage.download(self._bucket, self._path(key))
+        if audio is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return audio
+
+    async def put(self, key: str, audio: bytes) -> None:
+        await self._storage.upload(self._bucket, self._path(key), audio, "application/octet-stream")
+
+    def stats(self) -> Dict[str, object]:
+        return {"tier": "storage", "bucket": self._bucket, "hits": self.hits, "misses": self.misses}
+
+    def _path(self, key: str) -> str:
+        return f"{self._prefix}/{key[:2]}/{key}.pcm"
+
+
+class TieredSegmentCache:
+    """Looks tiers up in order (e.g. local disk, then Storage) and fills the faster ones on a hit.
+
+    A failing tier is logged and treated as a miss; the cache never fails a render.
+    """
+
+    def __init__(self, tiers: Sequence[SegmentCache]) -> None:
+        self._tiers = list(tiers)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        for index, tier in enumerate(self._tiers):
+            try:
+                audio = await tier.get(key)
+            except (OSError, httpx.HTTPError) as exc:
+                logger.warning("Speech cache lookup failed", tier=type(tier).__name__, error=repr(exc))
+                continue
+            if audio is not None:
+                for faster in self._tiers[:index]:
+                    await self._put(faster, key, audio)
+                return audio
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        for tier in self._tiers:
+            await self._put(tier, key, audio)
+
+    def stats(self) -> Dict[str, object]:
+        return {"tiers": [tier.stats() for tier in self._tiers]}
+
+    @staticmethod
+    async def _put(tier: SegmentCache, key: str, audio: bytes) -> None:
+        try:
+            await tier.put(key, audio)
+        except (OSError, httpx.HTTPError) as exc:
+            logger.warning("Speech cache write failed", tier=type(tier).__name__, error=repr(exc))
+
+
+def build_segment_cache(settings: Settings, storage: StorageService) -> Optional[SegmentCache]:
+    tiers: List[SegmentCache] = []
+    if settings.tts_cache_max_bytes > 0:
+        directory = settings.tts_cache_dir or os.path.join(tempfile.gettempdir(), "echogen-tts-cache")
+        tiers.append(DiskSegmentCache(Path(directory), settings.tts_cache_max_bytes))
+    if settings.tts_cache_storage:
+        tiers.append(StorageSegmentCache(storage, settings.supabase_storage_bucket_audio))
+    return TieredSegmentCache(tiers) if tiers else None
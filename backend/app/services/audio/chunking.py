@@ -0,0 +1,85 @@
+"""Split a script into provider-sized chunks of speaker turns."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, List, Sequence
+
+from ...schemas.scripts import ScriptSegment
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+@dataclass
+class SpeechChunk:
+    """Consecutive speaker turns synthesized in one provider request."""
+
+    index: int
+    segments: List[ScriptSegment] = field(default_factory=list)
+
+    @property
+    def speakers(self) -> List[str]:
+        return list(dict.fromkeys(segment.speaker for segment in self.segments))
+
+    @property
+    def text(self) -> str:
+        return "\n".join(_line(segment) for segment in self.segments)
+
+
+def _line(segment: ScriptSegment) -> str:
+    return f"{segment.speaker}: {segment.content.strip()}"
+
+
+def _pieces(content: str, limit: int) -> Iterator[str]:
+    """``content`` in pieces of at most ``limit`` characters, cut between sentences where possible."""
+
+    piece = ""
+    for sentence in _SENTENCE_END.split(content.strip()):
+        while len(sentence) > limit:
+            # A single sentence longer than a chunk: fall back to a word boundary.
+            cut = sentence.rfind(" ", 0, limit)
+            cut = cut if cut > 0 else limit
+            if piece:
+                yield piece
+                piece = ""
+            yield sentence[:cut].strip()
+            sentence = sentence[cut:].strip()
+        if piece and len(piece) + 1 + len(sentence) > limit:
+            yield piece
+            piece = ""
+        piece = f"{piece} {sentence}" if piece else sentence
+    if piece:
+        yield piece
+
+
+def split_segments(
+    segments: Sequence[ScriptSegment], max_chars: int, *, one_turn_per_chunk: bool = False
+) -> List[SpeechChunk]:
+    """Group segments into chunks whose text is at most ``max_chars`` long.
+
+    Chunks break between speaker turns, like ``_splitScriptIntoChunks`` in the app;
+    a turn too long for one chunk is split between sentences into several turns.
+    With ``one_turn_per_chunk`` every turn is its own chunk, so its audio can be
+    cached and reused independently of its neighbours.
+    """
+
+    chunks: List[SpeechChunk] = []
+    current: List[ScriptSegment] = []
+    size = 0
+    for segment in segments:
+        if not segment.content.strip():
+            continue
+        turns = [segment]
+        if len(_line(segment)) > max_chars:
+            budget = max(1, max_chars - len(segment.speaker) - 2)
+            turns = [ScriptSegment(speaker=segment.speaker, content=piece) for piece in _pieces(segment.content, budget)]
+        for turn in turns:
+            length = len(_line(turn))
+            if current and (one_turn_per_chunk or size + 1 + length > max_chars):
+                chunks.append(SpeechChunk(len(chunks), current))
+                current, size = [], 0
+            size += length + (1 if current else 0)
+            current.append(turn)
+    if current:
+        chunks.append(SpeechChunk(len(chunks), current))
+    return chunks
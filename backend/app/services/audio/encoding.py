@@ -0,0 +1,142 @@
+"""Transcode rendered WAV files to MP3 or Opus in worker processes."""
+from __future__ import annotations
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ...core.config import Settings
+from ...core.logging import get_logger
+from ...schemas.jobs import JobCreate
+from ..jobs.executors import ProcessJobPool
+
+logger = get_logger(__name__)
+
+# format -> (content type, ffmpeg encoder, ffmpeg muxer, default kbps for mono speech)
+FORMATS: Dict[str, tuple] = {
+    "mp3": ("audio/mpeg", "libmp3lame", "mp3", 64),
+    # Ogg Opus; ".opus" is the extension RFC 7845 recommends.
+    "opus": ("audio/ogg", "libopus", "ogg", 32),
+}
+# WAV frames handed to lameenc per call.
+_BLOCK_FRAMES = 1 << 16
+
+
+@dataclass(frozen=True)
+class EncodedAudio:
+    path: str
+    format: str
+    content_type: str
+    bitrate_kbps: int
+    bytes: int
+
+
+def detect_backend(audio_format: str, ffmpeg: Optional[str] = None) -> Optional[str]:
+    """``"lameenc"`` or ``"ffmpeg"`` if either can produce ``audio_format`` here, else ``None``."""
+
+    if audio_format == "mp3" and importlib.util.find_spec("lameenc") is not None:
+        return "lameenc"
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    try:
+        encoders = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"], capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return "ffmpeg" if FORMATS[audio_format][1] in encoders else None
+
+
+def encode_file(job: JobCreate) -> Dict[str, Any]:
+    """Process-pool handler: encode ``payload["source"]`` (WAV) into ``payload["target"]``."""
+
+    payload = job.payload
+    source, target, audio_format = payload["source"], payload["target"], payload["format"]
+    if payload["backend"] == "lameenc":
+        _encode_lameenc(source, target, payload["bitrate_kbps"])
+    else:
+        _, codec, muxer, _ = FORMATS[audio_format]
+        command = [payload.get("ffmpeg") or "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y"]
+        command += ["-i", source, "-vn", "-c:a", codec, "-b:a", f"{payload['bitrate_kbps']}k", "-f", muxer, target]
+        subprocess.run(command, check=True, capture_output=True)
+    return {"bytes": os.path.getsize(target)}
+
+
+def _encode_lameenc(source: str, target: str, bitrate_kbps: int) -> None:
+    import lameenc
+
+    with wave.open(source, "rb") as wav, open(target, "wb") as out:
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(bitrate_kbps)
+        encoder.set_in_sample_rate(wav.getframerate())
+        encoder.set_channels(wav.getnchannels())
+        encoder.set_quality(2)
+        while frames := wav.readframes(_BLOCK_FRAMES):
+            out.write(encoder.encode(frames))
+        out.write(encoder.flush())
+
+
+class AudioEncoder:
+    """Encodes WAV files to ``audio_format`` with ``backend`` in a :class:`ProcessJobPool`.
+
+    Encoding is CPU-bound, so it runs outside the API process's event loop; the
+    files are passed by path. Cancelling :meth:`encode` terminates the worker.
+    """
+
+    def __init__(
+        self,
+        audio_format: str,
+        bitrate_kbps: int,
+        backend: str,
+        pool: ProcessJobPool,
+        *,
+        ffmpeg: Optional[str] = None,
+    ) -> None:
+        self.format = audio_format
+        self.content_type = FORMATS[audio_format][0]
+        self.bitrate_kbps = bitrate_kbps
+        self.backend = backend
+        self._pool = pool
+        self._ffmpeg = ffmpeg
+
+    async def encode(self, source: str, target: str) -> EncodedAudio:
+        payload = {
+            "source": source,
+            "target": target,
+            "format": self.format,
+            "bitrate_kbps": self.bitrate_kbps,
+            "backend": self.backend,
+            "ffmpeg": self._ffmpeg,
+        }
+        result = await self._pool.run(encode_file, JobCreate(job_type="audio_encode", payload=payload))
+        return EncodedAudio(target, self.format, self.content_type, self.bitrate_kbps, result["bytes"])
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"format": self.format, "backend": self.backend, **self._pool.stats()}
+
+
+def build_audio_encoder(settings: Settings) -> Optional[AudioEncoder]:
+    """``None`` for ``audio_format="wav"``; raises ``ValueError`` if nothing here can encode the format."""
+
+    if settings.audio_format == "wav":
+        return None
+    if settings.audio_format not in FORMATS:
+        raise ValueError(f"Unknown audio format '{settings.audio_format}'")
+    ffmpeg = settings.audio_ffmpeg_path or shutil.which("ffmpeg")
+    backend = detect_backend(settings.audio_format, ffmpeg)
+    if backend is None:
+        raise ValueError(f"No {settings.audio_format} encoder available (install lameenc or ffmpeg)")
+    pool = ProcessJobPool(
+        settings.audio_encode_workers, settings.job_process_max_payload_bytes, settings.job_process_start_method
+    )
+    bitrate = settings.audio_bitrate_kbps or FORMATS[settings.audio_format][3]
+    logger.info("Audio encoding enabled", format=settings.audio_format, backend=backend, bitrate_kbps=bitrate)
+    return AudioEncoder(settings.audio_format, bitrate, backend, pool, ffmpeg=ffmpeg)
@@ -0,0 +1,146 @@
+"""Level, trim and join synthesized chunks before they are written."""
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from ...core.config import Settings
+
+FULL_SCALE = 32768.0
+# Loudness and silence are measured over frames of this length.
+FRAME_MS = 10
+# Never raise the loudest sample of a chunk above this.
+PEAK_CEILING_DBFS = -1.0
+
+
+def _db_to_power(dbfs: float) -> float:
+    return (FULL_SCALE * 10 ** (dbfs / 20)) ** 2
+
+
+class AudioPostProcessor:
+    """Settings for :class:`PostProcessStream`, shared by every render.
+
+    Each chunk is trimmed to ``keep_silence_ms`` around the frames louder than
+    ``silence_threshold_dbfs`` and gained towards ``target_dbfs`` RMS over those
+    frames (a gated, LUFS-like measure), raised by at most ``max_gain_db`` and never past
+    -1 dBFS peak. Consecutive chunks overlap by ``crossfade_ms`` with an
+    equal-power fade. Samples are converted to float ``block_samples`` at a time,
+    so temporaries stay bounded whatever the chunk size.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        *,
+        target_dbfs: float = -20.0,
+        max_gain_db: float = 12.0,
+        silence_threshold_dbfs: float = -50.0,
+        keep_silence_ms: int = 120,
+        crossfade_ms: int = 20,
+        block_samples: int = 1 << 16,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.target_dbfs = target_dbfs
+        self.max_gain_db = max_gain_db
+        self.silence_power = _db_to_power(silence_threshold_dbfs)
+        self.frame = max(1, sample_rate * FRAME_MS // 1000)
+        self.keep_silence = sample_rate * keep_silence_ms // 1000
+        self.crossfade = sample_rate * crossfade_ms // 1000
+        # Whole frames per block, so frame levels can be computed block by block.
+        self.block = max(1, block_samples // self.frame) * self.frame
+
+    def stream(self) -> "PostProcessStream":
+        return PostProcessStream(self)
+
+
+class PostProcessStream:
+    """Processes the chunks of one render, in order.
+
+    :meth:`process` returns the audio that is final so far; the last
+    ``crossfade`` samples are held back to blend with the next chunk and
+    :meth:`finish` returns them.
+    """
+
+    def __init__(self, settings: AudioPostProcessor) -> None:
+        self._settings = settings
+        self._tail = np.empty(0, dtype=np.int16)
+
+    def process(self, pcm: bytes) -> memoryview:
+        samples = self._level(self._trim(np.frombuffer(pcm, dtype=np.int16)))
+        if not len(samples):
+            return memoryview(b"")
+        overlap = min(len(self._tail), len(samples), self._settings.crossfade)
+        if overlap:
+            head = self._tail[: len(self._tail) - overlap]
+            mixed = _equal_power_crossfade(self._tail[len(self._tail) - overlap :], samples[:overlap])
+            samples = np.concatenate([head, mixed, samples[overlap:]])
+        else:
+            samples = np.concatenate([self._tail, samples])
+        keep = min(len(samples), self._settings.crossfade)
+        self._tail = samples[len(samples) - keep :].copy()
+        return memoryview(samples[: len(samples) - keep]).cast("B")
+
+    def finish(self) -> memoryview:
+        tail, self._tail = self._tail, np.empty(0, dtype=np.int16)
+        return memoryview(tail).cast("B")
+
+    def _frame_power(self, samples: np.ndarray) -> np.ndarray:
+        """Mean square of every frame (the last one may be partial)."""
+
+        frame = self._settings.frame
+        power = np.empty(-(-len(samples) // frame), dtype=np.float64)
+        for start in range(0, len(samples), self._settings.block):
+            block = np.square(samples[start : start + self._settings.block], dtype=np.float32)
+            whole = len(block) // frame
+            first = start // frame
+            power[first : first + whole] = block[: whole * frame].reshape(whole, frame).mean(axis=1)
+            if len(block) % frame:
+                power[first + whole] = block[whole * frame :].mean()
+        return power
+
+    def _trim(self, samples: np.ndarray) -> np.ndarray:
+        voiced = np.flatnonzero(self._frame_power(samples) > self._settings.silence_power)
+        if not len(voiced):
+            return samples[:0]
+        frame, keep = self._settings.frame, self._settings.keep_silence
+        start = max(0, int(voiced[0]) * frame - keep)
+        end = min(len(samples), (int(voiced[-1]) + 1) * frame + keep)
+        return samples[start:end]
+
+    def _level(self, samples: np.ndarray) -> np.ndarray:
+        if not len(samples):
+            return samples
+        power = self._frame_power(samples)
+        voiced = power[power > self._settings.silence_power]
+        loudness = 10 * math.log10(float(voiced.mean() if len(voiced) else power.mean()) / FULL_SCALE**2 + 1e-12)
+        # Quiet chunks are only raised so far, to keep their noise floor down; loud ones always come down.
+        gain_db = min(self._settings.target_dbfs - loudness, self._settings.max_gain_db)
+        peak = max(abs(int(samples.max())), abs(int(samples.min())), 1)
+        gain = min(10 ** (gain_db / 20), FULL_SCALE * 10 ** (PEAK_CEILING_DBFS / 20) / peak)
+        out = np.empty_like(samples)
+        for start in range(0, len(samples), self._settings.block):
+            block = samples[start : start + self._settings.block].astype(np.float32)
+            block *= gain
+            np.rint(block, out=block)
+            np.clip(block, -FULL_SCALE, FULL_SCALE - 1, out=block)
+            out[start : start + len(block)] = block
+        return out
+
+
+def _equal_power_crossfade(outgoing: np.ndarray, incoming: np.ndarray) -> np.ndarray:
+    position = (np.arange(len(outgoing), dtype=np.float32) + 0.5) * (np.pi / 2 / len(outgoing))
+    mixed = outgoing * np.cos(position) + incoming * np.sin(position)
+    return np.clip(np.rint(mixed), -FULL_SCALE, FULL_SCALE - 1).astype(np.int16)
+
+
+def build_post_processor(settings: Settings, sample_rate: int) -> Optional[AudioPostProcessor]:
+    if not settings.tts_postprocess:
+        return None
+    return AudioPostProcessor(
+        sample_rate,
+        target_dbfs=settings.tts_target_dbfs,
+        silence_threshold_dbfs=settings.tts_silence_threshold_dbfs,
+        crossfade_ms=settings.tts_crossfade_ms,
+    )
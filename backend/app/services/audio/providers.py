@@ -0,0 +1,149 @@
+"""Text-to-speech providers used by the audio renderer."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+from typing import Dict, List, Mapping, Optional, Protocol, Sequence
+
+import httpx
+
+from ...core.config import Settings
+from .chunking import SpeechChunk
+
+# Every provider returns raw 16-bit little-endian mono PCM.
+SAMPLE_WIDTH_BYTES = 2
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+# Prebuilt Gemini voices used for speakers the job does not assign a voice to.
+DEFAULT_GEMINI_VOICES = ("Kore", "Puck")
+
+
+class TTSProvider(Protocol):
+    name: str
+    model: str
+    sample_rate: int
+    # Assigned in order to speakers the job does not pick a voice for.
+    default_voices: Sequence[str]
+
+    async def synthesize(self, chunk: SpeechChunk, voices: Mapping[str, str], language: str) -> bytes:
+        """Speak ``chunk`` and return its PCM samples."""
+        ...
+
+
+class FakeTTSProvider:
+    """Offline provider for tests and local development.
+
+    Returns deterministic PCM (``samples_per_char`` samples per character of the
+    chunk's text, derived from its hash) after ``latency`` seconds, and records how
+    many requests were in flight at once.
+    """
+
+    name = "fake"
+    model = "fake-1"
+    default_voices = ("fake-a", "fake-b")
+
+    def __init__(self, sample_rate: int = 24_000, samples_per_char: int = 40, latency: float = 0.0) -> None:
+        self.sample_rate = sample_rate
+        self._samples_per_char = samples_per_char
+        self._latency = latency
+        self.calls: List[SpeechChunk] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def pcm_for(self, text: str) -> bytes:
+        pattern = hashlib.sha256(text.encode("utf-8")).digest()
+        size = len(text) * self._samples_per_char * SAMPLE_WIDTH_BYTES
+        return (pattern * (size // len(pattern) + 1))[:size]
+
+    async def synthesize(self, chunk: SpeechChunk, voices: Mapping[str, str], language: str) -> bytes:
+        self.calls.append(chunk)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._latency)
+        finally:
+            self.in_flight -= 1
+        return self.pcm_for(chunk.text)
+
+
+class GeminiTTSProvider:
+    """Gemini multi-speaker speech generation (24 kHz PCM).
+
+    Sends the same request as the Flutter app's ``_generateSingleChunk``. HTTP
+    errors propagate as ``httpx.HTTPStatusError`` so a 429 is retried by the job's
+    retry policy.
+    """
+
+    name = "gemini"
+    sample_rate = 24_000
+    default_voices = DEFAULT_GEMINI_VOICES
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        timeout: float = 300.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required for the gemini TTS provider")
+        self._api_key = api_key
+        self.model = model
+        self._client = client or httpx.AsyncClient(base_url=GEMINI_BASE_URL, timeout=timeout)
+
+    async def synthesize(self, chunk: SpeechChunk, voices: Mapping[str, str], language: str) -> bytes:
+        response = await self._client.post(
+            f"/models/{self.model}:generateContent",
+            headers={"x-goog-api-key": self._api_key},
+            json=self._request(chunk, voices, language),
+        )
+        response.raise_for_status()
+        try:
+            data = response.json()["candidates"][0]["content"]["parts"][0]["inlineData"]["data"]
+        except (KeyError, IndexError, TypeError) as exc:
+            raise RuntimeError(f"Gemini returned no audio for chunk {chunk.index}") from exc
+        return base64.b64decode(data)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    @staticmethod
+    def _request(chunk: SpeechChunk, voices: Mapping[str, str], language: str) -> Dict[str, object]:
+        speakers = chunk.speakers
+        assigned = {
+            speaker: voices.get(speaker) or DEFAULT_GEMINI_VOICES[index % len(DEFAULT_GEMINI_VOICES)]
+            for index, speaker in enumerate(speakers)
+        }
+        if len(speakers) == 1:
+            speech: Dict[str, object] = {
+                "voiceConfig": {"prebuiltVoiceConfig": {"voiceName": assigned[speakers[0]]}}
+            }
+        else:
+            speech = {
+                "multiSpeakerVoiceConfig": {
+                    "speakerVoiceConfigs": [
+                        {"speaker": speaker, "voiceConfig": {"prebuiltVoiceConfig": {"voiceName": voice}}}
+                        for speaker, voice in assigned.items()
+                    ]
+                }
+            }
+        return {
+            "contents": [
+                {"parts": [{"text": f"TTS the following conversation between {' and '.join(speakers)}:\n\n{chunk.text}"}]}
+            ],
+            "generationConfig": {
+                "responseModalities": ["AUDIO"],
+                "speechConfig": {"languageCode": language, **speech},
+            },
+        }
+
+
+def build_tts_provider(settings: Settings) -> TTSProvider:
+    if settings.tts_provider == "gemini":
+        return GeminiTTSProvider(
+            settings.gemini_api_key, settings.tts_gemini_model, timeout=settings.tts_request_timeout_seconds
+        )
+    if settings.tts_provider == "fake":
+        return FakeTTSProvider()
+    raise ValueError(f"Unknown TTS provider '{settings.tts_provider}'")
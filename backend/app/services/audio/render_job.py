@@ -0,0 +1,105 @@
+"""``audio_render`` job handler."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from ...schemas.audio import AudioRenderPayload
+from ...schemas.jobs import JobCreate
+from ..jobs.events import JobContext
+from ..script_service import ScriptService
+from ..storage_service import StorageService
+from .encoding import AudioEncoder
+from .providers import SAMPLE_WIDTH_BYTES
+from .renderer import AudioRenderer
+from .wav import WavWriter
+
+# Share of the progress bar spent on synthesis, then on encoding; the rest is the upload.
+_TTS_PERCENT = 80.0
+_ENCODE_PERCENT = 90.0
+
+
+class AudioRenderHandler:
+    """Renders a stored script (or inline segments) to audio and uploads it.
+
+    Audio is streamed chunk by chunk into a temporary WAV file. With an
+    ``encoder`` that file is transcoded (e.g. to MP3) in a worker process. The
+    result is streamed to ``<bucket>/<user_id>/<job_id>.<format>``, so memory use
+    does not grow with the episode's length. The job result holds the path,
+    duration and format for ``POST /podcasts``.
+    """
+
+    def __init__(
+        self,
+        scripts: ScriptService,
+        storage: StorageService,
+        renderer: AudioRenderer,
+        bucket: str,
+        *,
+        encoder: Optional[AudioEncoder] = None,
+    ) -> None:
+        self._scripts = scripts
+        self._storage = storage
+        self._renderer = renderer
+        self._bucket = bucket
+        self._encoder = encoder
+
+    async def __call__(self, job: JobCreate, context: JobContext) -> Dict[str, Any]:
+        request = AudioRenderPayload.model_validate(job.payload)
+        segments, language = request.segments or [], request.language
+        if request.script_id:
+            script = await self._scripts.get_script(context.user_id, request.script_id)
+            segments, language = script.segments, language or script.language
+
+        def on_chunk(done: int, total: int) -> None:
+            context.report(
+                percent=_TTS_PERCENT * done / total,
+                stage="tts",
+                partial={"chunks_done": done, "chunks_total": total},
+            )
+
+        context.report(percent=0, stage="tts")
+        fd, wav_path = tempfile.mkstemp(prefix=f"{context.job_id}_", suffix=".wav")
+        encoded_path = f"{wav_path[:-4]}.{self._encoder.format}" if self._encoder is not None else None
+        try:
+            with os.fdopen(fd, "wb") as file:
+                writer = WavWriter(file, self._renderer.sample_rate)
+
+                async def write(pcm: memoryview) -> None:
+                    await asyncio.to_thread(writer.write, pcm)
+
+                audio = await self._renderer.render_to(
+                    write, segments, request.voices, language or "en", on_chunk=on_chunk
+                )
+                await asyncio.to_thread(writer.close)
+            upload_path, audio_format, content_type = wav_path, "wav", "audio/wav"
+            bitrate_kbps = audio.sample_rate * SAMPLE_WIDTH_BYTES * 8 // 1000
+            if self._encoder is not None:
+                context.report(percent=_TTS_PERCENT, stage="encode")
+                encoded = await self._encoder.encode(wav_path, encoded_path)
+                upload_path, audio_format, content_type = encoded.path, encoded.format, encoded.content_type
+                bitrate_kbps = encoded.bitrate_kbps
+            context.report(percent=_ENCODE_PERCENT, stage="upload")
+            object_path = f"{context.user_id}/{context.job_id}.{audio_format}"
+            # If the job is cancelled or times out from here on, don't leave the object behind.
+            context.add_cleanup(self._storage.remove, self._bucket, [object_path])
+            path = await self._storage.upload_file(self._bucket, object_path, upload_path, content_type)
+        finally:
+            for temporary in (wav_path, encoded_path):
+                if temporary is not None:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(temporary)
+        return {
+            "bucket": self._bucket,
+            "audio_path": path,
+            "duration_seconds": round(audio.duration_seconds, 3),
+            "sample_rate": audio.sample_rate,
+            "format": audio_format,
+            "content_type": content_type,
+            "bitrate_kbps": bitrate_kbps,
+            "chunks": audio.chunks,
+            "cached_chunks": audio.cached_chunks,
+        }
@@ -0,0 +1,206 @@
+"""Render a script to audio with concurrent, chunked TTS requests."""
+from __future__ import annotations
+
+import asyncio
+import io
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Sequence
+
+from ...core.logging import get_logger
+from ...schemas.scripts import ScriptSegment
+from .cache import SegmentCache, segment_cache_key
+from .chunking import SpeechChunk, split_segments
+from .postprocess import AudioPostProcessor
+from .providers import SAMPLE_WIDTH_BYTES, TTSProvider
+from .wav import WavWriter
+
+# Receives the audio of each chunk, in script order.
+PcmSink = Callable[[memoryview], Awaitable[None]]
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RenderSummary:
+    sample_rate: int
+    chunks: int
+    # Chunks whose audio came from the segment cache instead of the provider.
+    cached_chunks: int = 0
+    pcm_bytes: int = 0
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.pcm_bytes / (self.sample_rate * SAMPLE_WIDTH_BYTES)
+
+
+@dataclass
+class RenderedAudio(RenderSummary):
+    """Audio rendered in memory by :meth:`AudioRenderer.render`."""
+
+    pcm: bytes = b""
+
+    def to_wav(self) -> bytes:
+        buffer = io.BytesIO()
+        writer = WavWriter(buffer, self.sample_rate)
+        writer.write(self.pcm)
+        writer.close()
+        return buffer.getvalue()
+
+
+class AudioRenderer:
+    """Splits segments into chunks and synthesizes up to ``concurrency`` at once.
+
+    Chunks finish in any order; :meth:`render_to` hands their audio to a sink in
+    script order as soon as it can, so the episode is never assembled in memory.
+    Synthesis runs at most ``2 * concurrency`` chunks ahead of the sink, which
+    bounds how much audio waits in memory behind a slow chunk. If one chunk fails
+    the others are cancelled and the error propagates.
+
+    With ``postprocess`` each chunk is trimmed, levelled and crossfaded into the
+    previous one on its way to the sink; the cache keeps the provider's audio.
+
+    With a ``cache`` every speaker turn is synthesized on its own and stored under
+    :func:`segment_cache_key`, so re-rendering an edited script only pays for the
+    turns that changed.
+    """
+
+    def __init__(
+        self,
+        provider: TTSProvider,
+        *,
+        max_chunk_chars: int,
+        concurrency: int,
+        cache: Optional[SegmentCache] = None,
+        postprocess: Optional[AudioPostProcessor] = None,
+    ) -> None:
+        self._provider = provider
+        self._max_chunk_chars = max_chunk_chars
+        self._concurrency = max(1, concurrency)
+        self._cache = cache
+        self._postprocess = postprocess
+        self._audio_format = f"pcm_s16le_{provider.sample_rate}"
+
+    @property
+    def sample_rate(self) -> int:
+        return self._provider.sample_rate
+
+    async def render(
+        self,
+        segments: Sequence[ScriptSegment],
+        voices: Mapping[str, str],
+        language: str,
+        on_chunk: Optional[Callable[[int, int], None]] = None,
+    ) -> RenderedAudio:
+        """Synthesize ``segments`` into memory; prefer :meth:`render_to` for whole episodes."""
+
+        pcm = bytearray()
+
+        async def collect(chunk: memoryview) -> None:
+            pcm.extend(chunk)
+
+        summary = await self.render_to(collect, segments, voices, language, on_chunk)
+        return RenderedAudio(**vars(summary), pcm=bytes(pcm))
+
+    async def render_to(
+        self,
+        sink: PcmSink,
+        segments: Sequence[ScriptSegment],
+        voices: Mapping[str, str],
+        language: str,
+        on_chunk: Optional[Callable[[int, int], None]] = None,
+    ) -> RenderSummary:
+        """Synthesize ``segments`` and pass their PCM to ``sink`` in order.
+
+        ``on_chunk(done, total)`` is called as chunks finish.
+        """
+
+        chunks = split_segments(segments, self._max_chunk_chars, one_turn_per_chunk=self._cache is not None)
+        if not chunks:
+            raise ValueError("Script has no text to render")
+        voices = self._assign_voices(segments, voices)
+        slots = asyncio.Semaphore(self._concurrency)
+        # Chunks acquire this in index order and release it once written, so the
+        # next chunk to write always gets a place.
+        window = asyncio.Semaphore(2 * self._concurrency)
+        ready: Dict[int, bytes] = {}
+        summary = RenderSummary(self._provider.sample_rate, len(chunks))
+        stream = self._postprocess.stream() if self._postprocess is not None else None
+        next_index = done = 0
+        writing = False
+
+        async def write_ready() -> None:
+            # Only one task writes; it picks up chunks that finish while it awaits
+            # the sink, so the others return at once instead of holding their audio.
+            nonlocal next_index, writing
+            if writing:
+                return
+            writing = True
+            try:
+                while next_index in ready:
+                    pcm = memoryview(ready.pop(next_index))
+                    if stream is not None:
+                        pcm = await asyncio.to_thread(stream.process, pcm)
+                    await sink(pcm)
+                    summary.pcm_bytes += pcm.nbytes
+                    next_index += 1
+                    window.release()
+                    del pcm
+            finally:
+                writing = False
+
+        async def synthesize(chunk: SpeechChunk) -> None:
+            nonlocal done
+            await window.acquire()
+            key = self._cache_key(chunk, voices, language)
+            pcm = await self._cache.get(key) if key else None
+            if pcm is None:
+                async with slots:
+                    pcm = await self._provider.synthesize(chunk, voices, language)
+                if key:
+                    await self._cache.put(key, pcm)  # type: ignore[union-attr]
+            else:
+                summary.cached_chunks += 1
+            ready[chunk.index] = pcm
+            del pcm
+            done += 1
+            if on_chunk is not None:
+                on_chunk(done, len(chunks))
+            await write_ready()
+
+        tasks = [asyncio.ensure_future(synthesize(chunk)) for chunk in chunks]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if stream is not None:
+            tail = stream.finish()
+            await sink(tail)
+            summary.pcm_bytes += tail.nbytes
+        if self._cache is not None:
+            logger.info("Rendered script", chunks=len(chunks), cached_chunks=summary.cached_chunks)
+        return summary
+
+    def _assign_voices(self, segments: Sequence[ScriptSegment], voices: Mapping[str, str]) -> Dict[str, str]:
+        """Give every speaker a voice, in order of first appearance, so it stays the same in every chunk."""
+
+        defaults = self._provider.default_voices
+        speakers = list(dict.fromkeys(segment.speaker for segment in segments))
+        return {
+            speaker: voices.get(speaker) or defaults[index % len(defaults)] for index, speaker in enumerate(speakers)
+        }
+
+    def _cache_key(self, chunk: SpeechChunk, voices: Mapping[str, str], language: str) -> Optional[str]:
+        if self._cache is None:
+            return None
+        (turn,) = chunk.segments
+        return segment_cache_key(
+            self._provider.name,
+            self._provider.model,
+            voices[turn.speaker],
+            # The language changes pronunciation, so it is part of the text being spoken.
+            f"{language}\n{turn.content}",
+            self._audio_format,
+        )
@@ -0,0 +1,81 @@
+"""Streaming WAV (RIFF, 16-bit PCM) writer."""
+from __future__ import annotations
+
+import struct
+from typing import BinaryIO, Optional, Union
+
+from .providers import SAMPLE_WIDTH_BYTES
+
+HEADER_BYTES = 44
+# The RIFF size fields are 32-bit and count everything after the first 8 bytes.
+MAX_DATA_BYTES = 0xFFFFFFFF - (HEADER_BYTES - 8)
+
+
+def wav_header(data_bytes: int, sample_rate: int, channels: int = 1, sample_width: int = SAMPLE_WIDTH_BYTES) -> bytes:
+    """The 44-byte header of a PCM WAV file with ``data_bytes`` of samples."""
+
+    if not 0 <= data_bytes <= MAX_DATA_BYTES:
+        raise ValueError(f"WAV data must be between 0 and {MAX_DATA_BYTES} bytes, got {data_bytes}")
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        HEADER_BYTES - 8 + data_bytes,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        sample_width * 8,
+        b"data",
+        data_bytes,
+    )
+
+
+class WavWriter:
+    """Writes PCM to ``file`` as it arrives instead of assembling the episode in memory.
+
+    The header goes out first. On a seekable file its size fields are patched by
+    :meth:`close`; for a stream that cannot seek, pass the final ``data_bytes`` up
+    front. Chunks are written through ``memoryview``s, so nothing is copied or kept.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        sample_rate: int,
+        *,
+        channels: int = 1,
+        sample_width: int = SAMPLE_WIDTH_BYTES,
+        data_bytes: Optional[int] = None,
+    ) -> None:
+        if data_bytes is None and not file.seekable():
+            raise ValueError("WavWriter needs a seekable file unless data_bytes is known up front")
+        self._file = file
+        self._format = (sample_rate, channels, sample_width)
+        self._expected = data_bytes
+        self._start = file.tell() if file.seekable() else 0
+        self.data_bytes = 0
+        file.write(wav_header(data_bytes or 0, *self._format))
+
+    def write(self, pcm: Union[bytes, bytearray, memoryview]) -> None:
+        view = memoryview(pcm).cast("B")
+        if self.data_bytes + view.nbytes > (self._expected if self._expected is not None else MAX_DATA_BYTES):
+            raise ValueError("PCM exceeds the size of the WAV data chunk")
+        self._file.write(view)
+        self.data_bytes += view.nbytes
+
+    def close(self) -> None:
+        """Finish the header; the caller still owns (and closes) the file."""
+
+        if self._expected is not None:
+            if self.data_bytes != self._expected:
+                raise ValueError(f"Expected {self._expected} bytes of PCM, got {self.data_bytes}")
+            return
+        end = self._file.tell()
+        self._file.seek(self._start)
+        self._file.write(wav_header(self.data_bytes, *self._format))
+        self._file.seek(end)
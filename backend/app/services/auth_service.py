@@ -1,16 +1,19 @@
 """Service for interacting with Supabase Auth."""
 from __future__ import annotations
 
+import asyncio
 import json
 from datetime import UTC, datetime, timedelta
-from typing import Any, Dict, Optional
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
 
 import httpx
 from fastapi import HTTPException, status
 
-from ..core.config import Settings
+from ..core.config import Settings, get_settings
 from ..core.database import SupabaseAsyncClient
 from ..core.logging import get_logger
+from ..core.security import InvalidTokenError, TokenVerifier
 from ..schemas.auth import (
     AccountDeletionStatus,
     AuthMethod,
@@ -23,17 +26,72 @@ from ..schemas.auth import (
     UserProfile,
     VerifyTokenResponse,
 )
+from ..utils.cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+PROFILE_BUNDLE_RPC = "get_profile_bundle"
+
+T = TypeVar("T")
+
+
+def _new_profile_cache(settings: Settings) -> TTLCache[UserProfile]:
+    return TTLCache(
+        max_entries=settings.profile_cache_max_entries,
+        ttl_seconds=settings.profile_cache_ttl_seconds,
+    )
+
+
+def _latency_budget(flow: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Fail a flow with 504 once it exceeds ``Settings.auth_flow_budgets_seconds[flow]``.
+
+    Only for reads and profile hydration: a write abandoned mid-flight may still
+    commit, and the client would retry a non-idempotent request on the 504.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(func)
+        async def wrapper(self: "AuthService", *args: Any, **kwargs: Any) -> T:
+            budget = self._settings.auth_flow_budgets_seconds.get(flow)
+            if not budget:
+                return await func(self, *args, **kwargs)
+            try:
+                async with asyncio.timeout(budget):
+                    return await func(self, *args, **kwargs)
+            except TimeoutError as exc:
+                logger.warning("Auth flow exceeded its latency budget", flow=flow, budget_seconds=budget)
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="Authentication service timed out",
+                ) from exc
+
+        return wrapper
+
+    return decorator
+
+
+@lru_cache
+def get_profile_cache() -> TTLCache[UserProfile]:
+    """Return the process-wide cache of hydrated user profiles keyed by user id."""
+
+    return _new_profile_cache(get_settings())
+
 
 class AuthService:
     """Wrapper around Supabase Auth REST endpoints."""
 
-    def __init__(self, client: SupabaseAsyncClient, settings: Settings) -> None:
+    def __init__(
+        self,
+        client: SupabaseAsyncClient,
+        settings: Settings,
+        token_verifier: Optional[TokenVerifier] = None,
+        profile_cache: Optional[TTLCache[UserProfile]] = None,
+    ) -> None:
         self._client = client
         self._settings = settings
+        self._token_verifier = token_verifier or TokenVerifier(settings)
+        self._profile_cache = profile_cache if profile_cache is not None else _new_profile_cache(settings)
 
     async def sign_up(self, payload: SignUpRequest) -> AuthResponse:
         metadata: Dict[str, Any] = {}
@@ -66,6 +124,7 @@ class AuthService:
         await self._ensure_profile_row(user["id"], payload.full_name)
         return await self._build_auth_response(data)
 
+    @_latency_budget("sign_in")
     async def sign_in(self, payload: SignInRequest) -> AuthResponse:
         if payload.method is AuthMethod.EMAIL:
             credentials = {"email": payload.email, "password": payload.password}
@@ -92,11 +151,31 @@ class AuthService:
             self._handle_auth_http_error(exc, "Unable to complete sign in")
         data = response.json()
 
-        auth_response = await self._build_auth_response(data)
-        await self.cancel_pending_deletion(auth_response.user.id)
-        return auth_response
+        user_id = data.get("user", data)["id"]
+        auth_response, remaining_deletion = await asyncio.gather(
+            self._build_auth_response(data),
+            self.cancel_pending_deletion(user_id),
+        )
+        # The profile may have been hydrated before the cancellation landed.
+        # Copy rather than mutate: the profile may be the instance other requests get from the cache.
+        user = auth_response.user.model_copy(update={"pending_account_deletion": remaining_deletion})
+        self._profile_cache.set(user_id, user)
+        return auth_response.model_copy(update={"user": user})
 
+    @_latency_budget("verify_token")
     async def verify_access_token(self, token: str) -> VerifyTokenResponse:
+        if self._settings.auth_token_verification == "local":
+            try:
+                claims = await self._token_verifier.verify(token, self._client.auth)
+            except InvalidTokenError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
+                ) from exc
+            # Phone-only users carry no email claim; let Supabase resolve those.
+            if claims is not None and claims.get("email"):
+                user = await self._build_user_profile(self._auth_user_from_claims(claims))
+                return VerifyTokenResponse(user=user)
+
         response = await self._client.auth.get(
             "/user",
             headers={
@@ -111,11 +190,12 @@ class AuthService:
         user = await self._build_user_profile(data.get("user", data))
         return VerifyTokenResponse(user=user)
 
+    @_latency_budget("profile")
     async def get_user_by_id(self, user_id: str) -> UserProfile:
         """Fetch the latest profile details for the given user identifier."""
 
-        auth_user = await self._fetch_auth_user(user_id)
-        return await self._build_user_profile(auth_user)
+        self._profile_cache.invalidate(user_id)
+        return await self._load_user_profile(user_id)
 
     async def update_profile(self, user_id: str, updates: ProfileUpdateRequest) -> UserProfile:
         payload: Dict[str, Any] = {"updated_at": datetime.now(UTC).isoformat()}
@@ -142,8 +222,8 @@ class AuthService:
                 },
             )
 
-        auth_user = await self._fetch_auth_user(user_id)
-        return await self._build_user_profile(auth_user)
+        self._profile_cache.invalidate(user_id)
+        return await self._load_user_profile(user_id)
 
     async def submit_onboarding(self, user_id: str, submission: OnboardingSubmission) -> UserProfile:
         completed_at = submission.completed_at
@@ -168,6 +248,23 @@ class AuthService:
             "completed_at": completed_at_utc.isoformat(),
         }
 
+        # The audit insert and the profile update are independent.
+        await asyncio.gather(
+            self._persist_onboarding_responses(user_id, onboarding_payload),
+            self._client.update(
+                "profiles",
+                {
+                    "onboarding_completed": True,
+                    "updated_at": datetime.now(UTC).isoformat(),
+                    "preferences": preferences,
+                },
+                filters={"id": f"eq.{user_id}"},
+            ),
+        )
+        self._profile_cache.invalidate(user_id)
+        return await self._load_user_profile(user_id)
+
+    async def _persist_onboarding_responses(self, user_id: str, onboarding_payload: Dict[str, Any]) -> None:
         try:
             await self._client.insert("onboarding_responses", onboarding_payload)
         except httpx.HTTPError as exc:
@@ -177,18 +274,6 @@ class AuthService:
                 error=str(exc),
             )
 
-        await self._client.update(
-            "profiles",
-            {
-                "onboarding_completed": True,
-                "updated_at": datetime.now(UTC).isoformat(),
-                "preferences": preferences,
-            },
-            filters={"id": f"eq.{user_id}"},
-        )
-        auth_user = await self._fetch_auth_user(user_id)
-        return await self._build_user_profile(auth_user)
-
     async def schedule_account_deletion(self, user_id: str) -> AccountDeletionStatus:
         now = datetime.now(UTC)
         scheduled_for = now + timedelta(days=30)
@@ -213,6 +298,7 @@ class AuthService:
                 },
             )
 
+        self._profile_cache.invalidate(user_id)
         return await self._get_active_deletion_request(user_id) or AccountDeletionStatus(
             scheduled_for=scheduled_for,
             requested_at=now,
@@ -232,9 +318,25 @@ class AuthService:
                 "completed_at": "is.null",
             },
         )
-        return await self._get_active_deletion_request(user_id)
+        self._profile_cache.invalidate(user_id)
+        # Every active request matched the update above, so none remain.
+        return None
 
     async def sign_out(self, access_token: str) -> None:
+        """Sign the session out with Supabase, then reject its access token locally too.
+
+        Only a token that verifies locally is revoked, and only once Supabase has
+        accepted the logout; otherwise a forged token could sign out someone else's
+        session. Tokens that cannot be verified locally are checked by Supabase on
+        every request, so they need no local revocation.
+        """
+
+        try:
+            claims = await self._token_verifier.verify(access_token, self._client.auth)
+        except InvalidTokenError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
+            ) from exc
         response = await self._client.auth.post(
             "/logout",
             headers={
@@ -244,6 +346,8 @@ class AuthService:
         )
         if response.status_code not in (status.HTTP_200_OK, status.HTTP_204_NO_CONTENT):
             response.raise_for_status()
+        if claims is not None:
+            await self._token_verifier.revoke(claims)
 
     async def _build_auth_response(self, data: Dict[str, Any]) -> AuthResponse:
         user_data = data.get("user", data)
@@ -258,22 +362,79 @@ class AuthService:
 
     async def _build_user_profile(self, data: Dict[str, Any]) -> UserProfile:
         auth_user = self._parse_auth_user(data)
-        profile_row = await self._ensure_profile_row(auth_user["id"], auth_user.get("full_name"))
-        deletion_status = await self._get_active_deletion_request(auth_user["id"])
-        preferences = profile_row.get("preferences")
+        cached = self._profile_cache.get(auth_user["id"])
+        if cached is not None:
+            return cached
+
+        generation = self._profile_cache.generation()
+        profile_row, deletion_status = await asyncio.gather(
+            self._ensure_profile_row(auth_user["id"], auth_user.get("full_name")),
+            self._get_active_deletion_request(auth_user["id"]),
+        )
+        return self._compose_user_profile(auth_user, profile_row, deletion_status, generation)
+
+    async def _load_user_profile(self, user_id: str) -> UserProfile:
+        """Hydrate a profile, preferring the single round trip ``get_profile_bundle`` RPC.
+
+        Falls back to querying the auth user, profile row and deletion request
+        separately when the RPC is disabled or fails (e.g. not yet deployed).
+        """
+
+        if self._settings.auth_profile_bundle_rpc:
+            generation = self._profile_cache.generation()
+            try:
+                bundle = await self._client.rpc(
+                    PROFILE_BUNDLE_RPC, payload={"p_user_id": user_id}, idempotent=True
+                )
+            except httpx.HTTPError as exc:
+                logger.warning(
+                    "Profile bundle RPC failed, falling back to separate queries",
+                    user_id=user_id,
+                    error=str(exc),
+                )
+            else:
+                if not bundle or not bundle.get("user"):
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+                return await self._profile_from_bundle(bundle, generation)
+
+        auth_user = await self._fetch_auth_user(user_id)
+        return await self._build_user_profile(auth_user)
 
-        return UserProfile(
+    async def _profile_from_bundle(self, bundle: Dict[str, Any], generation: int) -> UserProfile:
+        auth_user = self._parse_auth_user(bundle["user"])
+        profile_row = bundle.get("profile") or await self._ensure_profile_row(
+            auth_user["id"], auth_user.get("full_name")
+        )
+        deletion_row = bundle.get("deletion_request")
+        deletion_status = self._parse_deletion_request(deletion_row) if deletion_row else None
+        return self._compose_user_profile(auth_user, profile_row, deletion_status, generation)
+
+    def _compose_user_profile(
+        self,
+        auth_user: Dict[str, Any],
+        profile_row: Dict[str, Any],
+        deletion_status: Optional[AccountDeletionStatus],
+        generation: int,
+    ) -> UserProfile:
+        """Build the profile and cache it, unless it was invalidated since ``generation``."""
+
+        preferences = profile_row.get("preferences")
+        profile = UserProfile(
             id=auth_user["id"],
             email=auth_user["email"],
             full_name=profile_row.get("full_name") or auth_user.get("full_name"),
-            created_at=self._parse_datetime(auth_user.get("created_at")),
+            # Token claims carry no creation date; the profile row is created alongside the user.
+            created_at=self._parse_datetime(auth_user.get("created_at") or profile_row.get("created_at")),
             last_sign_in_at=self._parse_datetime(auth_user.get("last_sign_in_at")),
             avatar_url=profile_row.get("avatar_url"),
             bio=profile_row.get("bio"),
             preferences=preferences if isinstance(preferences, dict) else None,
             onboarding_completed=bool(profile_row.get("onboarding_completed")),
             pending_account_deletion=deletion_status,
+            plan=auth_user.get("plan"),
         )
+        self._profile_cache.set(auth_user["id"], profile, generation)
+        return profile
 
     async def _merge_onboarding_preferences(
         self, user_id: str, onboarding_preferences: Dict[str, Any]
@@ -319,15 +480,7 @@ class AuthService:
         )
         if not rows:
             return None
-
-        row = rows[0]
-        status = AccountDeletionStatus(
-            scheduled_for=self._parse_datetime(row.get("scheduled_for")),
-            requested_at=self._parse_datetime(row.get("requested_at")),
-            cancelled_at=self._parse_datetime(row.get("cancelled_at")),
-            completed_at=self._parse_datetime(row.get("completed_at")),
-        )
-        return status
+        return self._parse_deletion_request(rows[0])
 
     async def _fetch_auth_user(self, user_id: str) -> Dict[str, Any]:
         response = await self._client.rest.get(
@@ -343,14 +496,47 @@ class AuthService:
     @staticmethod
     def _parse_auth_user(data: Dict[str, Any]) -> Dict[str, Any]:
         user_metadata: Dict[str, Any] = data.get("user_metadata") or {}
+        app_metadata: Dict[str, Any] = data.get("app_metadata") or {}
         return {
             "id": data["id"],
             "email": data["email"],
             "full_name": user_metadata.get("full_name") or user_metadata.get("fullName"),
+            # Users can edit user_metadata themselves, so the plan is only read from app_metadata.
+            "plan": app_metadata.get("plan"),
             "created_at": data.get("created_at"),
             "last_sign_in_at": data.get("last_sign_in_at"),
         }
 
+    @classmethod
+    def _parse_deletion_request(cls, row: Dict[str, Any]) -> AccountDeletionStatus:
+        return AccountDeletionStatus(
+            scheduled_for=cls._parse_datetime(row.get("scheduled_for")),
+            requested_at=cls._parse_datetime(row.get("requested_at")),
+            cancelled_at=cls._parse_datetime(row.get("cancelled_at")),
+            completed_at=cls._parse_datetime(row.get("completed_at")),
+        )
+
+    @staticmethod
+    def _auth_user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape verified JWT claims like a Supabase ``/user`` payload."""
+
+        sign_in_timestamps = [
+            entry["timestamp"]
+            for entry in claims.get("amr") or []
+            if isinstance(entry, dict) and entry.get("timestamp")
+        ]
+        last_sign_in_at = (
+            datetime.fromtimestamp(max(sign_in_timestamps), UTC).isoformat() if sign_in_timestamps else None
+        )
+        return {
+            "id": claims["sub"],
+            "email": claims["email"],
+            "user_metadata": claims.get("user_metadata") or {},
+            "app_metadata": claims.get("app_metadata") or {},
+            "created_at": None,
+            "last_sign_in_at": last_sign_in_at,
+        }
+
     @staticmethod
     def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
         if not value:
@@ -1,14 +1,24 @@
 """Content ingestion services."""
 from __future__ import annotations
 
-from typing import List
+from typing import Optional, Union
 
 from fastapi import HTTPException, status
 
 from ..core.database import SupabaseAsyncClient
-from ..schemas.content import ScrapedContentCreate, ScrapedContentList, ScrapedContentResponse
+from ..schemas.common import CountMode, ListView
+from ..schemas.content import (
+    ScrapedContentCreate,
+    ScrapedContentList,
+    ScrapedContentResponse,
+    ScrapedContentSummary,
+    ScrapedContentSummaryList,
+)
+from ..utils.pagination import fetch_page, next_cursor
 
 SCRAPED_CONTENT_TABLE = "scraped_content"
+# Everything except the article body, which dominates the row size.
+SUMMARY_COLUMNS = ",".join(ScrapedContentSummary.model_fields)
 
 
 class ContentService:
@@ -27,16 +37,32 @@ class ContentService:
         response = await self._client.insert(SCRAPED_CONTENT_TABLE, record)
         return ScrapedContentResponse(**response[0])
 
-    async def list_scraped_content(self, user_id: str, limit: int = 20, offset: int = 0) -> ScrapedContentList:
-        response = await self._client.select(
+    async def list_scraped_content(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = "exact",
+        view: ListView = "full",
+    ) -> Union[ScrapedContentList, ScrapedContentSummaryList]:
+        page = await fetch_page(
+            self._client,
             SCRAPED_CONTENT_TABLE,
-            filters={"user_id": f"eq.{user_id}"},
-            order="created_at.desc",
+            {"user_id": f"eq.{user_id}"},
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            count=count,
+            columns=SUMMARY_COLUMNS if view == "summary" else "*",
         )
-        items = [ScrapedContentResponse(**item) for item in response]
-        return ScrapedContentList(items=items, total=len(items))
+        if view == "summary":
+            summaries = [ScrapedContentSummary(**item) for item in page.rows]
+            return ScrapedContentSummaryList(
+                items=summaries, total=page.total, next_cursor=next_cursor(summaries, limit)
+            )
+        items = [ScrapedContentResponse(**item) for item in page.rows]
+        return ScrapedContentList(items=items, total=page.total, next_cursor=next_cursor(items, limit))
 
     async def get_scraped_content(self, user_id: str, content_id: str) -> ScrapedContentResponse:
         response = await self._client.select(
@@ -1,3 +1,18 @@
-from .job_manager import JobManager, JOBS_TABLE
+from .executors import PayloadTooLargeError, ProcessJobError
+from .job_manager import IdempotencyKeyReusedError, JobManager, JOBS_TABLE
+from .pool import JobQueueFullError, WorkerPool
+from .queue import LeaseQueue
+from .retry import JobRetryPolicy, RetryableJobError
 
-__all__ = ["JobManager", "JOBS_TABLE"]
+__all__ = [
+    "IdempotencyKeyReusedError",
+    "JobManager",
+    "JOBS_TABLE",
+    "JobQueueFullError",
+    "JobRetryPolicy",
+    "LeaseQueue",
+    "PayloadTooLargeError",
+    "ProcessJobError",
+    "RetryableJobError",
+    "WorkerPool",
+]
@@ -0,0 +1,182 @@
+"""In-process pub/sub for job status and progress events."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ...core.logging import get_logger
+from ...schemas.jobs import JobCreate, JobEvent, JobStatus
+
+TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled", "timed_out", "dead_letter"})
+
+logger = get_logger(__name__)
+
+
+def status_event(job: JobStatus) -> JobEvent:
+    """Event describing the stored state of ``job``, sent first to new subscribers."""
+
+    return JobEvent(job_id=job.id, event="status", status=job.status, error=job.error, result=job.result)
+
+
+class Subscription:
+    """Bounded queue of events for one subscriber.
+
+    A slow consumer never blocks the publisher: when the queue is full the oldest
+    event is dropped, so the subscriber always ends up with the latest state.
+    """
+
+    def __init__(self, user_id: str, job_id: Optional[str], max_events: int) -> None:
+        self.user_id = user_id
+        self.job_id = job_id
+        self.dropped = 0
+        self._queue: asyncio.Queue[JobEvent] = asyncio.Queue(maxsize=max_events)
+
+    def matches(self, job_id: str) -> bool:
+        return self.job_id is None or self.job_id == job_id
+
+    def put(self, event: JobEvent) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[JobEvent]:
+        """Next event, or ``None`` if none arrives within ``timeout`` seconds."""
+
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class JobEventBus:
+    """Fans job events out to the subscribers of the job's owner.
+
+    Only events published in this process are delivered; with the durable queue a
+    job may run in another worker, so readers should still fall back to the table.
+    ``publish`` must be called on the event loop; use :class:`JobContext` from
+    handler threads.
+    """
+
+    def __init__(self, max_events_per_subscriber: int = 100) -> None:
+        self._max_events = max_events_per_subscriber
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, user_id: str, event: JobEvent) -> None:
+        for subscription in self._subscribers.get(user_id, ()):
+            if subscription.matches(event.job_id):
+                subscription.put(event)
+
+    def open(self, user_id: str, job_id: Optional[str] = None) -> Subscription:
+        """Subscribe to ``user_id``'s events, optionally only those of ``job_id``; pair with :meth:`close`."""
+
+        subscription = Subscription(user_id, job_id, self._max_events)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def close(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    @contextlib.contextmanager
+    def subscribe(self, user_id: str, job_id: Optional[str] = None) -> Iterator[Subscription]:
+        subscription = self.open(user_id, job_id)
+        try:
+            yield subscription
+        finally:
+            self.close(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "dropped_events": sum(sub.dropped for subs in self._subscribers.values() for sub in subs),
+        }
+
+
+class JobContext:
+    """Handed to handlers that accept a second argument.
+
+    Handlers report progress with :meth:`report`, check :meth:`remaining` and
+    :meth:`is_cancelled` to stop cooperatively (a ``thread`` handler cannot be
+    interrupted otherwise), and register clean-up of partial artifacts with
+    :meth:`add_cleanup`; those callbacks run if the job does not succeed.
+    Everything may be called from the event loop or from a ``thread`` handler;
+    ``process`` handlers receive a stand-in that forwards to this object.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        user_id: str,
+        job: JobCreate,
+        bus: JobEventBus,
+        on_progress: Optional[Callable[[JobEvent], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.job_id = job_id
+        self.user_id = user_id
+        self.job = job
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._bus = bus
+        self._on_progress = on_progress
+        self._cancelled = threading.Event()
+        self._cleanups: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = []
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the job's deadline, or ``None`` without a deadline."""
+
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def add_cleanup(self, callback: Callable[..., Any], *args: Any) -> None:
+        """Call ``callback(*args)`` if the job does not succeed.
+
+        Coroutine functions are awaited on the event loop; plain functions run in a
+        worker thread, so they may block (e.g. ``os.remove``) but must be thread-safe.
+        """
+
+        self._cleanups.append((callback, args))
+
+    async def run_cleanups(self) -> None:
+        while self._cleanups:
+            callback, args = self._cleanups.pop()
+            try:
+                if inspect.iscoroutinefunction(callback):
+                    await callback(*args)
+                else:
+                    await asyncio.to_thread(callback, *args)
+            except Exception as exc:
+                logger.warning("Job cleanup failed", job_id=self.job_id, error=repr(exc))
+
+    def report(
+        self,
+        percent: Optional[float] = None,
+        stage: Optional[str] = None,
+        partial: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if percent is not None:
+            percent = min(100.0, max(0.0, float(percent)))
+        event = JobEvent(job_id=self.job_id, event="progress", percent=percent, stage=stage, partial=partial)
+        if threading.get_ident() == self._loop_thread:
+            self._emit(event)
+        else:
+            self._loop.call_soon_threadsafe(self._emit, event)
+
+    def _emit(self, event: JobEvent) -> None:
+        self._bus.publish(self.user_id, event)
+        if self._on_progress is not None:
+            self._on_progress(event)
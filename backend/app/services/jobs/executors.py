@@ -0,0 +1,322 @@
+"""Where job handlers run: on the event loop, in a thread, or in a worker process."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import multiprocessing
+import os
+import pickle
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+from ...core.logging import get_logger
+from ...schemas.jobs import JobCreate
+from .events import JobContext
+from .retry import JobRetryPolicy
+
+ExecutorKind = Literal["async", "thread", "process"]
+
+logger = get_logger(__name__)
+
+
+class PayloadTooLargeError(ValueError):
+    """Raised when a job's pickled arguments or result exceed the process pool limit."""
+
+
+class ProcessJobError(RuntimeError):
+    """Raised when a handler running in a worker process fails or the process dies.
+
+    If the handler's exception could be pickled it is the ``__cause__``.
+    """
+
+
+@dataclass
+class HandlerSpec:
+    handler: Callable[..., Any]
+    executor: ExecutorKind = "async"
+    # Handlers taking a second positional argument receive a JobContext.
+    wants_context: bool = False
+    # Part of the job fingerprint: bump it when the handler's output changes.
+    version: str = "1"
+    # Reuse the result of an identical job submitted within this many seconds (None: never).
+    cache_ttl: Optional[float] = None
+    # Deadline in seconds; None falls back to the job type's configured timeout.
+    timeout: Optional[float] = None
+    # None falls back to the manager's default policy.
+    retry: Optional[JobRetryPolicy] = None
+
+    @classmethod
+    def for_handler(
+        cls,
+        handler: Callable[..., Any],
+        executor: ExecutorKind = "async",
+        *,
+        version: str = "1",
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[JobRetryPolicy] = None,
+    ) -> "HandlerSpec":
+        positional = [
+            param
+            for param in inspect.signature(handler).parameters.values()
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+        ]
+        return cls(
+            handler,
+            executor,
+            wants_context=len(positional) >= 2,
+            version=version,
+            cache_ttl=cache_ttl,
+            timeout=timeout,
+            retry=retry,
+        )
+
+
+class _WorkerContext:
+    """Stand-in for :class:`JobContext` inside a worker process; calls go over the pipe.
+
+    A cancelled or timed-out process job is terminated rather than asked to stop,
+    so :meth:`is_cancelled` is always false here. Cleanup callbacks must be picklable.
+    """
+
+    def __init__(
+        self, conn: Connection, job_id: str, user_id: str, remaining: Optional[float], job: JobCreate
+    ) -> None:
+        self.job_id = job_id
+        self.user_id = user_id
+        self.job = job
+        self.deadline = None if remaining is None else time.monotonic() + remaining
+        self._conn = conn
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def is_cancelled(self) -> bool:
+        return False
+
+    def add_cleanup(self, callback: Callable[..., Any], *args: Any) -> None:
+        self._conn.send_bytes(pickle.dumps(("cleanup", (callback, args))))
+
+    def report(
+        self,
+        percent: Optional[float] = None,
+        stage: Optional[str] = None,
+        partial: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._conn.send_bytes(pickle.dumps(("progress", {"percent": percent, "stage": stage, "partial": partial})))
+
+
+def _portable(exc: BaseException) -> Optional[BaseException]:
+    """``exc`` if it survives pickling, so the parent can see what the handler raised."""
+
+    try:
+        pickle.loads(pickle.dumps(exc))
+    except Exception:
+        return None
+    return exc
+
+
+def _process_worker_main(conn: Connection, max_result_bytes: int) -> None:
+    """Worker process loop: run pickled ``(handler, job, context)`` tuples until told to stop."""
+
+    if hasattr(os, "setpgid"):
+        # Lead a process group, so killing the worker also stops subprocesses a
+        # handler started (e.g. ffmpeg).
+        os.setpgid(0, 0)
+    while True:
+        try:
+            data = conn.recv_bytes()
+        except EOFError:
+            return
+        if not data:
+            return
+        try:
+            handler, job, context_ids = pickle.loads(data)
+            args = (job,) if context_ids is None else (job, _WorkerContext(conn, *context_ids, job))
+            reply = pickle.dumps(("result", True, handler(*args), None))
+            if len(reply) > max_result_bytes:
+                reply = pickle.dumps(("result", False, f"PayloadTooLargeError: result is {len(reply)} bytes", None))
+        except Exception as exc:
+            reply = pickle.dumps(("result", False, f"{type(exc).__name__}: {exc}", _portable(exc)))
+        conn.send_bytes(reply)
+
+
+class _ProcessWorker:
+    def __init__(self, context: Any, max_payload_bytes: int) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_process_worker_main, args=(child_conn, max_payload_bytes), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)  # type: ignore[attr-defined]
+        except (AttributeError, ProcessLookupError, PermissionError):
+            # No killpg (Windows), or the worker has not made its group yet.
+            self.process.terminate()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ProcessJobPool:
+    """Fixed set of warm worker processes, each running one job at a time.
+
+    Unlike ``ProcessPoolExecutor`` a job can be cancelled while it runs: its worker
+    is terminated and replaced, leaving the other workers untouched. Handlers must
+    be picklable (module-level functions) and take the ``JobCreate``.
+    """
+
+    def __init__(self, workers: int, max_payload_bytes: int, start_method: str = "spawn") -> None:
+        self._size = workers
+        self._max_payload_bytes = max_payload_bytes
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: Optional[asyncio.Queue[_ProcessWorker]] = None
+        self._workers: List[_ProcessWorker] = []
+        self._starting: Optional[asyncio.Task[None]] = None
+        self._closing = False
+
+    async def start(self) -> None:
+        if self._starting is None:
+            self._closing = False
+            self._starting = asyncio.ensure_future(self._spawn_all())
+        await asyncio.shield(self._starting)
+
+    async def _spawn_all(self) -> None:
+        self._idle = asyncio.Queue()
+        for _ in range(self._size):
+            # Process start-up (interpreter boot and imports under "spawn") happens
+            # here, once, instead of on the first job.
+            worker = await asyncio.to_thread(_ProcessWorker, self._context, self._max_payload_bytes)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    async def run(
+        self, handler: Callable[..., Any], job: JobCreate, context: Optional[JobContext] = None
+    ) -> Any:
+        context_ids: Optional[Tuple[str, str, Optional[float]]] = (
+            None if context is None else (context.job_id, context.user_id, context.remaining())
+        )
+        data = pickle.dumps((handler, job, context_ids))
+        if len(data) > self._max_payload_bytes:
+            raise PayloadTooLargeError(
+                f"Job payload is {len(data)} bytes; the process pool accepts at most {self._max_payload_bytes}"
+            )
+        await self.start()
+        assert self._idle is not None
+        worker = await self._idle.get()
+        try:
+            await asyncio.to_thread(worker.conn.send_bytes, data)
+            while True:
+                message = pickle.loads(await asyncio.to_thread(worker.conn.recv_bytes))
+                if message[0] == "result":
+                    break
+                if context is None:
+                    continue
+                if message[0] == "progress":
+                    context.report(**message[1])
+                elif message[0] == "cleanup":
+                    callback, args = message[1]
+                    context.add_cleanup(callback, *args)
+        except asyncio.CancelledError:
+            # The handler may still be running; the only way to stop it is to stop its process.
+            await self._replace(worker)
+            raise
+        except (EOFError, OSError) as exc:
+            await self._replace(worker)
+            raise ProcessJobError(f"Worker process exited while running the job: {exc!r}") from exc
+        self._idle.put_nowait(worker)
+        _, ok, value, cause = message
+        if not ok:
+            raise ProcessJobError(value) from cause
+        return value
+
+    async def _replace(self, worker: _ProcessWorker) -> None:
+        await asyncio.to_thread(worker.kill)
+        if self._closing:
+            return
+        logger.info("Replacing job worker process", pid=worker.process.pid)
+        replacement = await asyncio.to_thread(_ProcessWorker, self._context, self._max_payload_bytes)
+        self._workers[self._workers.index(worker)] = replacement
+        assert self._idle is not None
+        self._idle.put_nowait(replacement)
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._starting is not None:
+            with contextlib.suppress(Exception):
+                await self._starting
+        for worker in self._workers:
+            with contextlib.suppress(OSError):
+                worker.conn.send_bytes(b"")
+        await asyncio.gather(*(asyncio.to_thread(worker.kill) for worker in self._workers))
+        self._workers = []
+        self._idle = None
+        self._starting = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": len(self._workers),
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+        }
+
+
+class JobExecutors:
+    """Runs handlers according to their :data:`ExecutorKind`.
+
+    ``async`` handlers are awaited on the event loop. ``thread`` handlers are plain
+    functions run in a dedicated thread pool, so blocking I/O does not stall the
+    loop; a cancelled thread job's result is discarded but the thread finishes it.
+    ``process`` handlers run in :class:`ProcessJobPool` for CPU-bound work.
+    """
+
+    def __init__(
+        self,
+        *,
+        thread_workers: int,
+        process_workers: int,
+        process_max_payload_bytes: int,
+        process_start_method: str = "spawn",
+    ) -> None:
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="job-handler")
+        self._processes = ProcessJobPool(process_workers, process_max_payload_bytes, process_start_method)
+        self._process_used = False
+
+    async def start(self, specs: List[HandlerSpec]) -> None:
+        if any(spec.executor == "process" for spec in specs):
+            self._process_used = True
+            await self._processes.start()
+
+    async def run(self, spec: HandlerSpec, job: JobCreate, context: JobContext, timeout: Optional[float] = None) -> Any:
+        """Run the handler; past ``timeout`` seconds it is cancelled and ``TimeoutError`` raised."""
+
+        return await asyncio.wait_for(self._run(spec, job, context), timeout)
+
+    async def _run(self, spec: HandlerSpec, job: JobCreate, context: JobContext) -> Any:
+        if spec.executor == "process":
+            self._process_used = True
+            return await self._processes.run(spec.handler, job, context if spec.wants_context else None)
+        args = (job, context) if spec.wants_context else (job,)
+        if spec.executor == "thread":
+            return await asyncio.get_running_loop().run_in_executor(self._threads, spec.handler, *args)
+        result = spec.handler(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def close(self) -> None:
+        if self._process_used:
+            await self._processes.close()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"process_pool": self._processes.stats()}
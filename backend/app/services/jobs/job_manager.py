@@ -1,33 +1,224 @@
-"""In-process async job manager used for long running tasks."""
+"""Async job manager used for long running tasks.
+
+In ``inline`` mode (the default) each job runs as a task in the process that
+enqueued it. In ``durable`` mode jobs are only written to ``processing_jobs``;
+workers in any process lease them through :class:`LeaseQueue`, heartbeat while
+running and pick up jobs whose worker died.
+"""
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime
-from typing import Any, Awaitable, Callable, Dict
+import contextlib
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
 
-from ...core.database import SupabaseAsyncClient
-from ...schemas.jobs import JobCreate, JobStatus
+from ...core.config import Settings, get_settings
+from ...core.database import SupabaseAsyncClient, SupabaseRequestOptions
+from ...core.logging import get_logger
+from ...schemas.common import CountMode, ListView, Page
+from ...schemas.jobs import JobCreate, JobEvent, JobStatus, JobSummary
 from ...utils.id_generator import generate_job_id
+from ...utils.pagination import fetch_page, next_cursor
+from .events import TERMINAL_STATUSES, JobContext, JobEventBus
+from .executors import ExecutorKind, HandlerSpec, JobExecutors
+from .pool import DEFAULT_PRIORITY, DEFAULT_TIER, QueuedJob, WorkerPool
+from .queue import LeaseQueue
+from .retry import JobRetryPolicy
+from .scheduler import FairPending
+from .status_buffer import StatusBuffer
 
 JOBS_TABLE = "processing_jobs"
+# Everything except the request payload and handler result.
+SUMMARY_COLUMNS = ",".join(JobSummary.model_fields)
+# Reads that must observe a write this manager just made can't join an older in-flight read.
+_UNCOALESCED = SupabaseRequestOptions(coalesce=False)
+
+# ``async`` handlers are coroutines; ``thread`` and ``process`` handlers are plain
+# functions, and ``process`` handlers must also be picklable (defined at module level).
+# Handlers may take a JobContext as a second argument to report progress.
+JobHandler = Callable[..., Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+
+logger = get_logger(__name__)
+
 
-JobHandler = Callable[[JobCreate], Awaitable[Dict[str, Any]]]
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when an ``Idempotency-Key`` is sent again with a different job."""
+
+
+def job_fingerprint(job_type: str, payload: Dict[str, Any], version: str) -> str:
+    """Content address of a job: SHA-256 of its canonical JSON form."""
+
+    canonical = json.dumps(
+        [job_type, version, payload], sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
 class JobManager:
-    def __init__(self, client: SupabaseAsyncClient) -> None:
+    def __init__(self, client: SupabaseAsyncClient, settings: Optional[Settings] = None) -> None:
         self._client = client
-        self._handlers: Dict[str, JobHandler] = {}
-        self._tasks: Dict[str, asyncio.Task[None]] = {}
-        self._lock = asyncio.Lock()
+        self._settings = settings or get_settings()
+        self._handlers: Dict[str, HandlerSpec] = {}
+        self._executors = JobExecutors(
+            thread_workers=self._settings.job_thread_workers,
+            process_workers=self._settings.job_process_workers,
+            process_max_payload_bytes=self._settings.job_process_max_payload_bytes,
+            process_start_method=self._settings.job_process_start_method,
+        )
+        self._pool = WorkerPool(
+            self._run_job,
+            max_concurrency=self._settings.job_max_concurrency,
+            max_pending=self._settings.job_max_pending,
+            type_limits=self._settings.job_type_concurrency,
+            pending=(
+                FairPending(self._settings.job_type_priority, self._settings.job_tier_weights)
+                if self._settings.job_fair_scheduling
+                else None
+            ),
+        )
+        self._durable = self._settings.job_queue_mode == "durable"
+        self._queue = (
+            LeaseQueue(client, self._settings.job_lease_seconds, tier_weights=self._settings.job_tier_weights)
+            if self._durable
+            else None
+        )
+        self._status = StatusBuffer(
+            client,
+            JOBS_TABLE,
+            flush_interval=self._settings.job_status_flush_seconds,
+            max_batch=self._settings.job_status_batch_size,
+            owner=self._queue.worker_id if self._queue else None,
+        )
+        self.events = JobEventBus(self._settings.job_events_queue_size)
+        self._default_retry = JobRetryPolicy(
+            max_attempts=self._settings.job_max_attempts,
+            backoff_seconds=self._settings.job_retry_backoff_seconds,
+            max_backoff_seconds=self._settings.job_retry_max_backoff_seconds,
+        )
+        # Inline mode: jobs waiting out their retry backoff.
+        self._retry_timers: Dict[str, asyncio.TimerHandle] = {}
+        # Jobs whose outcome is being written; too late to cancel them.
+        self._finishing: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._background: list[asyncio.Task[None]] = []
+
+    def register_handler(
+        self,
+        job_type: str,
+        handler: JobHandler,
+        executor: ExecutorKind = "async",
+        *,
+        version: str = "1",
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[JobRetryPolicy] = None,
+    ) -> None:
+        """Register ``handler`` for ``job_type``.
+
+        With ``cache_ttl`` set, submitting a job identical to one the same user
+        submitted within ``cache_ttl`` seconds (same type, payload and ``version``)
+        returns that job, finished or still in flight, instead of running again.
+        ``timeout`` overrides the job type's deadline from the settings and
+        ``retry`` the retry policy built from ``job_max_attempts`` and friends.
+        """
+
+        if executor not in ("async", "thread", "process"):
+            raise ValueError(f"Unknown executor kind '{executor}'")
+        self._handlers[job_type] = HandlerSpec.for_handler(
+            handler, executor, version=version, cache_ttl=cache_ttl, timeout=timeout, retry=retry
+        )
 
-    def register_handler(self, job_type: str, handler: JobHandler) -> None:
-        self._handlers[job_type] = handler
+    async def start(self) -> None:
+        """Warm up handler executors and start leasing jobs when running as a durable-queue worker."""
 
-    async def enqueue_job(self, user_id: str, payload: JobCreate) -> JobStatus:
-        if payload.job_type not in self._handlers:
+        await self._executors.start(list(self._handlers.values()))
+        if not self._durable or not self._settings.job_worker_enabled or self._background:
+            return
+        self._background = [
+            asyncio.create_task(self._claim_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        logger.info("Job worker started", worker_id=self._queue.worker_id)
+
+    async def stop(self) -> None:
+        """Stop leasing, cancel running jobs and hand their leases back to the queue."""
+
+        for task in self._background:
+            task.cancel()
+        for task in self._background:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._background = []
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        self._retry_timers.clear()
+
+        held = self._pool.jobs()
+        await self._pool.cancel_all()
+        await self._status.close()
+        if self._queue and held:
+            # Claiming counted an attempt; handing the job back is not a failed or lost
+            # one, so undo it or rolling restarts would dead-letter long jobs.
+            by_attempt: Dict[int, List[str]] = {}
+            for job in held:
+                by_attempt.setdefault(job.attempt, []).append(job.job_id)
+            for attempt, job_ids in by_attempt.items():
+                await self._client.update(
+                    JOBS_TABLE,
+                    {"status": "queued", "attempts": attempt - 1, **LeaseQueue.released()},
+                    filters={
+                        "id": f"in.({','.join(job_ids)})",
+                        "leased_by": f"eq.{self._queue.worker_id}",
+                    },
+                )
+        await self._executors.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self._settings.job_queue_mode,
+            **self._pool.stats(),
+            **self._executors.stats(),
+            "events": self.events.stats(),
+            "status_writes": self._status.stats(),
+            "waiting_to_retry": len(self._retry_timers),
+        }
+
+    async def enqueue_job(
+        self,
+        user_id: str,
+        payload: JobCreate,
+        tier: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> JobStatus:
+        """Record and schedule a job, or return the existing job it duplicates.
+
+        ``tier`` is the user's plan and sets their share under fair scheduling;
+        users without one get ``DEFAULT_TIER``.
+        A job submitted again with the same ``idempotency_key`` returns the original
+        job; reusing the key for a different job raises :class:`IdempotencyKeyReusedError`.
+        """
+
+        spec = self._handlers.get(payload.job_type)
+        if spec is None:
             raise ValueError(f"No handler registered for job type '{payload.job_type}'")
+        fingerprint = job_fingerprint(payload.job_type, payload.payload, spec.version)
+        if idempotency_key:
+            existing = await self._find_job(user_id, {"idempotency_key": f"eq.{idempotency_key}"}, fresh=True)
+            if existing is not None:
+                return self._replay(existing, fingerprint)
+        if spec.cache_ttl:
+            reusable = await self._find_reusable(user_id, fingerprint, spec.cache_ttl)
+            if reusable is not None:
+                return JobStatus(**reusable)
+        # Refuse before inserting so a rejected job leaves no row behind.
+        self._pool.check_capacity(await self._queued_elsewhere())
 
+        tier = tier or DEFAULT_TIER
         job_id = generate_job_id(payload.job_type)
         record = {
             "id": job_id,
@@ -35,63 +226,349 @@ class JobManager:
             "job_type": payload.job_type,
             "status": "queued",
             "payload": payload.payload,
+            "tier": tier,
+            "priority": self._settings.job_type_priority.get(payload.job_type, DEFAULT_PRIORITY),
+            "fingerprint": fingerprint,
+            "idempotency_key": idempotency_key,
         }
-        response = await self._client.insert(JOBS_TABLE, record)
+        try:
+            # The unique (user_id, idempotency_key) index makes a keyed insert safe to retry.
+            response = await self._client.insert(
+                JOBS_TABLE,
+                record,
+                options=SupabaseRequestOptions(idempotency_key=idempotency_key) if idempotency_key else None,
+            )
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 409 or not idempotency_key:
+                raise
+            # A concurrent request with the same key inserted first.
+            existing = await self._find_job(user_id, {"idempotency_key": f"eq.{idempotency_key}"})
+            if existing is None:
+                raise
+            return self._replay(existing, fingerprint)
         job = JobStatus(**response[0])
-        task = asyncio.create_task(self._execute_job(job_id, payload))
-        async with self._lock:
-            self._tasks[job_id] = task
+        self._publish_status(user_id, job_id, "queued")
+        if self._durable:
+            # A local worker, if any, claims it right away instead of on its next poll.
+            self._wakeup.set()
+            return job
+        self._pool.submit(QueuedJob(job_id, user_id, payload, tier=tier))
         return job
 
-    async def _execute_job(self, job_id: str, payload: JobCreate) -> None:
-        handler = self._handlers[payload.job_type]
-        await self._client.update(
+    async def _find_job(
+        self, user_id: str, filters: Dict[str, str], *, fresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        rows = await self._client.select(
+            JOBS_TABLE,
+            filters={"user_id": f"eq.{user_id}", **filters},
+            order="created_at.desc",
+            limit=1,
+            options=_UNCOALESCED if fresh else None,
+        )
+        return rows[0] if rows else None
+
+    async def _find_reusable(self, user_id: str, fingerprint: str, ttl: float) -> Optional[Dict[str, Any]]:
+        """The user's latest identical job that is queued, running or succeeded within ``ttl``."""
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+        return await self._find_job(
+            user_id,
+            {
+                "fingerprint": f"eq.{fingerprint}",
+                "status": "in.(queued,running,succeeded)",
+                "created_at": f"gte.{cutoff.isoformat()}",
+            },
+        )
+
+    @staticmethod
+    def _replay(existing: Dict[str, Any], fingerprint: str) -> JobStatus:
+        if existing.get("fingerprint") and existing["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReusedError("Idempotency-Key was already used for a different job")
+        return JobStatus(**existing)
+
+    async def _queued_elsewhere(self) -> int:
+        """Jobs waiting in the durable queue; inline mode only queues in this process."""
+
+        if not self._durable:
+            return 0
+        queued = await self._client.select_with_count(
+            JOBS_TABLE, columns="id", filters={"status": "eq.queued"}, limit=0
+        )
+        return queued.total or 0
+
+    async def _run_job(self, job: QueuedJob) -> None:
+        await self._execute_job(job)
+
+    async def cancel_job(self, user_id: str, job_id: str) -> JobStatus:
+        """Cancel a queued or running job; finished jobs are returned unchanged."""
+
+        job = await self.get_job(user_id, job_id)
+        if job.status in TERMINAL_STATUSES or job_id in self._finishing:
+            return job
+        changes = {"status": "cancelled", "error": "Cancelled by the user", "finished_at": datetime.utcnow().isoformat()}
+        timer = self._retry_timers.pop(job_id, None)
+        if timer is not None:
+            timer.cancel()
+        if self._pool.cancel(job_id):
+            # The task's cancellation runs the job's cleanups and frees its slot.
+            await self._finish(user_id, job_id, changes)
+            return await self.get_job(user_id, job_id, fresh=True)
+        # Queued in the table, or running on another worker: releasing the lease makes
+        # that worker's heartbeat fail, so it stops the job and its outcome is fenced off.
+        rows = await self._client.update(
             JOBS_TABLE,
-            {"status": "running", "started_at": datetime.utcnow().isoformat()},
-            filters={"id": f"eq.{job_id}"},
+            {**changes, **LeaseQueue.released()},
+            filters={"id": f"eq.{job_id}", "user_id": f"eq.{user_id}", "status": "in.(queued,running)"},
+            # Without it PostgREST answers 204 and a successful cancel looks like no match.
+            options=SupabaseRequestOptions(prefer="return=representation"),
         )
+        if not rows:
+            return await self.get_job(user_id, job_id, fresh=True)
+        self._publish_status(user_id, job_id, "cancelled", error=changes["error"])
+        return JobStatus(**rows[0])
+
+    def _timeout_for(self, job_type: str, spec: HandlerSpec) -> Optional[float]:
+        if spec.timeout is not None:
+            return spec.timeout
+        return self._settings.job_type_timeouts.get(job_type, self._settings.job_default_timeout_seconds)
+
+    async def _execute_job(self, job: QueuedJob) -> None:
+        job_id, user_id, payload = job.job_id, job.user_id, job.payload
+        spec = self._handlers[payload.job_type]
+        timeout = self._timeout_for(payload.job_type, spec)
         try:
-            result = await handler(payload)
-        except Exception as exc:  # pragma: no cover - logging would go here
-            await self._client.update(
-                JOBS_TABLE,
-                {
-                    "status": "failed",
-                    "error": str(exc),
-                    "finished_at": datetime.utcnow().isoformat(),
-                },
-                filters={"id": f"eq.{job_id}"},
-            )
-        else:
-            await self._client.update(
-                JOBS_TABLE,
-                {
-                    "status": "succeeded",
-                    "result": result,
-                    "finished_at": datetime.utcnow().isoformat(),
-                },
-                filters={"id": f"eq.{job_id}"},
+            if not job.claimed:
+                # Buffered: usually written together with the first progress report or the outcome.
+                self._status.update(
+                    job_id,
+                    {"status": "running", "started_at": datetime.utcnow().isoformat(), "attempts": job.attempt},
+                )
+            self._publish_status(user_id, job_id, "running")
+            context = JobContext(
+                job_id, user_id, payload, self.events, on_progress=self._record_progress, timeout=timeout
             )
+            try:
+                result = await self._executors.run(spec, payload, context, timeout)
+            except asyncio.CancelledError:
+                # Cancelled by the user, on shutdown or after losing the lease; whoever
+                # cancelled the job records its status.
+                context.cancel()
+                await context.run_cleanups()
+                raise
+            except Exception as exc:  # pragma: no cover - logging would go here
+                context.cancel()
+                await context.run_cleanups()
+                if isinstance(exc, asyncio.TimeoutError) and context.remaining() == 0:
+                    await self._finish(
+                        user_id,
+                        job_id,
+                        {
+                            "status": "timed_out",
+                            "error": f"Job exceeded its {timeout:g}s deadline",
+                            "finished_at": datetime.utcnow().isoformat(),
+                        },
+                    )
+                    return
+                policy = spec.retry or self._default_retry
+                if policy.should_retry(exc, job.attempt):
+                    await self._retry_later(job, exc, policy.delay(exc, job.attempt))
+                    return
+                await self._finish(
+                    user_id,
+                    job_id,
+                    {
+                        # Still failing transiently after the last attempt: park it for inspection.
+                        "status": "dead_letter" if policy.is_retryable(exc) else "failed",
+                        "error": str(exc),
+                        "finished_at": datetime.utcnow().isoformat(),
+                    },
+                )
+            else:
+                await self._finish(
+                    user_id,
+                    job_id,
+                    {
+                        "status": "succeeded",
+                        "result": result,
+                        # Clear the error left by an earlier attempt.
+                        "error": None,
+                        "finished_at": datetime.utcnow().isoformat(),
+                    },
+                )
         finally:
-            async with self._lock:
-                self._tasks.pop(job_id, None)
+            self._wakeup.set()
+
+    async def _retry_later(self, job: QueuedJob, exc: Exception, delay: float) -> None:
+        """Put a transiently failed job back in the queue to run again after ``delay`` seconds."""
+
+        logger.info(
+            "Retrying job",
+            job_id=job.job_id,
+            attempt=job.attempt,
+            delay_seconds=round(delay, 3),
+            error=str(exc),
+        )
+        next_run_at = datetime.utcnow() + timedelta(seconds=delay)
+        # In durable mode the released row is claimable again from next_run_at, by any worker.
+        await self._finish(
+            job.user_id,
+            job.job_id,
+            {"status": "queued", "error": str(exc), "next_run_at": next_run_at.isoformat()},
+        )
+        if self._durable:
+            return
+        retry = QueuedJob(job.job_id, job.user_id, job.payload, tier=job.tier, attempt=job.attempt + 1)
+        self._retry_timers[job.job_id] = asyncio.get_running_loop().call_later(delay, self._resubmit, retry)
+
+    def _resubmit(self, job: QueuedJob) -> None:
+        self._retry_timers.pop(job.job_id, None)
+        self._pool.submit(job)
+
+    async def _finish(self, user_id: str, job_id: str, changes: Dict[str, Any]) -> None:
+        if self._queue is not None:
+            changes = {**changes, **LeaseQueue.released()}
+        self._finishing.add(job_id)
+        try:
+            written = await self._status.finish(job_id, changes)
+        finally:
+            self._finishing.discard(job_id)
+        if not written:
+            logger.warning("Discarded job outcome after losing its lease", job_id=job_id)
+            return
+        self._publish_status(
+            user_id, job_id, changes["status"], error=changes.get("error"), result=changes.get("result")
+        )
+
+    def _record_progress(self, event: JobEvent) -> None:
+        self._status.update(event.job_id, {"progress": {"percent": event.percent, "stage": event.stage}})
+
+    def _publish_status(self, user_id: str, job_id: str, status: str, **fields: Any) -> None:
+        self.events.publish(user_id, JobEvent(job_id=job_id, event="status", status=status, **fields))
+
+    async def _claim_loop(self) -> None:
+        assert self._queue is not None
+        while True:
+            self._wakeup.clear()
+            capacity = self._pool.free_slots()
+            # Lease no more of a capped type than can start now; the rest stay claimable elsewhere.
+            type_capacity = self._pool.type_capacity()
+            job_types = [job_type for job_type in self._handlers if type_capacity.get(job_type, capacity) > 0]
+            type_limits = {job_type: type_capacity[job_type] for job_type in job_types if job_type in type_capacity}
+            try:
+                claimed = await self._queue.claim(job_types, capacity, type_limits)
+            except httpx.HTTPError as exc:
+                logger.warning("Failed to claim jobs", error=str(exc))
+                claimed = []
+            for row in claimed:
+                job = self._claimed_job(row)
+                if not await self._dead_letter_if_exhausted(job):
+                    self._pool.submit(job)
+            if claimed and len(claimed) == capacity:
+                # There may be more work waiting; claim again once a slot frees up.
+                await self._wakeup.wait()
+                continue
+            # Not wait_for(): on Python 3.11 it swallows a cancel that races with the wakeup.
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self._settings.job_poll_interval_seconds)
+            finally:
+                waiter.cancel()
+
+    async def _dead_letter_if_exhausted(self, job: QueuedJob) -> bool:
+        """Park a reclaimed job whose earlier attempts used up its retries.
+
+        Attempts that raise are handled by the retry policy, so a job only gets
+        here by losing its lease again and again, e.g. because it crashes or hangs
+        its worker. Running it once more would only do that again.
+        """
+
+        spec = self._handlers[job.payload.job_type]
+        policy = spec.retry or self._default_retry
+        if job.attempt <= policy.max_attempts:
+            return False
+        logger.warning("Dead-lettering job that keeps losing its lease", job_id=job.job_id, attempts=job.attempt - 1)
+        await self._finish(
+            job.user_id,
+            job.job_id,
+            {
+                "status": "dead_letter",
+                "attempts": job.attempt - 1,
+                "error": f"Worker lease expired on each of {job.attempt - 1} attempts",
+                "finished_at": datetime.utcnow().isoformat(),
+            },
+        )
+        return True
+
+    @staticmethod
+    def _claimed_job(row: Dict[str, Any]) -> QueuedJob:
+        payload = JobCreate(job_type=row["job_type"], payload=row.get("payload") or {})
+        # Back-date the local enqueue time so wait metrics include time spent in the table.
+        created_at = datetime.fromisoformat(str(row["created_at"]).replace("Z", "+00:00"))
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        waited = max(0.0, (datetime.now(timezone.utc) - created_at).total_seconds())
+        return QueuedJob(
+            row["id"],
+            row["user_id"],
+            payload,
+            claimed=True,
+            tier=row.get("tier") or DEFAULT_TIER,
+            enqueued_at=time.monotonic() - waited,
+            attempt=row.get("attempts") or 1,
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        assert self._queue is not None
+        while True:
+            await asyncio.sleep(self._settings.job_heartbeat_seconds)
+            held = self._pool.job_ids()
+            if not held:
+                continue
+            try:
+                owned = await self._queue.heartbeat(held)
+            except httpx.HTTPError as exc:
+                logger.warning("Failed to extend job leases", error=str(exc), jobs=len(held))
+                continue
+            for job_id in set(held) - owned:
+                # Another worker has reclaimed the job; stop duplicating its work.
+                logger.warning("Lost job lease", job_id=job_id)
+                self._status.discard(job_id)
+                self._pool.cancel(job_id)
+
+    async def get_job(self, user_id: str, job_id: str, *, fresh: bool = False) -> JobStatus:
+        """Load one of the user's jobs; ``fresh`` skips read coalescing after a write."""
 
-    async def get_job(self, user_id: str, job_id: str) -> JobStatus:
         response = await self._client.select(
             JOBS_TABLE,
             filters={"id": f"eq.{job_id}", "user_id": f"eq.{user_id}"},
             limit=1,
+            options=_UNCOALESCED if fresh else None,
         )
         if not response:
             raise ValueError("Job not found")
         return JobStatus(**response[0])
 
-    async def list_jobs(self, user_id: str, limit: int = 20, offset: int = 0) -> list[JobStatus]:
-        response = await self._client.select(
+    async def list_jobs(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = "exact",
+        view: ListView = "full",
+    ) -> Union[Page[JobStatus], Page[JobSummary]]:
+        page = await fetch_page(
+            self._client,
             JOBS_TABLE,
-            filters={"user_id": f"eq.{user_id}"},
-            order="created_at.desc",
+            {"user_id": f"eq.{user_id}"},
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            count=count,
+            columns=SUMMARY_COLUMNS if view == "summary" else "*",
         )
-        return [JobStatus(**item) for item in response]
+        if view == "summary":
+            summaries = [JobSummary(**item) for item in page.rows]
+            return Page[JobSummary](items=summaries, total=page.total, next_cursor=next_cursor(summaries, limit))
+        items = [JobStatus(**item) for item in page.rows]
+        return Page[JobStatus](items=items, total=page.total, next_cursor=next_cursor(items, limit))
@@ -0,0 +1,230 @@
+"""Bounded worker pool that runs jobs under global and per-type concurrency limits."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Protocol
+
+from ...schemas.jobs import JobCreate
+from ...utils.metrics import LatencyHistogram
+
+# Lower priority values start first; job types without an entry use DEFAULT_PRIORITY.
+DEFAULT_PRIORITY = 100
+DEFAULT_TIER = "standard"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job cannot be accepted because too much work is already pending."""
+
+    def __init__(self, retry_after_seconds: float) -> None:
+        super().__init__("Job queue is full, retry later")
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass
+class QueuedJob:
+    job_id: str
+    user_id: str
+    payload: JobCreate
+    # True when the row was leased from the durable queue and is already "running".
+    claimed: bool = False
+    tier: str = DEFAULT_TIER
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # 1 for the first run; durable claims carry the row's ``attempts``.
+    attempt: int = 1
+
+    @property
+    def job_type(self) -> str:
+        return self.payload.job_type
+
+
+class PendingQueue(Protocol):
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[QueuedJob]: ...
+
+    def push(self, job: QueuedJob) -> None: ...
+
+    def pop(self, eligible: Callable[[QueuedJob], bool]) -> Optional[QueuedJob]: ...
+
+    def remove(self, job_id: str) -> Optional[QueuedJob]: ...
+
+    def drain(self) -> List[QueuedJob]: ...
+
+
+class FifoPending:
+    """First-in first-out pending queue that skips job types with no free slot."""
+
+    def __init__(self) -> None:
+        self._jobs: Deque[QueuedJob] = deque()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __iter__(self) -> Iterator[QueuedJob]:
+        return iter(self._jobs)
+
+    def push(self, job: QueuedJob) -> None:
+        self._jobs.append(job)
+
+    def pop(self, eligible: Callable[[QueuedJob], bool]) -> Optional[QueuedJob]:
+        for index, job in enumerate(self._jobs):
+            if eligible(job):
+                del self._jobs[index]
+                return job
+        return None
+
+    def remove(self, job_id: str) -> Optional[QueuedJob]:
+        return self.pop(lambda job: job.job_id == job_id)
+
+    def drain(self) -> List[QueuedJob]:
+        jobs = list(self._jobs)
+        self._jobs.clear()
+        return jobs
+
+
+class WorkerPool:
+    """Runs queued jobs as tasks, at most ``max_concurrency`` at a time.
+
+    ``type_limits`` caps individual job types below the global limit so one kind
+    of expensive job cannot occupy every slot. Jobs that cannot start wait in a
+    pending queue bounded by ``max_pending``; :meth:`check_capacity` raises
+    :class:`JobQueueFullError` once it is full. The order in which pending jobs
+    start is up to ``pending`` (FIFO by default); how long each job waited is
+    recorded per user tier.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[QueuedJob], Awaitable[None]],
+        *,
+        max_concurrency: int,
+        max_pending: int,
+        type_limits: Optional[Mapping[str, int]] = None,
+        pending: Optional[PendingQueue] = None,
+    ) -> None:
+        self._run = run
+        self._max_concurrency = max_concurrency
+        self._max_pending = max_pending
+        self._type_limits = dict(type_limits or {})
+        self._pending: PendingQueue = pending if pending is not None else FifoPending()
+        self._wait_by_tier: Dict[str, LatencyHistogram] = {}
+        self._running: Dict[str, asyncio.Task[None]] = {}
+        self._running_jobs: Dict[str, QueuedJob] = {}
+        self._running_by_type: Dict[str, int] = {}
+        self._avg_duration: Optional[float] = None
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def running(self) -> Dict[str, asyncio.Task[None]]:
+        return self._running
+
+    def free_slots(self) -> int:
+        return max(0, self._max_concurrency - len(self._running) - len(self._pending))
+
+    def type_capacity(self) -> Dict[str, int]:
+        """How many more jobs of each capped type could start, counting pending ones."""
+
+        waiting: Dict[str, int] = {}
+        for job in self._pending:
+            waiting[job.job_type] = waiting.get(job.job_type, 0) + 1
+        return {
+            job_type: max(0, limit - self._running_by_type.get(job_type, 0) - waiting.get(job_type, 0))
+            for job_type, limit in self._type_limits.items()
+        }
+
+    def check_capacity(self, queued_elsewhere: int = 0) -> None:
+        """Raise :class:`JobQueueFullError` if another job would exceed ``max_pending``."""
+
+        backlog = len(self._pending) + queued_elsewhere
+        if backlog >= self._max_pending:
+            self.rejected += 1
+            raise JobQueueFullError(self.retry_after(backlog))
+
+    def retry_after(self, backlog: int) -> float:
+        """Estimate how long until a slot frees up, from the average job duration."""
+
+        average = self._avg_duration or 1.0
+        excess = backlog - self._max_pending + 1
+        return float(min(60, max(1, math.ceil(average * excess / self._max_concurrency))))
+
+    def submit(self, job: QueuedJob) -> None:
+        self._pending.push(job)
+        self._dispatch()
+
+    def jobs(self) -> List[QueuedJob]:
+        """Running and pending jobs."""
+
+        return [*self._running_jobs.values(), *self._pending]
+
+    def job_ids(self) -> List[str]:
+        """Ids of running and pending jobs."""
+
+        return [job.job_id for job in self.jobs()]
+
+    async def cancel_all(self) -> List[QueuedJob]:
+        """Cancel running jobs and drop pending ones; returns the pending jobs."""
+
+        pending = self._pending.drain()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return pending
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a running job or drop a pending one; False if the pool does not hold it."""
+
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            return True
+        return self._pending.remove(job_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "pending": len(self._pending),
+            "max_concurrency": self._max_concurrency,
+            "max_pending": self._max_pending,
+            "running_by_type": dict(self._running_by_type),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_duration_seconds": self._avg_duration,
+            "wait_seconds_by_tier": {tier: hist.stats() for tier, hist in self._wait_by_tier.items()},
+        }
+
+    def _eligible(self, job: QueuedJob) -> bool:
+        limit = self._type_limits.get(job.job_type)
+        return limit is None or self._running_by_type.get(job.job_type, 0) < limit
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self._max_concurrency:
+            job = self._pending.pop(self._eligible)
+            if job is None:
+                return
+            self._running_by_type[job.job_type] = self._running_by_type.get(job.job_type, 0) + 1
+            self._wait_by_tier.setdefault(job.tier, LatencyHistogram()).observe(time.monotonic() - job.enqueued_at)
+            task = asyncio.create_task(self._run(job))
+            # A done callback rather than try/finally so bookkeeping also happens for
+            # tasks cancelled before they got to run.
+            task.add_done_callback(functools.partial(self._on_done, job, time.monotonic()))
+            self._running[job.job_id] = task
+            self._running_jobs[job.job_id] = job
+
+    def _on_done(self, job: QueuedJob, started: float, task: "asyncio.Task[None]") -> None:
+        duration = time.monotonic() - started
+        self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
+        self.completed += 1
+        self._running.pop(job.job_id, None)
+        self._running_jobs.pop(job.job_id, None)
+        self._running_by_type[job.job_type] -= 1
+        if not task.cancelled():
+            # Handlers report their own failures; keep asyncio from logging them again.
+            task.exception()
+        self._dispatch()
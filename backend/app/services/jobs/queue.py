@@ -0,0 +1,86 @@
+"""Lease-based job queue on top of the ``processing_jobs`` table."""
+from __future__ import annotations
+
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set
+
+from ...core.database import SupabaseAsyncClient
+
+CLAIM_JOBS_RPC = "claim_processing_jobs"
+HEARTBEAT_JOBS_RPC = "heartbeat_processing_jobs"
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseQueue:
+    """Claims jobs for one worker and keeps its leases alive.
+
+    Claims are ordered fairly: by priority class, then by each job's position in
+    its user's backlog divided by the user's tier weight, so a user with a long
+    backlog cannot push other users' oldest jobs back.
+
+    A lease is only valid until ``lease_expires_at``; if the worker stops
+    heartbeating, any other worker may claim the job again. Writes that finish a
+    job are fenced on ``leased_by`` so a worker that lost its lease cannot
+    overwrite the new owner's result.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseAsyncClient,
+        lease_seconds: float,
+        worker_id: str | None = None,
+        tier_weights: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self._client = client
+        self._lease_seconds = max(1, int(lease_seconds))
+        self._tier_weights = dict(tier_weights or {})
+        self.worker_id = worker_id or default_worker_id()
+
+    async def claim(
+        self, job_types: Sequence[str], limit: int, type_limits: Optional[Mapping[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` jobs, and at most ``type_limits[job_type]`` of a capped type."""
+
+        if limit < 1 or not job_types:
+            return []
+        # Not retried: a replayed claim would lease rows nobody is going to run.
+        rows = await self._client.rpc(
+            CLAIM_JOBS_RPC,
+            payload={
+                "p_worker_id": self.worker_id,
+                "p_job_types": list(job_types),
+                "p_limit": limit,
+                "p_lease_seconds": self._lease_seconds,
+                "p_tier_weights": self._tier_weights,
+                "p_type_limits": dict(type_limits or {}),
+            },
+        )
+        return list(rows or [])
+
+    async def heartbeat(self, job_ids: Sequence[str]) -> Set[str]:
+        """Extend the leases on ``job_ids`` and return the ids this worker still owns."""
+
+        if not job_ids:
+            return set()
+        owned = await self._client.rpc(
+            HEARTBEAT_JOBS_RPC,
+            payload={
+                "p_worker_id": self.worker_id,
+                "p_job_ids": list(job_ids),
+                "p_lease_seconds": self._lease_seconds,
+            },
+            idempotent=True,
+        )
+        return {row if isinstance(row, str) else row[HEARTBEAT_JOBS_RPC] for row in owned or []}
+
+    def owned_filter(self, job_id: str) -> Dict[str, str]:
+        return {"id": f"eq.{job_id}", "leased_by": f"eq.{self.worker_id}"}
+
+    @staticmethod
+    def released() -> Dict[str, Any]:
+        return {"leased_by": None, "lease_expires_at": None}
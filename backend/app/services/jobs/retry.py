@@ -0,0 +1,68 @@
+"""Retry policies for failed jobs."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple, Type
+
+import httpx
+
+from ...core.resilience import RETRYABLE_STATUS_CODES, RetryPolicy
+
+
+class RetryableJobError(Exception):
+    """Raise from a handler to mark a failure as transient.
+
+    ``retry_after`` (seconds) delays the next attempt at least that long, e.g. a
+    provider's ``Retry-After``.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Keeps retry_after when the error comes back from a process handler.
+        return type(self), (str(self), self.retry_after)
+
+
+@dataclass
+class JobRetryPolicy:
+    """How often, how soon and on which errors a failed job runs again.
+
+    ``max_attempts`` counts the first run. An HTTP error from a provider is retried
+    on 429/502/503/504 (honouring ``Retry-After``); other exceptions are retried when
+    they are instances of ``retry_on``. A job that fails with a retryable error on
+    its last attempt is dead-lettered; any other error fails it at once.
+    """
+
+    max_attempts: int = 3
+    backoff_seconds: float = 5.0
+    max_backoff_seconds: float = 300.0
+    retry_on: Tuple[Type[BaseException], ...] = (RetryableJobError, httpx.TransportError)
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        # Exceptions from process handlers arrive wrapped in ProcessJobError.
+        for candidate in (exc, exc.__cause__):
+            if isinstance(candidate, httpx.HTTPStatusError):
+                return candidate.response.status_code in RETRYABLE_STATUS_CODES
+            if candidate is not None and isinstance(candidate, self.retry_on):
+                return True
+        return False
+
+    def should_retry(self, exc: BaseException, attempt: int) -> bool:
+        return attempt < self.max_attempts and self.is_retryable(exc)
+
+    def delay(self, exc: BaseException, attempt: int) -> float:
+        """Seconds to wait before attempt ``attempt + 1`` (full jitter, capped)."""
+
+        backoff = RetryPolicy(self.max_attempts, self.backoff_seconds, self.max_backoff_seconds)
+        return backoff.delay(attempt - 1, self._retry_after(exc))
+
+    @staticmethod
+    def _retry_after(exc: BaseException) -> Optional[float]:
+        for candidate in (exc, exc.__cause__):
+            if isinstance(candidate, RetryableJobError):
+                return candidate.retry_after
+            if isinstance(candidate, httpx.HTTPStatusError):
+                return RetryPolicy.retry_after(candidate.response)
+        return None
@@ -0,0 +1,112 @@
+"""Fair ordering of pending jobs across users."""
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterator, List, Mapping, Optional
+
+from .pool import DEFAULT_PRIORITY, QueuedJob
+
+
+@dataclass
+class _Flow:
+    weight: float
+    jobs: Deque[QueuedJob] = field(default_factory=deque)
+    deficit: float = 0.0
+
+
+class FairPending:
+    """Pending queue that interleaves users with deficit round-robin.
+
+    Jobs are first split into priority classes (lower value runs first, from
+    ``priorities`` by job type). Within a class every user with waiting jobs gets a
+    turn per round and may start ``weight`` jobs per turn, where the weight comes
+    from the user's tier; fractional weights carry over between turns. A user who
+    submits hundreds of jobs therefore waits behind other users' next job, not the
+    other way round. Jobs of one user keep their submission order.
+    """
+
+    def __init__(
+        self,
+        priorities: Optional[Mapping[str, int]] = None,
+        tier_weights: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self._priorities = dict(priorities or {})
+        self._tier_weights = dict(tier_weights or {})
+        self._classes: Dict[int, "OrderedDict[str, _Flow]"] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[QueuedJob]:
+        for priority in sorted(self._classes):
+            for flow in self._classes[priority].values():
+                yield from flow.jobs
+
+    def push(self, job: QueuedJob) -> None:
+        flows = self._classes.setdefault(self._priorities.get(job.job_type, DEFAULT_PRIORITY), OrderedDict())
+        flow = flows.get(job.user_id)
+        if flow is None:
+            flow = flows[job.user_id] = _Flow(weight=max(0.01, self._tier_weights.get(job.tier, 1.0)))
+        flow.jobs.append(job)
+        self._size += 1
+
+    def pop(self, eligible: Callable[[QueuedJob], bool]) -> Optional[QueuedJob]:
+        for priority in sorted(self._classes):
+            job = self._pop_from(self._classes[priority], eligible)
+            if job is not None:
+                if not self._classes[priority]:
+                    del self._classes[priority]
+                return job
+        return None
+
+    def remove(self, job_id: str) -> Optional[QueuedJob]:
+        for priority, flows in list(self._classes.items()):
+            for user_id, flow in list(flows.items()):
+                for job in flow.jobs:
+                    if job.job_id == job_id:
+                        flow.jobs.remove(job)
+                        self._size -= 1
+                        if not flow.jobs:
+                            del flows[user_id]
+                        if not flows:
+                            del self._classes[priority]
+                        return job
+        return None
+
+    def drain(self) -> List[QueuedJob]:
+        jobs = list(self)
+        self._classes.clear()
+        self._size = 0
+        return jobs
+
+    def _pop_from(
+        self, flows: "OrderedDict[str, _Flow]", eligible: Callable[[QueuedJob], bool]
+    ) -> Optional[QueuedJob]:
+        # The head of ``flows`` is the user whose turn it is. A user with nothing
+        # eligible (e.g. only saturated job types) is skipped without earning credit.
+        blocked = 0
+        while flows and blocked < len(flows):
+            user_id, flow = next(iter(flows.items()))
+            index = next((i for i, job in enumerate(flow.jobs) if eligible(job)), None)
+            if index is None:
+                blocked += 1
+                flows.move_to_end(user_id)
+                continue
+            blocked = 0
+            if flow.deficit < 1:
+                flow.deficit += flow.weight
+                if flow.deficit < 1:
+                    flows.move_to_end(user_id)
+                    continue
+            job = flow.jobs[index]
+            del flow.jobs[index]
+            self._size -= 1
+            flow.deficit -= 1
+            if not flow.jobs:
+                del flows[user_id]
+            elif flow.deficit < 1:
+                flows.move_to_end(user_id)
+            return job
+        return None
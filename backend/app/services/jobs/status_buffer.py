@@ -0,0 +1,220 @@
+"""Write-behind buffer for ``processing_jobs`` status and progress updates."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from ...core.database import SupabaseAsyncClient, SupabaseRequestOptions
+from ...core.logging import get_logger
+
+UPDATE_JOBS_RPC = "update_processing_jobs"
+_RETURN_IDS = SupabaseRequestOptions(prefer="return=representation", select="id")
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    changes: Dict[str, Any]
+    waiters: List["asyncio.Future[bool]"] = field(default_factory=list)
+
+
+class StatusBuffer:
+    """Coalesces job updates per job and writes them in batches.
+
+    Non-terminal updates (``running``, progress) are merged per job and flushed
+    every ``flush_interval`` seconds, so a job reporting progress many times per
+    second still costs one row write per interval. Terminal updates go out on the
+    next loop iteration together with any other job finishing at the same time,
+    and :meth:`finish` only returns once the row is written; failed flushes are
+    retried until they succeed.
+
+    A batch is a single call to ``update_processing_jobs``. If that function is
+    not deployed, the buffer falls back to one PATCH per job. With ``owner`` set
+    (durable mode) writes only apply while that worker still holds the lease.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseAsyncClient,
+        table: str,
+        *,
+        flush_interval: float,
+        max_batch: int,
+        owner: Optional[str] = None,
+    ) -> None:
+        self._client = client
+        self._table = table
+        self._flush_interval = flush_interval
+        self._max_batch = max(1, max_batch)
+        self._owner = owner
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._lock = asyncio.Lock()
+        self._loop_task: Optional[asyncio.Task[None]] = None
+        self._flush_soon: Optional[asyncio.Task[None]] = None
+        self._use_rpc = True
+        self._updates = 0
+        self._rows_written = 0
+        self._batches = 0
+        self._failed_batches = 0
+
+    def update(self, job_id: str, changes: Dict[str, Any]) -> None:
+        """Queue a non-terminal change; later changes to the same columns win."""
+
+        self._merge(job_id, changes)
+        if self._flush_interval <= 0:
+            self._schedule_flush()
+        elif self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._flush_loop())
+
+    async def finish(self, job_id: str, changes: Dict[str, Any]) -> bool:
+        """Persist a terminal change (with anything still pending for the job).
+
+        Returns ``False`` if the write was fenced off because another worker owns the job.
+        """
+
+        waiter: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._merge(job_id, changes).waiters.append(waiter)
+        self._schedule_flush()
+        return await asyncio.shield(waiter)
+
+    def discard(self, job_id: str) -> None:
+        """Drop pending non-terminal changes, e.g. after losing the job's lease."""
+
+        pending = self._pending.get(job_id)
+        if pending is not None and not pending.waiters:
+            del self._pending[job_id]
+
+    async def flush(self) -> None:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            job_ids = list(pending)
+            for start in range(0, len(job_ids), self._max_batch):
+                batch = {job_id: pending[job_id] for job_id in job_ids[start : start + self._max_batch]}
+                try:
+                    written = await self._write(batch)
+                except asyncio.CancelledError:
+                    # Put back everything not yet written so close() can still flush it.
+                    self._restore({job_id: pending[job_id] for job_id in job_ids[start:]})
+                    raise
+                except Exception as exc:
+                    self._failed_batches += 1
+                    logger.warning("Failed to write job status batch", error=repr(exc), jobs=len(batch))
+                    self._requeue(batch)
+                    continue
+                self._batches += 1
+                self._rows_written += len(written)
+                for job_id, write in batch.items():
+                    for waiter in write.waiters:
+                        if not waiter.done():
+                            waiter.set_result(job_id in written)
+
+    async def close(self) -> None:
+        """Stop the interval flush and write everything still pending."""
+
+        for task in (self._loop_task, self._flush_soon):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._loop_task = self._flush_soon = None
+        await self.flush()
+        for job_id, write in self._pending.items():
+            logger.error("Dropping unwritten job status", job_id=job_id, status=write.changes.get("status"))
+            for waiter in write.waiters:
+                if not waiter.done():
+                    waiter.set_exception(RuntimeError(f"Could not persist status of job {job_id}"))
+        self._pending = {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "updates": self._updates,
+            "rows_written": self._rows_written,
+            "batches": self._batches,
+            "failed_batches": self._failed_batches,
+            "mode": "rpc" if self._use_rpc else "patch",
+        }
+
+    def _merge(self, job_id: str, changes: Dict[str, Any]) -> _PendingWrite:
+        self._updates += 1
+        pending = self._pending.get(job_id)
+        if pending is None:
+            pending = self._pending[job_id] = _PendingWrite(dict(changes))
+        else:
+            pending.changes.update(changes)
+        return pending
+
+    def _restore(self, batch: Dict[str, _PendingWrite]) -> None:
+        for job_id, write in batch.items():
+            newer = self._pending.get(job_id)
+            if newer is not None:
+                write.changes.update(newer.changes)
+                write.waiters.extend(newer.waiters)
+            self._pending[job_id] = write
+
+    def _requeue(self, batch: Dict[str, _PendingWrite]) -> None:
+        self._restore(batch)
+        # Terminal writes must land; try again after the usual interval.
+        if any(write.waiters for write in batch.values()):
+            self._schedule_flush(delay=max(self._flush_interval, 0.5))
+        elif self._flush_interval > 0 and (self._loop_task is None or self._loop_task.done()):
+            self._loop_task = asyncio.create_task(self._flush_loop())
+
+    def _schedule_flush(self, delay: float = 0.0) -> None:
+        if self._flush_soon is None or self._flush_soon.done():
+            self._flush_soon = asyncio.create_task(self._flush_after(delay))
+
+    async def _flush_after(self, delay: float) -> None:
+        # Yielding once lets every job finishing in this iteration join the batch.
+        await asyncio.sleep(delay)
+        # Keep going while terminal writes wait: some may have arrived mid-flush or failed.
+        while True:
+            failures = self._failed_batches
+            await self.flush()
+            if not any(write.waiters for write in self._pending.values()):
+                return
+            if self._failed_batches != failures:
+                await asyncio.sleep(max(self._flush_interval, 0.5))
+
+    async def _flush_loop(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def _write(self, batch: Dict[str, _PendingWrite]) -> Set[str]:
+        if self._use_rpc:
+            updates = [
+                {"id": job_id, "changes": write.changes, **({"leased_by": self._owner} if self._owner else {})}
+                for job_id, write in batch.items()
+            ]
+            try:
+                rows = await self._client.rpc(UPDATE_JOBS_RPC, payload={"p_updates": updates}, idempotent=True)
+            except httpx.HTTPStatusError as exc:
+                if exc.response.status_code != 404:
+                    raise
+                logger.warning("update_processing_jobs is missing; falling back to one PATCH per job")
+                self._use_rpc = False
+            else:
+                return {row if isinstance(row, str) else row[UPDATE_JOBS_RPC] for row in rows or []}
+        results = await asyncio.gather(
+            *(
+                # PostgREST answers a PATCH with an empty 204 unless asked for the rows, and
+                # an empty result is how a fenced-off write shows up.
+                self._client.update(
+                    self._table, write.changes, filters=self._filters(job_id), options=_RETURN_IDS
+                )
+                for job_id, write in batch.items()
+            )
+        )
+        return {job_id for job_id, rows in zip(batch, results) if rows}
+
+    def _filters(self, job_id: str) -> Dict[str, str]:
+        filters = {"id": f"eq.{job_id}"}
+        if self._owner:
+            filters["leased_by"] = f"eq.{self._owner}"
+        return filters
@@ -1,14 +1,17 @@
 """Manage generated podcasts and associated media."""
 from __future__ import annotations
 
-from typing import List
+from pathlib import PurePosixPath
+from typing import Optional
 
 from fastapi import HTTPException, status
 
 from ..core.config import Settings
 from ..core.database import SupabaseAsyncClient
+from ..schemas.common import CountMode, Page
 from ..schemas.podcasts import PodcastCreate, PodcastDetailResponse, PodcastResponse
 from ..schemas.scripts import ScriptResponse
+from ..utils.pagination import fetch_page, next_cursor
 from .storage_service import StorageService
 
 PODCASTS_TABLE = "generated_podcasts"
@@ -27,20 +30,30 @@ class PodcastService:
             "audio_path": payload.audio_storage_path,
             "cover_art_path": payload.cover_art_storage_path,
             "duration_seconds": payload.duration_seconds,
-            "metadata": payload.metadata,
+            "metadata": self._audio_metadata(payload),
         }
         response = await self._client.insert(PODCASTS_TABLE, record)
         return self._to_response(response[0])
 
-    async def list_podcasts(self, user_id: str, limit: int = 20, offset: int = 0) -> List[PodcastResponse]:
-        response = await self._client.select(
+    async def list_podcasts(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = "exact",
+    ) -> Page[PodcastResponse]:
+        page = await fetch_page(
+            self._client,
             PODCASTS_TABLE,
-            filters={"user_id": f"eq.{user_id}"},
-            order="created_at.desc",
+            {"user_id": f"eq.{user_id}"},
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            count=count,
         )
-        return [self._to_response(item) for item in response]
+        items = [self._to_response(item) for item in page.rows]
+        return Page[PodcastResponse](items=items, total=page.total, next_cursor=next_cursor(items, limit))
 
     async def get_podcast(self, user_id: str, podcast_id: str) -> PodcastResponse:
         response = await self._client.select(
@@ -71,6 +84,18 @@ class PodcastService:
     async def delete_podcast(self, user_id: str, podcast_id: str) -> None:
         await self._client.delete(PODCASTS_TABLE, filters={"id": f"eq.{podcast_id}", "user_id": f"eq.{user_id}"})
 
+    @staticmethod
+    def _audio_metadata(payload: PodcastCreate) -> dict:
+        """``metadata`` with the audio file's format and bitrate, so players can pick a decoder up front."""
+
+        metadata = dict(payload.metadata)
+        audio_format = payload.audio_format or PurePosixPath(payload.audio_storage_path).suffix.lstrip(".").lower()
+        if audio_format:
+            metadata["audio_format"] = audio_format
+        if payload.audio_bitrate_kbps is not None:
+            metadata["audio_bitrate_kbps"] = payload.audio_bitrate_kbps
+        return metadata
+
     def _to_response(self, data) -> PodcastResponse:
         audio_url = self._storage.build_public_url(self._settings.supabase_storage_bucket_audio, data["audio_path"])
         cover_path = data.get("cover_art_path")
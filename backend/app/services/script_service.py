@@ -1,14 +1,18 @@
 """Podcast script persistence."""
 from __future__ import annotations
 
-from typing import List
+from typing import Optional, Union
 
 from fastapi import HTTPException, status
 
 from ..core.database import SupabaseAsyncClient
-from ..schemas.scripts import ScriptCreate, ScriptResponse
+from ..schemas.common import CountMode, ListView, Page
+from ..schemas.scripts import ScriptCreate, ScriptResponse, ScriptSummary
+from ..utils.pagination import fetch_page, next_cursor
 
 SCRIPTS_TABLE = "podcast_scripts"
+# Everything except the segments array, which holds the full script text.
+SUMMARY_COLUMNS = ",".join(ScriptSummary.model_fields)
 
 
 class ScriptService:
@@ -28,15 +32,30 @@ class ScriptService:
         response = await self._client.insert(SCRIPTS_TABLE, record)
         return ScriptResponse(**response[0])
 
-    async def list_scripts(self, user_id: str, limit: int = 20, offset: int = 0) -> List[ScriptResponse]:
-        response = await self._client.select(
+    async def list_scripts(
+        self,
+        user_id: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[CountMode] = "exact",
+        view: ListView = "full",
+    ) -> Union[Page[ScriptResponse], Page[ScriptSummary]]:
+        page = await fetch_page(
+            self._client,
             SCRIPTS_TABLE,
-            filters={"user_id": f"eq.{user_id}"},
-            order="created_at.desc",
+            {"user_id": f"eq.{user_id}"},
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            count=count,
+            columns=SUMMARY_COLUMNS if view == "summary" else "*",
         )
-        return [ScriptResponse(**item) for item in response]
+        if view == "summary":
+            summaries = [ScriptSummary(**item) for item in page.rows]
+            return Page[ScriptSummary](items=summaries, total=page.total, next_cursor=next_cursor(summaries, limit))
+        items = [ScriptResponse(**item) for item in page.rows]
+        return Page[ScriptResponse](items=items, total=page.total, next_cursor=next_cursor(items, limit))
 
     async def get_script(self, user_id: str, script_id: str) -> ScriptResponse:
         response = await self._client.select(
@@ -1,8 +1,25 @@
 """Utility helpers for Supabase Storage buckets."""
 from __future__ import annotations
 
+import asyncio
+import base64
+import contextlib
+import os
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
 from ..core.config import Settings
 from ..core.database import SupabaseAsyncClient
+from ..core.logging import get_logger
+from ..core.resilience import RETRYABLE_STATUS_CODES, RetryPolicy
+
+logger = get_logger(__name__)
+
+# Supabase's resumable (TUS) endpoint takes uploads in parts of exactly this size
+# (the last may be shorter); files above it go through it rather than one request.
+RESUMABLE_CHUNK_BYTES = 6 * 1024 * 1024
+TUS_VERSION = "1.0.0"
 
 
 class StorageService:
@@ -13,6 +30,137 @@ class StorageService:
     def build_public_url(self, bucket: str, path: str) -> str:
         return f"{self._settings.supabase_storage_url}/object/public/{bucket}/{path}".replace("//object", "/object")
 
+    async def upload(self, bucket: str, path: str, data: bytes, content_type: str) -> str:
+        """Store ``data`` at ``bucket/path``, replacing any existing object; returns ``path``."""
+
+        response = await self._client.storage.post(
+            f"/object/{bucket}/{path}",
+            content=data,
+            headers={"Content-Type": content_type, "x-upsert": "true"},
+        )
+        response.raise_for_status()
+        return path
+
+    async def upload_file(
+        self, bucket: str, path: str, file_path: str, content_type: str, *, block_bytes: int = 1 << 20
+    ) -> str:
+        """Like :meth:`upload`, streaming the file in ``block_bytes`` blocks instead of reading it whole.
+
+        Files larger than :data:`RESUMABLE_CHUNK_BYTES` are sent with :meth:`upload_resumable`.
+        """
+
+        size = os.path.getsize(file_path)
+        if size > RESUMABLE_CHUNK_BYTES:
+            return await self.upload_resumable(bucket, path, file_path, content_type)
+
+        async def blocks() -> AsyncIterator[bytes]:
+            with open(file_path, "rb") as handle:
+                while block := await asyncio.to_thread(handle.read, block_bytes):
+                    yield block
+
+        response = await self._client.storage.post(
+            f"/object/{bucket}/{path}",
+            content=blocks(),
+            headers={
+                "Content-Type": content_type,
+                "Content-Length": str(size),
+                "x-upsert": "true",
+            },
+        )
+        response.raise_for_status()
+        return path
+
+    async def upload_resumable(
+        self,
+        bucket: str,
+        path: str,
+        file_path: str,
+        content_type: str,
+        *,
+        retry: RetryPolicy = RetryPolicy(max_retries=5, backoff_seconds=0.5, max_backoff_seconds=10.0),
+    ) -> str:
+        """Upload ``file_path`` in :data:`RESUMABLE_CHUNK_BYTES` parts over the TUS protocol.
+
+        Only one part is in memory at a time. When a part fails with a transport
+        error or a retryable status, the server's offset is read back and the
+        upload resumes from there instead of starting over. An upload that fails
+        for good or is cancelled is terminated, so no partial upload is left behind.
+        """
+
+        storage = self._client.storage
+        size = os.path.getsize(file_path)
+        metadata = {"bucketName": bucket, "objectName": path, "contentType": content_type}
+        response = await storage.post(
+            "/upload/resumable",
+            headers={
+                "Tus-Resumable": TUS_VERSION,
+                "Upload-Length": str(size),
+                "Upload-Metadata": ",".join(
+                    f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in metadata.items()
+                ),
+                "x-upsert": "true",
+            },
+        )
+        response.raise_for_status()
+        location = response.headers["Location"]
+        try:
+            await self._send_parts(location, path, file_path, size, retry)
+        except BaseException:
+            with contextlib.suppress(httpx.HTTPError):
+                await storage.delete(location, headers={"Tus-Resumable": TUS_VERSION})
+            raise
+        return path
+
+    async def _send_parts(self, location: str, path: str, file_path: str, size: int, retry: RetryPolicy) -> None:
+        storage = self._client.storage
+        offset = failures = 0
+        with open(file_path, "rb") as handle:
+            while offset < size:
+                handle.seek(offset)
+                part = await asyncio.to_thread(handle.read, RESUMABLE_CHUNK_BYTES)
+                try:
+                    response = await storage.patch(
+                        location,
+                        content=part,
+                        headers={
+                            "Tus-Resumable": TUS_VERSION,
+                            "Upload-Offset": str(offset),
+                            "Content-Type": "application/offset+octet-stream",
+                        },
+                    )
+                except httpx.TransportError as exc:
+                    if failures >= retry.max_retries:
+                        raise
+                    error = repr(exc)
+                else:
+                    if response.status_code not in RETRYABLE_STATUS_CODES or failures >= retry.max_retries:
+                        response.raise_for_status()
+                        offset = int(response.headers["Upload-Offset"])
+                        continue
+                    error = f"HTTP {response.status_code}"
+                failures += 1
+                logger.warning("Resuming upload", path=path, offset=offset, attempt=failures, error=error)
+                await asyncio.sleep(retry.delay(failures))
+                head = await storage.head(location, headers={"Tus-Resumable": TUS_VERSION})
+                head.raise_for_status()
+                offset = int(head.headers["Upload-Offset"])
+
+    async def remove(self, bucket: str, paths: List[str]) -> None:
+        """Delete objects; missing ones are ignored."""
+
+        response = await self._client.storage.request("DELETE", f"/object/{bucket}", json={"prefixes": paths})
+        response.raise_for_status()
+
+    async def download(self, bucket: str, path: str) -> Optional[bytes]:
+        """Contents of ``bucket/path``, or ``None`` if there is no such object."""
+
+        response = await self._client.storage.get(f"/object/{bucket}/{path}")
+        # Storage answers 400 rather than 404 for some missing objects.
+        if response.status_code in (400, 404):
+            return None
+        response.raise_for_status()
+        return response.content
+
     async def create_signed_url(self, bucket: str, path: str, expires_in: int = 3600) -> str:
         response = await self._client.storage.post(
             f"/object/sign/{bucket}",
@@ -0,0 +1,112 @@
+"""Keyset (cursor) pagination helpers for newest-first list endpoints."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, Optional, Protocol, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+
+from ..core.database import CountedRows, SupabaseAsyncClient
+from ..schemas.common import Page
+
+# ``id`` breaks ties between rows created in the same microsecond so the order is total.
+KEYSET_ORDER = "created_at.desc,id.desc"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+# Row ids are UUIDs, or job ids from ``generate_job_id``; anything else could break out
+# of the quoted PostgREST filter the cursor is spliced into.
+_ROW_ID = re.compile(r"[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|[a-z0-9_]+_[a-z0-9]{12}")
+
+
+class _Keyed(Protocol):
+    id: str
+    created_at: datetime
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        created_at, row_id = str(data["c"]), str(data["i"])
+        datetime.fromisoformat(created_at)
+        if not _ROW_ID.fullmatch(row_id):
+            raise ValueError(f"Malformed row id {row_id!r}")
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    return created_at, row_id
+
+
+def page_query(
+    filters: Dict[str, str],
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build ``SupabaseAsyncClient.select`` arguments for one newest-first page.
+
+    With a cursor the page starts strictly after the row it encodes and ``offset``
+    is ignored, so the query stays an index range scan however deep the client is.
+    """
+
+    filters = dict(filters)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Quoted because timestamps contain PostgREST's reserved "." and ":" characters.
+        filters["or"] = (
+            f'(created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{row_id}"))'
+        )
+        offset = 0
+    return {"filters": filters, "order": KEYSET_ORDER, "limit": limit, "offset": offset or None}
+
+
+async def fetch_page(
+    client: SupabaseAsyncClient,
+    table: str,
+    filters: Dict[str, str],
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    count: Optional[str] = "exact",
+    columns: str = "*",
+) -> CountedRows:
+    """Fetch one page and, unless paging by cursor, the total from ``Content-Range``.
+
+    Cursor pages skip the count: the client already has it from the first page and
+    the keyset filter would make it a count of the remaining rows only.
+    """
+
+    query = page_query(filters, limit=limit, offset=offset, cursor=cursor)
+    query["columns"] = columns
+    if cursor or count is None:
+        return CountedRows(rows=await client.select(table, **query), total=None)
+    return await client.select_with_count(table, count=count, **query)
+
+
+def set_page_headers(response: Response, page: Page[Any]) -> None:
+    """Expose page metadata as headers for endpoints whose body is a bare list."""
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        response.headers[TOTAL_COUNT_HEADER] = str(page.total)
+
+
+def next_cursor(items: Sequence[_Keyed], limit: int) -> Optional[str]:
+    """Cursor for the page after ``items``, or ``None`` when this page was the last."""
+
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,116 @@
+"""Measure sign-in latency against a fake Supabase with a fixed per-call delay.
+
+Usage::
+
+    python backend/benchmarks/bench_auth_sign_in.py --delay-ms 40 --iterations 20
+
+Every fake Supabase call sleeps for ``--delay-ms``. The report compares the measured
+wall-clock latency of ``AuthService.sign_in`` with the latency the same calls would
+cost if they were issued one after another.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from backend.app.core.config import Settings  # noqa: E402
+from backend.app.schemas.auth import AuthMethod, SignInRequest  # noqa: E402
+from backend.app.services.auth_service import AuthService  # noqa: E402
+
+
+class _DelayedAuthClient:
+    def __init__(self, backend: "FakeSupabase") -> None:
+        self._backend = backend
+
+    async def post(self, path: str, **_: Any) -> httpx.Response:
+        await self._backend.round_trip()
+        payload = {
+            "user": {
+                "id": "user-1",
+                "email": "creator@example.com",
+                "created_at": "2024-01-01T00:00:00Z",
+            },
+            "session": {"access_token": "jwt", "refresh_token": "refresh", "expires_in": 3600},
+        }
+        return httpx.Response(200, json=payload, request=httpx.Request("POST", f"https://fake{path}"))
+
+
+class FakeSupabase:
+    """Stand-in for SupabaseAsyncClient that counts calls and injects latency."""
+
+    def __init__(self, delay_seconds: float) -> None:
+        self._delay = delay_seconds
+        self.calls = 0
+        self.auth = _DelayedAuthClient(self)
+        self._deletion_requests: List[Dict[str, Any]] = [
+            {"scheduled_for": "2030-01-01T00:00:00+00:00", "requested_at": "2024-01-01T00:00:00+00:00"}
+        ]
+
+    async def round_trip(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+
+    async def select(self, table: str, **_: Any) -> List[Dict[str, Any]]:
+        await self.round_trip()
+        if table == "profiles":
+            return [{"id": "user-1", "full_name": "Creator", "created_at": "2024-01-01T00:00:00+00:00"}]
+        return list(self._deletion_requests)
+
+    async def insert(self, table: str, payload: Any, **_: Any) -> List[Dict[str, Any]]:
+        await self.round_trip()
+        return [payload]
+
+    async def update(self, table: str, payload: Dict[str, Any], **_: Any) -> List[Dict[str, Any]]:
+        await self.round_trip()
+        return []
+
+
+async def run(delay_ms: float, iterations: int) -> None:
+    settings = Settings()  # type: ignore[call-arg]
+    payload = SignInRequest(method=AuthMethod.EMAIL, email="creator@example.com", password="Passw0rd!")
+    latencies: List[float] = []
+    calls: List[int] = []
+
+    for _ in range(iterations):
+        fake = FakeSupabase(delay_ms / 1000)
+        service = AuthService(fake, settings)  # type: ignore[arg-type]
+        started = time.perf_counter()
+        await service.sign_in(payload)
+        latencies.append((time.perf_counter() - started) * 1000)
+        calls.append(fake.calls)
+
+    median_calls = statistics.median(calls)
+    print(f"per-call delay        : {delay_ms:.1f} ms")
+    print(f"supabase calls        : {median_calls:.0f}")
+    print(f"serial cost of calls  : {median_calls * delay_ms:.1f} ms")
+    print(f"sign-in latency p50   : {statistics.median(latencies):.1f} ms")
+    print(f"sign-in latency max   : {max(latencies):.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--delay-ms", type=float, default=40.0)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.delay_ms, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
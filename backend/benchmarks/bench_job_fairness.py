@@ -0,0 +1,96 @@
+"""Compare job queueing latency per tier under a skewed load, FIFO vs fair scheduling.
+
+Usage::
+
+    python backend/benchmarks/bench_job_fairness.py --heavy-jobs 200 --light-users 20 --concurrency 4
+
+One heavy ``free`` user submits ``--heavy-jobs`` jobs at once. Shortly after,
+``--light-users`` users per tier (``standard`` and ``pro``) each submit a few jobs.
+Every job sleeps for ``--job-ms``. The report shows the wait-time histogram that
+``WorkerPool`` records per tier for both pending-queue strategies.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from backend.app.schemas.jobs import JobCreate  # noqa: E402
+from backend.app.services.jobs.pool import PendingQueue, QueuedJob, WorkerPool  # noqa: E402
+from backend.app.services.jobs.scheduler import FairPending  # noqa: E402
+
+TIER_WEIGHTS = {"free": 1.0, "standard": 1.0, "pro": 2.0}
+
+
+async def run_load(
+    pending: Optional[PendingQueue],
+    heavy_jobs: int,
+    light_users: int,
+    light_jobs: int,
+    concurrency: int,
+    job_seconds: float,
+) -> Dict[str, Dict[str, float]]:
+    done = asyncio.Event()
+    total = heavy_jobs + 2 * light_users * light_jobs
+    finished = 0
+
+    async def run(job: QueuedJob) -> None:
+        nonlocal finished
+        await asyncio.sleep(job_seconds)
+        finished += 1
+        if finished == total:
+            done.set()
+
+    pool = WorkerPool(run, max_concurrency=concurrency, max_pending=total, pending=pending)
+    for index in range(heavy_jobs):
+        pool.submit(QueuedJob(f"heavy-{index}", "heavy", JobCreate(job_type="audio_render"), tier="free"))
+    await asyncio.sleep(job_seconds)
+    for tier in ("standard", "pro"):
+        for user in range(light_users):
+            for index in range(light_jobs):
+                job_id = f"{tier}-{user}-{index}"
+                pool.submit(QueuedJob(job_id, f"{tier}-{user}", JobCreate(job_type="audio_render"), tier=tier))
+    await done.wait()
+    return pool.stats()["wait_seconds_by_tier"]
+
+
+async def run(heavy_jobs: int, light_users: int, light_jobs: int, concurrency: int, job_ms: float) -> None:
+    job_seconds = job_ms / 1000
+    print(f"load: 1 heavy user x {heavy_jobs} jobs, {light_users} standard + {light_users} pro users x {light_jobs}")
+    print(f"pool: {concurrency} workers, {job_ms:.0f} ms per job")
+    for name, pending in (("fifo", None), ("fair", FairPending(tier_weights=TIER_WEIGHTS))):
+        waits = await run_load(pending, heavy_jobs, light_users, light_jobs, concurrency, job_seconds)
+        for tier in ("free", "standard", "pro"):
+            stats = waits[tier]
+            print(
+                f"{name:<5} {tier:<9} jobs {stats['count']:4d} | "
+                f"p50 {stats['p50'] * 1000:8.0f} ms | p95 {stats['p95'] * 1000:8.0f} ms | "
+                f"max {stats['max'] * 1000:8.0f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--heavy-jobs", type=int, default=200)
+    parser.add_argument("--light-users", type=int, default=20)
+    parser.add_argument("--light-jobs", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--job-ms", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.heavy_jobs, args.light_users, args.light_jobs, args.concurrency, args.job_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare payload size and latency of full vs summary content list pages.
+
+Usage::
+
+    python backend/benchmarks/bench_list_projection.py --items 100 --article-kb 12 --bandwidth-mbit 100
+
+A fake Supabase client serves ``--items`` articles, applying the requested column
+projection and charging ``--rtt-ms`` plus transfer time at ``--bandwidth-mbit`` for
+the JSON it returns. The report shows bytes transferred from Supabase, bytes sent to
+the client and the end-to-end latency of ``ContentService.list_scraped_content``
+plus response serialisation for ``view=full`` and ``view=summary``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from backend.app.core.database import CountedRows  # noqa: E402
+from backend.app.services.content_service import ContentService  # noqa: E402
+
+
+class FakeSupabase:
+    """Serves a fixed article table and simulates network cost per returned byte."""
+
+    def __init__(self, rows: List[Dict[str, Any]], rtt_seconds: float, bytes_per_second: float) -> None:
+        self._rows = rows
+        self._rtt = rtt_seconds
+        self._bytes_per_second = bytes_per_second
+        self.bytes_returned = 0
+
+    async def select_with_count(self, table: str, *, columns: str = "*", limit: int = 20, **_: Any) -> CountedRows:
+        rows = self._rows[:limit]
+        if columns != "*":
+            wanted = columns.split(",")
+            rows = [{column: row[column] for column in wanted} for row in rows]
+        body = json.dumps(rows).encode()
+        self.bytes_returned = len(body)
+        await asyncio.sleep(self._rtt + len(body) / self._bytes_per_second)
+        # Decode like httpx would so parsing cost is included.
+        return CountedRows(rows=json.loads(body), total=len(self._rows))
+
+
+def build_rows(items: int, article_kb: int) -> List[Dict[str, Any]]:
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    paragraph = "Podcasts turn long-form articles into something you can listen to on the go. "
+    markdown = (paragraph * (article_kb * 1024 // len(paragraph) + 1))[: article_kb * 1024]
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{index:012d}",
+            "user_id": "11111111-1111-1111-1111-111111111111",
+            "url": f"https://example.com/articles/{index}",
+            "title": f"Article {index}",
+            "markdown": markdown,
+            "provider": "firecrawl",
+            "metadata": {"language": "en", "word_count": article_kb * 170},
+            "created_at": (started - timedelta(minutes=index)).isoformat(),
+            "updated_at": (started - timedelta(minutes=index)).isoformat(),
+        }
+        for index in range(items)
+    ]
+
+
+async def measure(fake: FakeSupabase, view: str, items: int, iterations: int) -> Dict[str, float]:
+    service = ContentService(fake)  # type: ignore[arg-type]
+    latencies: List[float] = []
+    response_bytes = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        page = await service.list_scraped_content("user-1", limit=items, view=view)  # type: ignore[arg-type]
+        response_bytes = len(page.model_dump_json())
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "supabase_bytes": fake.bytes_returned,
+        "response_bytes": response_bytes,
+        "p50_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+    }
+
+
+async def run(items: int, article_kb: int, rtt_ms: float, bandwidth_mbit: float, iterations: int) -> None:
+    fake = FakeSupabase(build_rows(items, article_kb), rtt_ms / 1000, bandwidth_mbit * 1_000_000 / 8)
+    results = {view: await measure(fake, view, items, iterations) for view in ("full", "summary")}
+
+    print(f"items per page        : {items} ({article_kb} KiB articles)")
+    print(f"network               : {rtt_ms:.0f} ms RTT, {bandwidth_mbit:.0f} Mbit/s")
+    for view, stats in results.items():
+        print(
+            f"{view:<8} supabase {stats['supabase_bytes'] / 1024:9.1f} KiB | "
+            f"response {stats['response_bytes'] / 1024:9.1f} KiB | "
+            f"p50 {stats['p50_ms']:7.1f} ms | max {stats['max_ms']:7.1f} ms"
+        )
+    full, summary = results["full"], results["summary"]
+    print(f"payload reduction     : {1 - summary['response_bytes'] / full['response_bytes']:.1%}")
+    print(f"p50 latency reduction : {1 - summary['p50_ms'] / full['p50_ms']:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--article-kb", type=int, default=12)
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--bandwidth-mbit", type=float, default=100.0)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.article_kb, args.rtt_ms, args.bandwidth_mbit, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
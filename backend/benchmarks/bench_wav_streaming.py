@@ -0,0 +1,109 @@
+"""Compare peak memory of rendering an episode in memory with streaming it to a WAV file.
+
+Usage::
+
+    python backend/benchmarks/bench_wav_streaming.py --minutes 60 --chunk-chars 6000
+
+The fake TTS provider returns 24 kHz PCM for every chunk. The in-memory path joins
+all chunks and builds the WAV with ``RenderedAudio.to_wav``, as the audio_render
+handler used to; the streaming path hands each chunk to a ``WavWriter`` on a
+temporary file. Peak memory is measured with ``tracemalloc``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Awaitable, Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_ANON_KEY", "anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "service-role-key")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+from backend.app.schemas.scripts import ScriptSegment  # noqa: E402
+from backend.app.services.audio import AudioRenderer, FakeTTSProvider, WavWriter  # noqa: E402
+
+SAMPLES_PER_CHAR = 40
+TURN_CHARS = 400
+
+
+def build_script(minutes: float, sample_rate: int) -> List[ScriptSegment]:
+    turns = int(minutes * 60 * sample_rate / SAMPLES_PER_CHAR / TURN_CHARS) + 1
+    return [
+        ScriptSegment(speaker="Alex" if index % 2 == 0 else "Sam", content=(f"Turn {index}. " + "word " * 80)[:TURN_CHARS])
+        for index in range(turns)
+    ]
+
+
+async def in_memory(renderer: AudioRenderer, script: List[ScriptSegment], path: str) -> int:
+    audio = await renderer.render(script, {}, "en")
+    wav = audio.to_wav()
+    with open(path, "wb") as file:
+        file.write(wav)
+    return len(wav)
+
+
+async def streamed(renderer: AudioRenderer, script: List[ScriptSegment], path: str) -> int:
+    with open(path, "wb") as file:
+        writer = WavWriter(file, renderer.sample_rate)
+
+        async def write(pcm: memoryview) -> None:
+            await asyncio.to_thread(writer.write, pcm)
+
+        await renderer.render_to(write, script, {}, "en")
+        writer.close()
+        return file.tell()
+
+
+async def measure(
+    name: str, render: Callable[[AudioRenderer, List[ScriptSegment], str], Awaitable[int]], args: argparse.Namespace
+) -> Tuple[int, int, float]:
+    provider = FakeTTSProvider(samples_per_char=SAMPLES_PER_CHAR)
+    renderer = AudioRenderer(provider, max_chunk_chars=args.chunk_chars, concurrency=args.concurrency)
+    script = build_script(args.minutes, provider.sample_rate)
+    fd, path = tempfile.mkstemp(prefix=f"bench_{name}_", suffix=".wav")
+    os.close(fd)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = await render(renderer, script, path)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+    return size, peak, elapsed
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"episode: {args.minutes:.0f} min of 24 kHz mono PCM, {args.chunk_chars} chars per chunk")
+    print(f"renderer: {args.concurrency} concurrent requests")
+    for name, render in (("memory", in_memory), ("stream", streamed)):
+        size, peak, elapsed = await measure(name, render, args)
+        print(
+            f"{name:<6} wav {size / 2**20:8.1f} MiB | peak {peak / 2**20:8.1f} MiB | "
+            f"{elapsed * 1000:8.0f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--chunk-chars", type=int, default=6000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,27 @@
 import asyncio
 from typing import Dict
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 
+from app.api.deps import require_metrics_token
 from app.api.v1.api import api_router
 from app.core.config import get_settings
 from app.core.database import get_supabase_client
 from app.core.logging import configure_logging, get_logger
 from app.core.middleware import register_middlewares
 from app.schemas.jobs import JobCreate
+from app.services.audio import (
+    AudioRenderer,
+    AudioRenderHandler,
+    build_audio_encoder,
+    build_post_processor,
+    build_segment_cache,
+    build_tts_provider,
+)
+from app.services.auth_service import get_profile_cache
 from app.services.jobs import JobManager
+from app.services.script_service import ScriptService
+from app.services.storage_service import StorageService
 
 settings = get_settings()
 configure_logging()
@@ -36,6 +48,22 @@ async def health_check():
     }
 
 
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Process-local counters for capacity planning and cache tuning; needs ``METRICS_TOKEN``."""
+    return {
+        "caches": {
+            "user_profiles": get_profile_cache().stats(),
+            "tts_segments": app.state.tts_cache.stats() if getattr(app.state, "tts_cache", None) else None,
+        },
+        "supabase_pool": get_supabase_client(settings).pool_stats(),
+        "supabase_resilience": get_supabase_client(settings).resilience_stats(),
+        "supabase_read_coalescing": get_supabase_client(settings).coalescing_stats(),
+        "jobs": app.state.job_manager.stats() if hasattr(app.state, "job_manager") else None,
+        "audio_encoder": app.state.audio_encoder.stats() if getattr(app.state, "audio_encoder", None) else None,
+    }
+
+
 app.include_router(api_router, prefix=settings.api_v1_prefix)
 
 
@@ -50,15 +78,56 @@ async def _mock_job_handler(job: JobCreate) -> Dict[str, str]:
 async def on_startup() -> None:
     logger.info("Starting EchoGen.ai backend")
     client = get_supabase_client(settings)
-    job_manager = JobManager(client)
-    job_manager.register_handler("script_generation", _mock_job_handler)
-    job_manager.register_handler("audio_render", _mock_job_handler)
+    job_manager = JobManager(client, settings)
+    job_manager.register_handler(
+        "script_generation", _mock_job_handler, cache_ttl=settings.job_result_cache_ttl_seconds
+    )
+    try:
+        provider = build_tts_provider(settings)
+    except ValueError as exc:
+        logger.warning("Server-side audio rendering disabled", reason=str(exc))
+        job_manager.register_handler("audio_render", _mock_job_handler)
+    else:
+        app.state.tts_provider = provider
+        storage = StorageService(client, settings)
+        app.state.tts_cache = build_segment_cache(settings, storage)
+        renderer = AudioRenderer(
+            provider,
+            max_chunk_chars=settings.tts_max_chunk_chars,
+            concurrency=settings.tts_concurrency,
+            cache=app.state.tts_cache,
+            postprocess=build_post_processor(settings, provider.sample_rate),
+        )
+        try:
+            app.state.audio_encoder = build_audio_encoder(settings)
+        except ValueError as exc:
+            logger.warning("Audio encoding disabled; storing WAV", reason=str(exc))
+            app.state.audio_encoder = None
+        job_manager.register_handler(
+            "audio_render",
+            AudioRenderHandler(
+                ScriptService(client),
+                storage,
+                renderer,
+                settings.supabase_storage_bucket_audio,
+                encoder=app.state.audio_encoder,
+            ),
+        )
     app.state.job_manager = job_manager
+    await job_manager.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
     logger.info("Shutting down EchoGen.ai backend")
+    job_manager = getattr(app.state, "job_manager", None)
+    if job_manager is not None:
+        await job_manager.stop()
+    close_provider = getattr(getattr(app.state, "tts_provider", None), "close", None)
+    if close_provider is not None:
+        await close_provider()
+    if getattr(app.state, "audio_encoder", None) is not None:
+        await app.state.audio_encoder.close()
     client = get_supabase_client(settings)
     await client.close()
 
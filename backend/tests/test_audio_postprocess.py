@@ -0,0 +1,90 @@
+"""Tests for levelling, trimming and crossfading rendered chunks."""
+import math
+from typing import List
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pydantic")
+
+from backend.app.schemas.scripts import ScriptSegment
+from backend.app.services.audio import AudioPostProcessor, AudioRenderer, FakeTTSProvider
+
+RATE = 24_000
+
+
+def _tone(seconds: float, amplitude: float, frequency: float = 220.0) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.rint(amplitude * 32767 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def _rms_dbfs(samples: np.ndarray) -> float:
+    return 10 * math.log10(float(np.mean(samples.astype(np.float64) ** 2)) / 32768**2)
+
+
+def _run(processor: AudioPostProcessor, chunks: List[np.ndarray]) -> np.ndarray:
+    stream = processor.stream()
+    out = [bytes(stream.process(chunk.tobytes())) for chunk in chunks] + [bytes(stream.finish())]
+    return np.frombuffer(b"".join(out), dtype=np.int16)
+
+
+def test_trims_silence_and_levels_each_chunk_to_the_target():
+    processor = AudioPostProcessor(RATE, target_dbfs=-20.0, keep_silence_ms=100, crossfade_ms=0)
+    quiet = np.concatenate([_silence(0.4), _tone(0.5, 0.05), _silence(0.6)])
+    loud = np.concatenate([_tone(0.5, 0.6), _silence(0.3)])
+
+    first = _run(processor, [quiet])
+    second = _run(processor, [loud])
+
+    assert len(first) == pytest.approx(0.7 * RATE, abs=240)
+    assert len(second) == pytest.approx(0.6 * RATE, abs=240)
+    assert _rms_dbfs(first[int(0.1 * RATE) : int(0.6 * RATE)]) == pytest.approx(-20.0, abs=0.5)
+    assert _rms_dbfs(second[: int(0.5 * RATE)]) == pytest.approx(-20.0, abs=0.5)
+
+
+def test_gain_is_capped_and_never_clips():
+    processor = AudioPostProcessor(RATE, target_dbfs=-3.0, max_gain_db=6.0, crossfade_ms=0)
+    whisper = _run(processor, [_tone(0.5, 0.01)])
+    # Square-ish wave: RMS close to peak, so the -1 dBFS ceiling wins over the target.
+    square = _run(processor, [np.clip(_tone(0.5, 4.0), -16000, 16000).astype(np.int16)])
+
+    assert _rms_dbfs(whisper) == pytest.approx(_rms_dbfs(_tone(0.5, 0.01)) + 6.0, abs=0.2)
+    assert np.abs(square.astype(np.int32)).max() <= round(32768 * 10 ** (-1 / 20))
+
+
+def test_crossfade_overlaps_chunks_without_a_step():
+    processor = AudioPostProcessor(RATE, keep_silence_ms=0, crossfade_ms=20)
+    chunks = [_tone(0.3, 0.1), _tone(0.3, 0.1, frequency=330.0), _silence(0.2), _tone(0.3, 0.1)]
+
+    out = _run(processor, chunks)
+
+    # The silent chunk is dropped; each remaining boundary overlaps by 20 ms.
+    assert len(out) == 3 * len(chunks[0]) - 2 * int(0.02 * RATE)
+    assert np.abs(np.diff(out.astype(np.int32))).max() < 1_500
+
+
+def test_block_size_does_not_change_the_output():
+    chunks = [np.concatenate([_silence(0.25), _tone(0.73, 0.05), _silence(0.4)]), _tone(0.41, 0.3)]
+    small = AudioPostProcessor(RATE, block_samples=1_000)
+    large = AudioPostProcessor(RATE, block_samples=1 << 20)
+
+    assert np.array_equal(_run(small, chunks), _run(large, chunks))
+
+
+@pytest.mark.asyncio
+async def test_renderer_post_processes_chunks_in_order():
+    provider = FakeTTSProvider()
+    segments = [ScriptSegment(speaker="Alex" if i % 2 else "Sam", content=f"Line {i}. " + "word " * 20) for i in range(6)]
+    plain = await AudioRenderer(provider, max_chunk_chars=200, concurrency=3).render(segments, {}, "en")
+    processed = await AudioRenderer(
+        provider, max_chunk_chars=200, concurrency=3, postprocess=AudioPostProcessor(RATE, keep_silence_ms=0)
+    ).render(segments, {}, "en")
+
+    assert processed.pcm_bytes == len(processed.pcm)
+    crossfade_bytes = 2 * int(0.02 * RATE) * (processed.chunks - 1)
+    assert len(processed.pcm) == len(plain.pcm) - crossfade_bytes
+    assert _rms_dbfs(np.frombuffer(processed.pcm, dtype=np.int16)) == pytest.approx(-20.0, abs=1.0)
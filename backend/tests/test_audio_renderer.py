@@ -0,0 +1,372 @@
+"""Tests for chunked, concurrent audio rendering."""
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("numpy")
+
+from backend.app.schemas.jobs import JobCreate
+from backend.app.schemas.scripts import ScriptSegment
+from backend.app.services.audio import (
+    AudioEncoder,
+    AudioRenderer,
+    AudioRenderHandler,
+    DiskSegmentCache,
+    EncodedAudio,
+    FakeTTSProvider,
+    StorageSegmentCache,
+    TieredSegmentCache,
+    WavWriter,
+    detect_backend,
+    segment_cache_key,
+    split_segments,
+    wav_header,
+)
+from backend.app.services.audio.chunking import SpeechChunk
+from backend.app.services.jobs.executors import ProcessJobPool
+
+
+def _script(turns: int) -> List[ScriptSegment]:
+    return [
+        ScriptSegment(speaker="Alex" if index % 2 == 0 else "Sam", content=f"Line {index}. " + "word " * 30)
+        for index in range(turns)
+    ]
+
+
+def test_split_segments_keeps_order_and_chunk_size():
+    segments = _script(20)
+    segments.insert(5, ScriptSegment(speaker="Alex", content="A long turn. " * 60))
+    chunks = split_segments(segments, max_chars=400)
+
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert all(len(chunk.text) <= 400 for chunk in chunks)
+    spoken = " ".join(turn.content for chunk in chunks for turn in chunk.segments)
+    assert " ".join(spoken.split()) == " ".join(" ".join(s.content for s in segments).split())
+    assert chunks[0].speakers == ["Alex", "Sam"]
+
+
+class FailingProvider(FakeTTSProvider):
+    async def synthesize(self, chunk: SpeechChunk, voices: Any, language: str) -> bytes:
+        if chunk.index == 2:
+            raise RuntimeError("provider exploded")
+        return await super().synthesize(chunk, voices, language)
+
+
+@pytest.mark.asyncio
+async def test_renderer_synthesizes_concurrently_and_reassembles_in_order():
+    provider = FakeTTSProvider(latency=0.05)
+    renderer = AudioRenderer(provider, max_chunk_chars=300, concurrency=4)
+    segments = _script(24)
+    progress: List[Tuple[int, int]] = []
+
+    started = time.monotonic()
+    audio = await renderer.render(segments, {}, "en", on_chunk=lambda done, total: progress.append((done, total)))
+    elapsed = time.monotonic() - started
+
+    chunks = split_segments(segments, 300)
+    assert audio.chunks == len(chunks) > 4
+    assert audio.pcm == b"".join(provider.pcm_for(chunk.text) for chunk in chunks)
+    assert provider.max_in_flight == 4
+    assert elapsed < 0.05 * len(chunks) / 2
+    assert progress[-1] == (len(chunks), len(chunks))
+    with wave.open(io.BytesIO(audio.to_wav())) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 24_000)
+        assert wav.getnframes() == len(audio.pcm) // 2
+
+
+@pytest.mark.asyncio
+async def test_renderer_cancels_remaining_chunks_when_one_fails():
+    provider = FailingProvider(latency=0.05)
+    renderer = AudioRenderer(provider, max_chunk_chars=300, concurrency=2)
+
+    with pytest.raises(RuntimeError, match="provider exploded"):
+        await renderer.render(_script(24), {}, "en")
+    await asyncio.sleep(0.1)
+    assert provider.in_flight == 0
+    assert len(provider.calls) < len(split_segments(_script(24), 300))
+
+
+class SlowFirstChunkProvider(FakeTTSProvider):
+    async def synthesize(self, chunk: SpeechChunk, voices: Any, language: str) -> bytes:
+        if chunk.index == 0:
+            await asyncio.sleep(0.1)
+        return await super().synthesize(chunk, voices, language)
+
+
+@pytest.mark.asyncio
+async def test_render_to_writes_in_order_and_bounds_chunks_held_in_memory():
+    provider = SlowFirstChunkProvider()
+    renderer = AudioRenderer(provider, max_chunk_chars=300, concurrency=2)
+    segments = _script(24)
+    written: List[bytes] = []
+
+    async def sink(pcm: memoryview) -> None:
+        written.append(bytes(pcm))
+
+    summary = await renderer.render_to(sink, segments, {}, "en")
+
+    chunks = split_segments(segments, 300)
+    assert written == [provider.pcm_for(chunk.text) for chunk in chunks]
+    # While the first chunk is outstanding only the rest of its window (2 * concurrency) finishes.
+    order = [chunk.index for chunk in provider.calls]
+    assert order[: order.index(0)] == [1, 2, 3]
+    assert summary.pcm_bytes == sum(map(len, written))
+    assert summary.duration_seconds == summary.pcm_bytes / 48_000
+
+
+def test_wav_writer_patches_header_of_seekable_file():
+    path = Path(tempfile.mkdtemp()) / "episode.wav"
+    with path.open("wb") as file:
+        writer = WavWriter(file, 24_000)
+        for _ in range(3):
+            writer.write(memoryview(b"\x01\x00" * 500))
+        writer.close()
+
+    with wave.open(str(path)) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, 24_000)
+        assert wav.getnframes() == 1_500
+    assert path.stat().st_size == 44 + 3_000
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self.data.extend(data)
+        return len(data)
+
+
+def test_wav_writer_streams_to_unseekable_file_with_known_size():
+    with pytest.raises(ValueError):
+        WavWriter(_Unseekable(), 24_000)
+
+    stream = _Unseekable()
+    writer = WavWriter(stream, 24_000, data_bytes=8)
+    writer.write(b"\x00" * 8)
+    writer.close()
+    assert bytes(stream.data) == wav_header(8, 24_000) + b"\x00" * 8
+    with pytest.raises(ValueError):
+        writer.write(b"\x00\x00")
+
+
+class StubScripts:
+    async def get_script(self, user_id: str, script_id: str) -> Any:
+        class Script:
+            segments = _script(6)
+            language = "de"
+
+        return Script()
+
+
+class StubStorage:
+    def __init__(self) -> None:
+        self.objects: Dict[str, Tuple[bytes, str]] = {}
+
+    async def upload(self, bucket: str, path: str, data: bytes, content_type: str) -> str:
+        self.objects[f"{bucket}/{path}"] = (data, content_type)
+        return path
+
+    async def upload_file(self, bucket: str, path: str, file_path: str, content_type: str) -> str:
+        return await self.upload(bucket, path, Path(file_path).read_bytes(), content_type)
+
+    async def remove(self, bucket: str, paths: List[str]) -> None:
+        for path in paths:
+            self.objects.pop(f"{bucket}/{path}", None)
+
+    async def download(self, bucket: str, path: str) -> Optional[bytes]:
+        stored = self.objects.get(f"{bucket}/{path}")
+        return stored[0] if stored else None
+
+
+class RecordingContext:
+    job_id = "audio_render_1"
+    user_id = "user-1"
+
+    def __init__(self) -> None:
+        self.reports: List[Dict[str, Any]] = []
+        self.cleanups: List[Any] = []
+
+    def report(self, **kwargs: Any) -> None:
+        self.reports.append(kwargs)
+
+    def add_cleanup(self, callback: Any, *args: Any) -> None:
+        self.cleanups.append((callback, args))
+
+
+@pytest.mark.asyncio
+async def test_audio_render_handler_uploads_wav_and_reports_progress():
+    provider = FakeTTSProvider()
+    storage = StubStorage()
+    handler = AudioRenderHandler(
+        StubScripts(),  # type: ignore[arg-type]
+        storage,  # type: ignore[arg-type]
+        AudioRenderer(provider, max_chunk_chars=300, concurrency=2),
+        "podcast-audio",
+    )
+    context = RecordingContext()
+
+    result = await handler(JobCreate(job_type="audio_render", payload={"script_id": "script-1"}), context)  # type: ignore[arg-type]
+
+    data, content_type = storage.objects["podcast-audio/user-1/audio_render_1.wav"]
+    assert content_type == "audio/wav" and data[:4] == b"RIFF"
+    assert result["audio_path"] == "user-1/audio_render_1.wav"
+    assert result["chunks"] == len(provider.calls)
+    assert result["duration_seconds"] > 0
+    assert [report["stage"] for report in context.reports][-1] == "upload"
+    assert context.reports[-2]["partial"] == {"chunks_done": result["chunks"], "chunks_total": result["chunks"]}
+    # Were the job cancelled after the upload started, its cleanup would delete the object.
+    ((cleanup, args),) = context.cleanups
+    await cleanup(*args)
+    assert storage.objects == {}
+
+
+def test_segment_cache_key_ignores_whitespace_but_not_voice_or_model():
+    key = segment_cache_key("gemini", "tts-1", "Kore", "Hello  there,\n friend.", "pcm_s16le_24000")
+    assert key == segment_cache_key("gemini", "tts-1", "Kore", " Hello there, friend. ", "pcm_s16le_24000")
+    assert key != segment_cache_key("gemini", "tts-1", "Puck", "Hello there, friend.", "pcm_s16le_24000")
+    assert key != segment_cache_key("gemini", "tts-2", "Kore", "Hello there, friend.", "pcm_s16le_24000")
+
+
+@pytest.mark.asyncio
+async def test_disk_segment_cache_evicts_least_recently_used():
+    directory = Path(tempfile.mkdtemp())
+    cache = DiskSegmentCache(directory, max_bytes=300)
+    for key in ("aa1", "bb2", "cc3"):
+        await cache.put(key, key.encode() * 30)
+    assert await cache.get("aa1") == b"aa1" * 30
+    await cache.put("dd4", b"x" * 90)
+
+    assert await cache.get("bb2") is None
+    assert await cache.get("cc3") == b"cc3" * 30
+    assert await cache.get("aa1") == b"aa1" * 30
+    assert (cache.stats()["bytes"], cache.stats()["evictions"]) == (270, 1)
+    # A new process sees the surviving entries.
+    reopened = DiskSegmentCache(directory, max_bytes=300)
+    assert await reopened.get("dd4") == b"x" * 90
+    assert await reopened.get("bb2") is None
+    assert reopened.stats()["bytes"] == 270
+
+
+@pytest.mark.asyncio
+async def test_rerender_only_synthesizes_changed_segments():
+    provider = FakeTTSProvider()
+    renderer = AudioRenderer(
+        provider, max_chunk_chars=300, concurrency=4, cache=DiskSegmentCache(Path(tempfile.mkdtemp()), 10_000_000)
+    )
+    script = _script(10)
+    first = await renderer.render(script, {}, "en")
+    assert (first.chunks, first.cached_chunks, len(provider.calls)) == (10, 0, 10)
+
+    edited = list(script)
+    edited[4] = ScriptSegment(speaker=script[4].speaker, content="A rewritten line.")
+    provider.calls.clear()
+    second = await renderer.render(edited, {}, "en")
+    assert second.cached_chunks == 9
+    assert [chunk.text for chunk in provider.calls] == [f"{script[4].speaker}: A rewritten line."]
+    assert second.pcm == b"".join(provider.pcm_for(f"{s.speaker}: {s.content.strip()}") for s in edited)
+
+    # Another voice for one speaker re-synthesizes exactly that speaker's turns.
+    provider.calls.clear()
+    await renderer.render(edited, {"Sam": "other-voice"}, "en")
+    assert {turn.speaker for chunk in provider.calls for turn in chunk.segments} == {"Sam"}
+    assert len(provider.calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_fills_disk_from_shared_storage():
+    storage = StubStorage()
+    shared = StorageSegmentCache(storage, "podcast-audio")  # type: ignore[arg-type]
+    await shared.put("abc123", b"pcm")
+    disk = DiskSegmentCache(Path(tempfile.mkdtemp()), 1_000)
+    cache = TieredSegmentCache([disk, shared])
+
+    assert await cache.get("abc123") == b"pcm"
+    assert await disk.get("abc123") == b"pcm"
+    assert "podcast-audio/tts-cache/ab/abc123.pcm" in storage.objects
+    assert await cache.get("missing") is None
+
+
+def _tone_wav(seconds: float) -> str:
+    import numpy as np
+
+    t = np.arange(int(seconds * 24_000)) / 24_000
+    samples = np.rint(8_000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    with os.fdopen(fd, "wb") as file:
+        writer = WavWriter(file, 24_000)
+        writer.write(samples)
+        writer.close()
+    return path
+
+
+@pytest.mark.asyncio
+async def test_mp3_encoding_runs_in_a_worker_process():
+    pytest.importorskip("lameenc")
+    assert detect_backend("mp3") == "lameenc"
+    source = _tone_wav(5.0)
+    target = source[:-4] + ".mp3"
+    pool = ProcessJobPool(workers=1, max_payload_bytes=1_000_000)
+    encoder = AudioEncoder("mp3", 64, "lameenc", pool)
+    try:
+        encoded = await encoder.encode(source, target)
+    finally:
+        await encoder.close()
+
+    data = Path(target).read_bytes()
+    assert encoded == EncodedAudio(target, "mp3", "audio/mpeg", 64, len(data))
+    # MPEG audio frame sync.
+    assert data[0] == 0xFF and data[1] & 0xE0 == 0xE0
+    assert len(data) == pytest.approx(5.0 * 64_000 / 8, rel=0.1)
+    assert len(data) < os.path.getsize(source) / 5
+    os.remove(source)
+    os.remove(target)
+
+
+class CopyingEncoder:
+    format = "mp3"
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, str]] = []
+
+    async def encode(self, source: str, target: str) -> EncodedAudio:
+        self.calls.append((source, target))
+        shutil.copyfile(source, target)
+        return EncodedAudio(target, "mp3", "audio/mpeg", 64, os.path.getsize(target))
+
+
+@pytest.mark.asyncio
+async def test_audio_render_handler_uploads_encoded_audio_with_its_format():
+    storage = StubStorage()
+    encoder = CopyingEncoder()
+    handler = AudioRenderHandler(
+        StubScripts(),  # type: ignore[arg-type]
+        storage,  # type: ignore[arg-type]
+        AudioRenderer(FakeTTSProvider(), max_chunk_chars=300, concurrency=2),
+        "podcast-audio",
+        encoder=encoder,  # type: ignore[arg-type]
+    )
+    context = RecordingContext()
+
+    result: Dict[str, Any] = await handler(
+        JobCreate(job_type="audio_render", payload={"script_id": "script-1"}), context  # type: ignore[arg-type]
+    )
+
+    assert list(storage.objects) == ["podcast-audio/user-1/audio_render_1.mp3"]
+    assert storage.objects["podcast-audio/user-1/audio_render_1.mp3"][1] == "audio/mpeg"
+    assert (result["format"], result["content_type"], result["bitrate_kbps"]) == ("mp3", "audio/mpeg", 64)
+    assert [report["stage"] for report in context.reports][-2:] == ["encode", "upload"]
+    ((source, target),) = encoder.calls
+    assert not os.path.exists(source) and not os.path.exists(target)
@@ -1,18 +1,24 @@
+import asyncio
+import base64
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock
 
 import httpx
 import pytest
 from fastapi import HTTPException, status
+from jose import jwt
 
 from backend.app.core.config import Settings
 from backend.app.schemas.auth import (
+    AccountDeletionStatus,
     AuthMethod,
+    AuthResponse,
     OnboardingAnswer,
     OnboardingSubmission,
     ProfileUpdateRequest,
     SignInRequest,
     SignUpRequest,
+    SessionTokens,
     UserProfile,
 )
 from backend.app.services import auth_service
@@ -34,6 +40,15 @@ class FakeSupabaseClient:
         self.select = AsyncMock()
         self.insert = AsyncMock()
         self.update = AsyncMock()
+        # Behave like a database without the get_profile_bundle function by default.
+        rpc_request = httpx.Request("POST", "https://example.supabase.co/rest/v1/rpc/get_profile_bundle")
+        self.rpc = AsyncMock(
+            side_effect=httpx.HTTPStatusError(
+                "function not found",
+                request=rpc_request,
+                response=httpx.Response(404, request=rpc_request),
+            )
+        )
 
 
 @pytest.fixture()
@@ -131,8 +146,14 @@ async def test_sign_in_with_phone_uses_password_grant(
     fake_client: FakeSupabaseClient, settings: Settings
 ) -> None:
     service = AuthService(fake_client, settings)
-    auth_response = MagicMock()
-    auth_response.user.id = "user-1"
+    # The profile other requests read from the cache, hydrated before the cancellation.
+    cached_user = UserProfile(
+        id="user-1",
+        email="user@example.com",
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+        pendingAccountDeletion=AccountDeletionStatus(scheduled_for=datetime(2024, 2, 1, tzinfo=UTC)),
+    )
+    auth_response = AuthResponse(user=cached_user, session=SessionTokens(access_token="jwt"))
     service._build_auth_response = AsyncMock(return_value=auth_response)  # type: ignore[attr-defined]
     service.cancel_pending_deletion = AsyncMock(return_value=None)  # type: ignore[attr-defined]
 
@@ -152,7 +173,9 @@ async def test_sign_in_with_phone_uses_password_grant(
     assert request_json["phone"] == "+13334445555"
     assert request_json["password"] == "Passw0rd!"
     service.cancel_pending_deletion.assert_awaited_once_with("user-1")
-    assert result is auth_response
+    assert result.session == auth_response.session
+    assert result.user.pending_account_deletion is None
+    assert cached_user.pending_account_deletion is not None
 
 
 @pytest.mark.anyio
@@ -392,3 +415,337 @@ async def test_submit_onboarding_logs_insert_failure(
     assert "onboarding" in update_payload["preferences"]
     assert update_payload["preferences"]["onboarding"]["responses"][0]["questionId"] == "format"
     assert result == expected_user
+
+
+@pytest.mark.anyio
+async def test_verify_access_token_validates_locally(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    expected_user = UserProfile(
+        id="user-1",
+        email="user@example.com",
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+    service._build_user_profile = AsyncMock(return_value=expected_user)  # type: ignore[attr-defined]
+    token = jwt.encode(
+        {
+            "sub": "user-1",
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "exp": int(datetime.now(UTC).timestamp()) + 3600,
+            "user_metadata": {"full_name": "Echo Creator"},
+        },
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    result = await service.verify_access_token(token)
+
+    assert result.user == expected_user
+    fake_client.auth.get.assert_not_awaited()
+    auth_user = service._build_user_profile.await_args.args[0]
+    assert auth_user["id"] == "user-1"
+    assert auth_user["user_metadata"] == {"full_name": "Echo Creator"}
+
+
+@pytest.mark.anyio
+async def test_verify_access_token_falls_back_to_supabase_when_inconclusive(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    expected_user = UserProfile(
+        id="user-1",
+        email="user@example.com",
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+    service._build_user_profile = AsyncMock(return_value=expected_user)  # type: ignore[attr-defined]
+    fake_client.auth.get = AsyncMock(
+        return_value=make_response({"id": "user-1", "email": "user@example.com"}, method="GET")
+    )
+    token = jwt.encode(
+        {"sub": "user-1", "aud": "authenticated", "exp": int(datetime.now(UTC).timestamp()) + 3600},
+        "rotated-secret",
+        algorithm="HS256",
+    )
+
+    result = await service.verify_access_token(token)
+
+    assert result.user == expected_user
+    fake_client.auth.get.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_verify_access_token_rejects_signed_out_session(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    fake_client.auth.post = AsyncMock(return_value=make_response({}, status_code=status.HTTP_204_NO_CONTENT))
+    token = jwt.encode(
+        {
+            "sub": "user-1",
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "exp": int(datetime.now(UTC).timestamp()) + 3600,
+            "session_id": "session-1",
+        },
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    await service.sign_out(token)
+
+    with pytest.raises(HTTPException) as exc:
+        await service.verify_access_token(token)
+
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.anyio
+async def test_sign_out_with_a_forged_token_revokes_nothing(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    fake_client.auth.post = AsyncMock(return_value=make_response({}, status_code=status.HTTP_401_UNAUTHORIZED))
+    claims = {
+        "sub": "victim",
+        "email": "victim@example.com",
+        "aud": "authenticated",
+        "exp": int(datetime.now(UTC).timestamp()) + 3600,
+        "session_id": "victim-session",
+    }
+    victim_token = jwt.encode(claims, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    service._build_user_profile = AsyncMock(  # type: ignore[attr-defined]
+        return_value=UserProfile(id="victim", email="victim@example.com", created_at=datetime(2024, 1, 1, tzinfo=UTC))
+    )
+
+    unsigned_header = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').rstrip(b"=").decode()
+    # Signed with a key we do not trust, and unsigned: neither may touch the victim's session.
+    for forged in (
+        jwt.encode({**claims, "exp": 2**40}, "attacker-secret", algorithm="HS256"),
+        f"{unsigned_header}.{victim_token.split('.')[1]}.",
+    ):
+        with pytest.raises((HTTPException, httpx.HTTPStatusError)):
+            await service.sign_out(forged)
+
+    assert not service._token_verifier.revocations._revoked
+    assert (await service.verify_access_token(victim_token)).user.id == "victim"
+
+
+@pytest.mark.anyio
+async def test_sign_out_keeps_the_session_when_supabase_rejects_the_logout(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    fake_client.auth.post = AsyncMock(return_value=make_response({}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE))
+    token = jwt.encode(
+        {
+            "sub": "user-1",
+            "email": "user@example.com",
+            "aud": "authenticated",
+            "exp": int(datetime.now(UTC).timestamp()) + 3600,
+            "session_id": "session-1",
+        },
+        settings.jwt_secret,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await service.sign_out(token)
+
+    assert not service._token_verifier.revocations._revoked
+
+
+@pytest.mark.anyio
+async def test_build_user_profile_uses_cache_until_invalidated(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    profile_row = {"id": "user-1", "full_name": "Echo Creator", "created_at": "2024-01-01T00:00:00+00:00"}
+    fake_client.select = AsyncMock(side_effect=[[profile_row], [], [profile_row], []])
+    fake_client.update = AsyncMock(return_value=[])
+    auth_user = {"id": "user-1", "email": "user@example.com", "created_at": "2024-01-01T00:00:00Z"}
+
+    first = await service._build_user_profile(auth_user)
+    second = await service._build_user_profile(auth_user)
+
+    assert second is first
+    assert fake_client.select.await_count == 2
+
+    service._fetch_auth_user = AsyncMock(return_value=auth_user)  # type: ignore[attr-defined]
+    await service.update_profile("user-1", ProfileUpdateRequest(bio="Podcaster"))
+
+    assert fake_client.select.await_count == 4
+
+
+@pytest.mark.anyio
+async def test_slow_profile_load_does_not_overwrite_a_newer_update(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    auth_user = {"id": "user-1", "email": "user@example.com", "created_at": "2024-01-01T00:00:00Z"}
+    service._fetch_auth_user = AsyncMock(return_value=auth_user)  # type: ignore[attr-defined]
+    fake_client.update = AsyncMock(return_value=[])
+    loaded_before_update = asyncio.Event()
+    release_slow_load = asyncio.Event()
+    profile_reads = 0
+
+    async def select(table: str, **kwargs):
+        nonlocal profile_reads
+        if table != "profiles":
+            return []
+        profile_reads += 1
+        if profile_reads == 1:
+            loaded_before_update.set()
+            await release_slow_load.wait()
+            return [{"id": "user-1", "bio": "Old"}]
+        return [{"id": "user-1", "bio": "New"}]
+
+    fake_client.select = AsyncMock(side_effect=select)
+
+    slow = asyncio.create_task(service._build_user_profile(auth_user))
+    await loaded_before_update.wait()
+    fresh = await service.update_profile("user-1", ProfileUpdateRequest(bio="New"))
+    release_slow_load.set()
+    stale = await slow
+
+    assert (stale.bio, fresh.bio) == ("Old", "New")
+    assert (await service._build_user_profile(auth_user)).bio == "New"
+
+
+@pytest.mark.anyio
+async def test_build_user_profile_fetches_profile_and_deletion_concurrently(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    in_flight = 0
+    peak = 0
+
+    async def slow_select(table, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if table == "profiles":
+            return [{"id": "user-1", "created_at": "2024-01-01T00:00:00+00:00"}]
+        return []
+
+    fake_client.select = AsyncMock(side_effect=slow_select)
+
+    await service._build_user_profile({"id": "user-1", "email": "user@example.com"})
+
+    assert peak == 2
+
+
+@pytest.mark.anyio
+async def test_sign_in_exceeding_latency_budget_returns_gateway_timeout(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    settings.auth_flow_budgets_seconds = {"sign_in": 0.01}
+    service = AuthService(fake_client, settings)
+
+    async def hung_post(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    fake_client.auth.post = AsyncMock(side_effect=hung_post)
+
+    payload = SignInRequest(method=AuthMethod.EMAIL, email="user@example.com", password="Passw0rd!")
+
+    with pytest.raises(HTTPException) as exc:
+        await service.sign_in(payload)
+
+    assert exc.value.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+
+@pytest.mark.anyio
+async def test_slow_sign_up_is_not_abandoned_by_a_latency_budget(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    # Giving up on the write would leave the account created but the client told to retry.
+    settings.auth_flow_budgets_seconds = {flow: 0.01 for flow in ("sign_up", "sign_in", "profile")}
+    service = AuthService(fake_client, settings)
+    service._ensure_profile_row = AsyncMock(return_value={})  # type: ignore[attr-defined]
+    auth_response = MagicMock()
+    service._build_auth_response = AsyncMock(return_value=auth_response)  # type: ignore[attr-defined]
+
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return make_response({"user": {"id": "user-1"}, "session": {"access_token": "jwt"}})
+
+    fake_client.auth.post = AsyncMock(side_effect=slow_post)
+
+    payload = SignUpRequest(method=AuthMethod.EMAIL, email="user@example.com", password="Passw0rd!")
+
+    assert await service.sign_up(payload) is auth_response
+    service._ensure_profile_row.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_get_user_by_id_uses_profile_bundle_rpc(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    fake_client.rpc = AsyncMock(
+        return_value={
+            "user": {
+                "id": "user-1",
+                "email": "user@example.com",
+                "created_at": "2024-01-01T00:00:00Z",
+                # Only app_metadata is trusted for the plan; users can write user_metadata.
+                "user_metadata": {"full_name": "Echo Creator", "plan": "enterprise"},
+                "app_metadata": {"plan": "pro"},
+            },
+            "profile": {"id": "user-1", "bio": "Podcaster", "onboarding_completed": True},
+            "deletion_request": {
+                "scheduled_for": "2024-02-01T00:00:00+00:00",
+                "requested_at": "2024-01-01T00:00:00+00:00",
+            },
+        }
+    )
+
+    profile = await service.get_user_by_id("user-1")
+
+    fake_client.rpc.assert_awaited_once_with(
+        "get_profile_bundle", payload={"p_user_id": "user-1"}, idempotent=True
+    )
+    fake_client.select.assert_not_awaited()
+    fake_client.rest.get.assert_not_awaited()
+    assert profile.email == "user@example.com"
+    assert profile.bio == "Podcaster"
+    assert profile.created_at == datetime(2024, 1, 1, tzinfo=UTC)
+    assert profile.plan == "pro"
+
+
+@pytest.mark.anyio
+async def test_get_user_by_id_bundle_without_user_is_not_found(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    fake_client.rpc = AsyncMock(return_value={"user": None, "profile": None, "deletion_request": None})
+
+    with pytest.raises(HTTPException) as exc:
+        await service.get_user_by_id("missing")
+
+    assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_get_user_by_id_falls_back_when_bundle_rpc_fails(
+    fake_client: FakeSupabaseClient, settings: Settings
+) -> None:
+    service = AuthService(fake_client, settings)
+    expected_user = UserProfile(
+        id="user-1",
+        email="user@example.com",
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+    auth_user = {"id": "user-1", "email": "user@example.com"}
+    service._fetch_auth_user = AsyncMock(return_value=auth_user)  # type: ignore[attr-defined]
+    service._build_user_profile = AsyncMock(return_value=expected_user)  # type: ignore[attr-defined]
+
+    result = await service.get_user_by_id("user-1")
+
+    fake_client.rpc.assert_awaited_once()
+    service._build_user_profile.assert_awaited_once_with(auth_user)
+    assert result == expected_user
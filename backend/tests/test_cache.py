@@ -0,0 +1,64 @@
+"""Tests for the in-process TTL cache."""
+from backend.app.utils import cache as cache_module
+from backend.app.utils.cache import TTLCache
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[int] = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expires_entries(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache: TTLCache[str] = TTLCache(max_entries=10, ttl_seconds=5)
+    cache.set("user-1", "profile")
+
+    now[0] += 6
+
+    assert cache.get("user-1") is None
+    assert len(cache) == 0
+
+
+def test_cache_stats_track_hits_and_misses() -> None:
+    cache: TTLCache[str] = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("user-1", "profile")
+    cache.get("user-1")
+    cache.get("user-2")
+    cache.invalidate("user-1")
+    cache.get("user-1")
+
+    stats = cache.stats()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_ratio"] == 1 / 3
+
+
+def test_set_is_dropped_when_the_key_was_invalidated_since_loading() -> None:
+    cache: TTLCache[str] = TTLCache(max_entries=2, ttl_seconds=60)
+    generation = cache.generation()
+    cache.invalidate("user-1")
+
+    cache.set("user-1", "stale", generation)
+    cache.set("user-2", "unrelated", generation)
+
+    assert cache.get("user-1") is None
+    assert cache.get("user-2") == "unrelated"
+    cache.set("user-1", "fresh", cache.generation())
+    assert cache.get("user-1") == "fresh"
+
+    # Once invalidations are no longer tracked per key, loads older than them are refused.
+    for key in ("a", "b", "c"):
+        cache.invalidate(key)
+    cache.set("user-3", "maybe stale", generation)
+    assert cache.get("user-3") is None
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.app.core.database import CountedRows
+from backend.app.schemas.content import ScrapedContentList, ScrapedContentSummaryList
+from backend.app.services.content_service import SCRAPED_CONTENT_TABLE, SUMMARY_COLUMNS, ContentService
+
+
+class FakeSupabaseClient:
+    def __init__(self) -> None:
+        self.select = AsyncMock()
+        self.select_with_count = AsyncMock()
+
+
+def build_db_record(**overrides: Any) -> Dict[str, Any]:
+    base: Dict[str, Any] = {
+        "id": "content-1",
+        "user_id": "user-1",
+        "url": "https://example.com/post",
+        "title": "Post",
+        "markdown": "# Body",
+        "provider": "firecrawl",
+        "metadata": {},
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+    base.update(overrides)
+    return base
+
+
+@pytest.mark.anyio
+async def test_list_scraped_content_summary_projects_columns() -> None:
+    client = FakeSupabaseClient()
+    record = build_db_record()
+    client.select_with_count.return_value = CountedRows(
+        rows=[{column: record[column] for column in SUMMARY_COLUMNS.split(",")}], total=12
+    )
+    service = ContentService(client)  # type: ignore[arg-type]
+
+    result = await service.list_scraped_content("user-1", limit=1, view="summary")
+
+    assert isinstance(result, ScrapedContentSummaryList)
+    assert result.total == 12
+    assert result.next_cursor is not None
+    assert "markdown" not in result.items[0].model_dump()
+    args, kwargs = client.select_with_count.await_args
+    assert args == (SCRAPED_CONTENT_TABLE,)
+    assert kwargs["columns"] == SUMMARY_COLUMNS
+    assert "markdown" not in kwargs["columns"].split(",")
+
+
+@pytest.mark.anyio
+async def test_list_scraped_content_full_view_by_default() -> None:
+    client = FakeSupabaseClient()
+    client.select_with_count.return_value = CountedRows(rows=[build_db_record()], total=1)
+    service = ContentService(client)  # type: ignore[arg-type]
+
+    result = await service.list_scraped_content("user-1")
+
+    assert isinstance(result, ScrapedContentList)
+    assert result.items[0].markdown == "# Body"
+    assert result.next_cursor is None
+    assert client.select_with_count.await_args.kwargs["columns"] == "*"
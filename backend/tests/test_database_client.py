@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from unittest.mock import AsyncMock
 
 import httpx
 import pytest
 
 from backend.app.core.config import Settings
-from backend.app.core.database import SupabaseAsyncClient, get_supabase_client
+from backend.app.core.database import SupabaseAsyncClient, SupabaseRequestOptions, get_supabase_client
 
 
 @pytest.fixture()
@@ -37,6 +38,30 @@ async def test_update_handles_no_content(settings: Settings) -> None:
         await client.close()
 
 
+@pytest.mark.anyio
+async def test_update_can_return_the_updated_rows(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    try:
+        response = httpx.Response(
+            200, json=[{"id": "job-1"}], request=httpx.Request("PATCH", "https://example.supabase.co/rest/v1/jobs")
+        )
+        client._rest_client.patch = AsyncMock(return_value=response)  # type: ignore[attr-defined]
+
+        result = await client.update(
+            "jobs",
+            {"status": "cancelled"},
+            filters={"id": "eq.job-1"},
+            options=SupabaseRequestOptions(prefer="return=representation", select="id"),
+        )
+
+        assert result == [{"id": "job-1"}]
+        kwargs = client._rest_client.patch.await_args.kwargs
+        assert kwargs["params"] == {"id": "eq.job-1", "select": "id"}
+        assert kwargs["headers"]["Prefer"] == "return=representation"
+    finally:
+        await client.close()
+
+
 @pytest.mark.anyio
 async def test_insert_handles_empty_payload(settings: Settings) -> None:
     client = SupabaseAsyncClient(settings)
@@ -120,3 +145,359 @@ def test_get_supabase_client_recreates_for_new_loop(settings: Settings) -> None:
 
     database._client = None
     database._client_loop = None
+
+
+@pytest.mark.anyio
+async def test_clients_share_pool_configured_from_settings(settings: Settings) -> None:
+    settings.api_timeout_seconds = 12
+    settings.supabase_connect_timeout_seconds = 2.5
+    client = SupabaseAsyncClient(settings)
+    try:
+        assert client.rest.timeout.read == 12
+        assert client.auth.timeout.connect == 2.5
+        assert client.storage.timeout.pool == settings.supabase_pool_timeout_seconds
+        assert client.pool_stats()["max_connections"] == settings.supabase_http_max_connections
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_pool_stats_track_in_flight_requests(settings: Settings) -> None:
+    settings.supabase_http_max_connections = 2
+    release = asyncio.Event()
+    observed = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, json=[], request=request)
+
+    client = SupabaseAsyncClient(settings, transport=httpx.MockTransport(handler))
+    try:
+        tasks = [asyncio.create_task(client.select(f"table_{index}")) for index in range(3)]
+        await asyncio.sleep(0.01)
+        observed.update(client.pool_stats())
+        release.set()
+        await asyncio.gather(*tasks)
+
+        stats = client.pool_stats()
+    finally:
+        await client.close()
+
+    assert observed["in_flight"] == 3
+    assert observed["waiters"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 3
+    assert stats["requests_total"] == 3
+
+
+def _response(status_code: int, method: str = "GET", payload=None) -> httpx.Response:
+    request = httpx.Request(method, "https://example.supabase.co/rest/v1/profiles")
+    return httpx.Response(status_code, json=payload if payload is not None else [], request=request)
+
+
+@pytest.fixture()
+def fast_retry_settings(settings: Settings) -> Settings:
+    settings.supabase_retry_backoff_seconds = 0
+    settings.supabase_circuit_failure_threshold = 3
+    return settings
+
+
+@pytest.mark.anyio
+async def test_select_retries_transient_failures(fast_retry_settings: Settings) -> None:
+    client = SupabaseAsyncClient(fast_retry_settings)
+    try:
+        client._rest_client.get = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[
+                _response(503),
+                httpx.ReadError("connection reset"),
+                _response(200, payload=[{"id": "1"}]),
+            ]
+        )
+
+        result = await client.select("profiles")
+
+        assert result == [{"id": "1"}]
+        assert client._rest_client.get.await_count == 3
+        assert client.resilience_stats()["retries_total"] == 2
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_insert_is_not_retried_without_idempotency_key(fast_retry_settings: Settings) -> None:
+    client = SupabaseAsyncClient(fast_retry_settings)
+    try:
+        client._rest_client.post = AsyncMock(return_value=_response(503, "POST"))  # type: ignore[method-assign]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.insert("profiles", {"id": "1"})
+
+        assert client._rest_client.post.await_count == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_insert_with_idempotency_key_is_retried(fast_retry_settings: Settings) -> None:
+    from backend.app.core.database import SupabaseRequestOptions
+
+    client = SupabaseAsyncClient(fast_retry_settings)
+    try:
+        client._rest_client.post = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[_response(503, "POST"), _response(201, "POST", payload=[{"id": "1"}])]
+        )
+
+        result = await client.insert(
+            "profiles", {"id": "1"}, options=SupabaseRequestOptions(idempotency_key="key-1")
+        )
+
+        assert result == [{"id": "1"}]
+        headers = client._rest_client.post.await_args.kwargs["headers"]
+        assert headers["Idempotency-Key"] == "key-1"
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_insert_retries_when_connection_was_never_established(fast_retry_settings: Settings) -> None:
+    client = SupabaseAsyncClient(fast_retry_settings)
+    try:
+        client._rest_client.post = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[httpx.ConnectError("refused"), _response(201, "POST", payload=[{"id": "1"}])]
+        )
+
+        assert await client.insert("profiles", {"id": "1"}) == [{"id": "1"}]
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_circuit_opens_after_repeated_failures(fast_retry_settings: Settings) -> None:
+    from backend.app.core.resilience import CircuitOpenError
+
+    fast_retry_settings.max_retries = 0
+    client = SupabaseAsyncClient(fast_retry_settings)
+    try:
+        client._rest_client.get = AsyncMock(return_value=_response(503))  # type: ignore[method-assign]
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.select("profiles")
+
+        with pytest.raises(CircuitOpenError):
+            await client.select("profiles")
+
+        assert client._rest_client.get.await_count == 3
+        circuit = client.resilience_stats()["circuits"]["/profiles"]
+        assert circuit == {"state": "open", "rejected": 1}
+        # Other endpoints are unaffected.
+        client._rest_client.get = AsyncMock(return_value=_response(200))  # type: ignore[method-assign]
+        assert await client.select("podcast_scripts") == []
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_probe_releases_the_circuit(fast_retry_settings: Settings) -> None:
+    fast_retry_settings.max_retries = 0
+    fast_retry_settings.supabase_circuit_reset_seconds = 0
+    # Coalesced reads are shielded; cancel the request itself.
+    fast_retry_settings.supabase_coalesce_reads = False
+    client = SupabaseAsyncClient(fast_retry_settings)
+    started = asyncio.Event()
+
+    async def hanging_get(*args, **kwargs):
+        started.set()
+        await asyncio.Event().wait()
+
+    try:
+        client._rest_client.get = AsyncMock(return_value=_response(503))  # type: ignore[method-assign]
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.select("profiles")
+
+        client._rest_client.get = AsyncMock(side_effect=hanging_get)  # type: ignore[method-assign]
+        probe = asyncio.create_task(client.select("profiles"))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        client._rest_client.get = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[httpx.DecodingError("bad gzip"), _response(200, payload=[{"id": "1"}])]
+        )
+        with pytest.raises(httpx.DecodingError):
+            await asyncio.wait_for(client.select("profiles"), 5)
+        assert await asyncio.wait_for(client.select("profiles"), 5) == [{"id": "1"}]
+        assert client.resilience_stats()["circuits"]["/profiles"]["state"] == "closed"
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_identical_concurrent_selects_share_one_request(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    release = asyncio.Event()
+
+    async def slow_get(*args, **kwargs):
+        await release.wait()
+        return _response(200, payload=[{"id": "user-1", "preferences": {}}])
+
+    try:
+        client._rest_client.get = AsyncMock(side_effect=slow_get)  # type: ignore[method-assign]
+        query = {"filters": {"id": "eq.user-1"}, "limit": 1}
+        tasks = [asyncio.create_task(client.select("profiles", **query)) for _ in range(3)]
+        other = asyncio.create_task(client.select("profiles", filters={"id": "eq.user-2"}))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        await other
+
+        assert client._rest_client.get.await_count == 2
+        assert results[0] == results[1] == results[2]
+        # Callers get independent copies of the shared rows.
+        results[0][0]["preferences"]["theme"] = "dark"
+        assert results[1][0]["preferences"] == {}
+        assert client.coalescing_stats() == {"leader_reads": 2, "coalesced_reads": 2, "in_flight_keys": 0}
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_uncoalesced_select_does_not_join_an_in_flight_read(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    release = asyncio.Event()
+    responses = iter([[{"id": "1", "status": "running"}], [{"id": "1", "status": "cancelled"}]])
+
+    async def slow_get(*args, **kwargs):
+        payload = next(responses)
+        await release.wait()
+        return _response(200, payload=payload)
+
+    try:
+        client._rest_client.get = AsyncMock(side_effect=slow_get)  # type: ignore[method-assign]
+        stale = asyncio.create_task(client.select("processing_jobs"))
+        await asyncio.sleep(0)
+        # Issued after a write, so it must not be answered by the read started before it.
+        fresh = asyncio.create_task(
+            client.select("processing_jobs", options=SupabaseRequestOptions(coalesce=False))
+        )
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await stale == [{"id": "1", "status": "running"}]
+        assert await fresh == [{"id": "1", "status": "cancelled"}]
+        assert client._rest_client.get.await_count == 2
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_shared_read(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    release = asyncio.Event()
+
+    async def slow_get(*args, **kwargs):
+        await release.wait()
+        return _response(200, payload=[{"id": "1"}])
+
+    try:
+        client._rest_client.get = AsyncMock(side_effect=slow_get)  # type: ignore[method-assign]
+        first = asyncio.create_task(client.select("profiles"))
+        second = asyncio.create_task(client.select("profiles"))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == [{"id": "1"}]
+        assert client._rest_client.get.await_count == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_chunks_by_rows_and_bytes(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    bodies = []
+
+    async def fake_post(path, **kwargs):
+        rows = json.loads(kwargs["content"])
+        bodies.append((kwargs["params"]["columns"], rows))
+        return _response(201, "POST", payload=rows)
+
+    try:
+        client._rest_client.post = AsyncMock(side_effect=fake_post)  # type: ignore[method-assign]
+        rows = [{"id": str(index), "text": "x" * 10} for index in range(5)]
+        rows.append({"id": "big", "text": "y" * 500, "extra": 1})
+
+        result = await client.bulk_insert("script_segments", rows, chunk_rows=2, chunk_bytes=200)
+
+        assert result.succeeded
+        assert result.chunks == 4
+        assert [len(chunk) for _, chunk in bodies] == [2, 2, 1, 1]
+        assert [row["id"] for row in result.rows] == [row["id"] for row in rows]
+        assert bodies[-1][0] == "id,text,extra"
+        prefer = client._rest_client.post.await_args.kwargs["headers"]["Prefer"]
+        assert prefer == "return=representation,missing=default"
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_upsert_sets_conflict_resolution(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    try:
+        client._rest_client.post = AsyncMock(return_value=_response(201, "POST"))  # type: ignore[method-assign]
+
+        await client.upsert("processing_jobs", [{"id": "job_1", "status": "running"}], on_conflict="id")
+
+        kwargs = client._rest_client.post.await_args.kwargs
+        assert kwargs["params"] == {"on_conflict": "id", "columns": "id,status"}
+        assert kwargs["headers"]["Prefer"].startswith("resolution=merge-duplicates")
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_reports_failed_chunks(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    try:
+        client._rest_client.post = AsyncMock(  # type: ignore[method-assign]
+            side_effect=[
+                _response(201, "POST", payload=[{"id": "1"}]),
+                _response(409, "POST", payload={"message": "duplicate key"}),
+            ]
+        )
+
+        result = await client.bulk_insert("usage_events", [{"id": "1"}, {"id": "2"}], chunk_rows=1, concurrency=1)
+
+        assert not result.succeeded
+        assert result.rows == [{"id": "1"}]
+        assert len(result.failures) == 1
+        failure = result.failures[0]
+        assert (failure.chunk_index, failure.row_offset, failure.row_count, failure.status_code) == (1, 1, 1, 409)
+    finally:
+        await client.close()
+
+
+@pytest.mark.anyio
+async def test_select_with_count_reads_total_from_content_range(settings: Settings) -> None:
+    client = SupabaseAsyncClient(settings)
+    try:
+        response = _response(206, payload=[{"id": "1"}, {"id": "2"}])
+        response.headers["Content-Range"] = "0-1/57"
+        client._rest_client.get = AsyncMock(return_value=response)  # type: ignore[method-assign]
+
+        result = await client.select_with_count("scraped_content", count="planned", limit=2)
+
+        assert result.rows == [{"id": "1"}, {"id": "2"}]
+        assert result.total == 57
+        kwargs = client._rest_client.get.await_args.kwargs
+        assert kwargs["headers"]["Prefer"] == "count=planned"
+        assert "count" not in kwargs["params"]
+
+        response.headers["Content-Range"] = "0-1/*"
+        assert (await client.select_with_count("scraped_content")).total is None
+        with pytest.raises(ValueError):
+            await client.select_with_count("scraped_content", count="fuzzy")
+    finally:
+        await client.close()
@@ -1,22 +1,49 @@
 """Tests for the in-process JobManager."""
 import asyncio
-from datetime import datetime
+import os
+import subprocess
+import sys
+import threading
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any, Dict, List
 
+import httpx
 import pytest
 
 pytest.importorskip("pydantic")
 
+from backend.app.core.config import Settings
+from backend.app.core.database import CountedRows
 from backend.app.schemas.jobs import JobCreate
-from backend.app.services.jobs import JobManager
+from backend.app.services.jobs import (
+    IdempotencyKeyReusedError,
+    JobManager,
+    JobQueueFullError,
+    JobRetryPolicy,
+    RetryableJobError,
+)
+from backend.app.services.jobs.executors import ProcessJobPool
+from backend.app.services.jobs.job_manager import job_fingerprint
+from backend.app.services.jobs.pool import QueuedJob
+from backend.app.services.jobs.scheduler import FairPending
+from backend.app.services.jobs.status_buffer import StatusBuffer
 
 
 class DummySupabaseClient:
     def __init__(self) -> None:
         self._tables: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
-    async def insert(self, table: str, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def insert(self, table: str, record: Dict[str, Any], *, options: Any = None) -> List[Dict[str, Any]]:
         table_store = self._tables.setdefault(table, {})
+        key = record.get("idempotency_key")
+        if key and any(
+            (row["user_id"], row.get("idempotency_key")) == (record["user_id"], key) for row in table_store.values()
+        ):
+            request = httpx.Request("POST", f"https://example.supabase.co/rest/v1/{table}")
+            raise httpx.HTTPStatusError("duplicate key", request=request, response=httpx.Response(409, request=request))
         now = datetime.utcnow().isoformat()
         stored = {
             **record,
@@ -26,7 +53,9 @@ class DummySupabaseClient:
         table_store[record["id"]] = stored
         return [stored]
 
-    async def update(self, table: str, payload: Dict[str, Any], *, filters: Dict[str, str] | None = None) -> List[Dict[str, Any]]:
+    async def update(
+        self, table: str, payload: Dict[str, Any], *, filters: Dict[str, str] | None = None, options: Any = None
+    ) -> List[Dict[str, Any]]:
         table_store = self._tables.setdefault(table, {})
         records = self._apply_filters(table_store, filters)
         now = datetime.utcnow().isoformat()
@@ -35,6 +64,24 @@ class DummySupabaseClient:
             record.update(payload)
             record["updated_at"] = now
             updated.append(record)
+        # Like PostgREST: a PATCH answers 204 with no body unless the rows are asked for.
+        if not (options and options.prefer and "return=representation" in options.prefer):
+            return []
+        if options.select and options.select != "*":
+            return [{column: row.get(column) for column in options.select.split(",")} for row in updated]
+        return updated
+
+    async def rpc(self, function: str, *, payload: Dict[str, Any] | None = None, idempotent: bool = False):
+        if function != "update_processing_jobs":
+            raise AssertionError(f"unexpected rpc {function}")
+        self.rpc_calls = getattr(self, "rpc_calls", 0) + 1
+        updated = []
+        for item in (payload or {})["p_updates"]:
+            record = self._tables.setdefault("processing_jobs", {}).get(item["id"])
+            if record is None or ("leased_by" in item and record.get("leased_by") != item["leased_by"]):
+                continue
+            record.update(item["changes"], updated_at=datetime.utcnow().isoformat())
+            updated.append(item["id"])
         return updated
 
     async def select(
@@ -46,16 +93,23 @@ class DummySupabaseClient:
         offset: int | None = None,
         order: str | None = None,
         columns: str | None = None,
+        options: Any = None,
     ) -> List[Dict[str, Any]]:
         table_store = self._tables.setdefault(table, {})
         records = list(self._apply_filters(table_store, filters))
-        if order == "created_at.desc":
-            records.sort(key=lambda x: x["created_at"], reverse=True)
+        if order and order.startswith("created_at.desc"):
+            records.sort(key=lambda x: (x["created_at"], x["id"]), reverse=True)
         if offset:
             records = records[offset:]
         if limit is not None:
             records = records[:limit]
-        return [dict(item) for item in records]
+        rows = [dict(item) for item in records]
+        await asyncio.sleep(0)  # the response is in flight; other requests may interleave
+        return rows
+
+    async def select_with_count(self, table: str, *, count: str = "exact", **kwargs: Any) -> CountedRows:
+        total = len(self._apply_filters(self._tables.setdefault(table, {}), kwargs.get("filters")))
+        return CountedRows(rows=await self.select(table, **kwargs), total=total)
 
     async def delete(self, table: str, *, filters: Dict[str, str] | None = None) -> List[Dict[str, Any]]:
         table_store = self._tables.setdefault(table, {})
@@ -72,11 +126,15 @@ class DummySupabaseClient:
         for record in values:
             matched = True
             for column, expression in filters.items():
-                if not expression.startswith("eq."):
-                    continue
-                expected = expression.split("eq.", 1)[1]
-                if str(record.get(column)) != expected:
+                operator, _, expected = expression.partition(".")
+                value = str(record.get(column))
+                if operator == "eq" and value != expected:
+                    matched = False
+                elif operator == "in" and value not in expected.strip("()").split(","):
                     matched = False
+                elif operator == "gte" and value < expected[: len(value)]:
+                    matched = False
+                if not matched:
                     break
             if matched:
                 result.append(record)
@@ -94,15 +152,864 @@ async def test_job_lifecycle():
 
     manager.register_handler("script_generation", handler)
 
-    job_request = JobCreate(job_type="script_generation", payload={"foo": "bar"})
-    job = await manager.enqueue_job("user-1", job_request)
+    try:
+        job_request = JobCreate(job_type="script_generation", payload={"foo": "bar"})
+        job = await manager.enqueue_job("user-1", job_request)
+
+        assert job.status == "queued"
+        await asyncio.sleep(0.1)
+
+        stored = await manager.get_job("user-1", job.id)
+        assert stored.status == "succeeded"
+        assert stored.result == {"handled": {"foo": "bar"}}
+
+        jobs = await manager.list_jobs("user-1")
+        assert len(jobs.items) == 1
+        assert jobs.total == 1
+        assert jobs.next_cursor is None
+    finally:
+        await manager.stop()
+
+
+class LeasingSupabaseClient(DummySupabaseClient):
+    """Dummy client that also implements the claim/heartbeat RPCs from DB/schema.sql."""
+
+    async def rpc(self, function: str, *, payload: Dict[str, Any] | None = None, idempotent: bool = False):
+        if function == "update_processing_jobs":
+            return await super().rpc(function, payload=payload, idempotent=idempotent)
+        payload = payload or {}
+        now = datetime.utcnow()
+        lease_expires_at = (now + timedelta(seconds=payload["p_lease_seconds"])).isoformat()
+        records = self._tables.setdefault("processing_jobs", {}).values()
+        if function == "claim_processing_jobs":
+            claimed = []
+            for record in sorted(records, key=lambda item: item["created_at"]):
+                expired = record.get("lease_expires_at") and datetime.fromisoformat(record["lease_expires_at"]) < now
+                if record["job_type"] not in payload["p_job_types"]:
+                    continue
+                type_limit = payload.get("p_type_limits", {}).get(record["job_type"])
+                if type_limit is not None and sum(row["job_type"] == record["job_type"] for row in claimed) >= type_limit:
+                    continue
+                due = not record.get("next_run_at") or datetime.fromisoformat(record["next_run_at"]) <= now
+                if (record["status"] == "queued" and due) or (record["status"] == "running" and expired):
+                    record.update(
+                        status="running",
+                        leased_by=payload["p_worker_id"],
+                        lease_expires_at=lease_expires_at,
+                        attempts=record.get("attempts", 0) + 1,
+                    )
+                    claimed.append(dict(record))
+                if len(claimed) == payload["p_limit"]:
+                    break
+            return claimed
+        if function == "heartbeat_processing_jobs":
+            owned = []
+            for record in records:
+                if record["id"] in payload["p_job_ids"] and record.get("leased_by") == payload["p_worker_id"]:
+                    record["lease_expires_at"] = lease_expires_at
+                    owned.append(record["id"])
+            return owned
+        raise AssertionError(f"unexpected rpc {function}")
+
+
+def durable_settings() -> Settings:
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_queue_mode = "durable"
+    settings.job_poll_interval_seconds = 0.01
+    settings.job_heartbeat_seconds = 0.01
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_durable_queue_leases_jobs_to_started_worker():
+    client = LeasingSupabaseClient()
+    manager = JobManager(client, durable_settings())  # type: ignore[arg-type]
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        await asyncio.sleep(0.03)
+        return {"handled": job.payload}
+
+    manager.register_handler("audio_render", handler)
+    job = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"n": 1}))
+    await asyncio.sleep(0.05)
+    assert (await manager.get_job("user-1", job.id)).status == "queued"
+
+    await manager.start()
+    try:
+        await asyncio.sleep(0.15)
+    finally:
+        await manager.stop()
+
+    stored = client._tables["processing_jobs"][job.id]
+    assert stored["status"] == "succeeded"
+    assert stored["result"] == {"handled": {"n": 1}}
+    assert stored["leased_by"] is None
+    assert stored["attempts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_durable_queue_reclaims_expired_lease_and_fences_old_worker():
+    client = LeasingSupabaseClient()
+    await client.insert(
+        "processing_jobs",
+        {
+            "id": "job_orphaned",
+            "user_id": "user-1",
+            "job_type": "audio_render",
+            "status": "running",
+            "payload": {},
+            "leased_by": "dead-worker",
+            "lease_expires_at": (datetime.utcnow() - timedelta(seconds=5)).isoformat(),
+            "attempts": 1,
+        },
+    )
+    manager = JobManager(client, durable_settings())  # type: ignore[arg-type]
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        return {"ok": True}
+
+    manager.register_handler("audio_render", handler)
+    await manager.start()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        await manager.stop()
+
+    stored = client._tables["processing_jobs"]["job_orphaned"]
+    assert stored["status"] == "succeeded"
+    assert stored["attempts"] == 2
+
+    stale = await client.update(
+        "processing_jobs",
+        {"status": "failed"},
+        filters={"id": "eq.job_orphaned", "leased_by": "eq.dead-worker"},
+    )
+    assert stale == []
+
+
+@pytest.mark.asyncio
+async def test_job_that_keeps_losing_its_lease_is_dead_lettered():
+    client = LeasingSupabaseClient()
+    await client.insert(
+        "processing_jobs",
+        {"id": "job_crashy", "user_id": "user-1", "job_type": "audio_render", "status": "queued", "payload": {}},
+    )
+    claim = {"p_job_types": ["audio_render"], "p_limit": 1, "p_lease_seconds": 60}
+    for worker in ("w1", "w2", "w3"):
+        # Each worker leases the job and dies without reporting an outcome.
+        (row,) = await client.rpc("claim_processing_jobs", payload={**claim, "p_worker_id": worker})
+        record = client._tables["processing_jobs"]["job_crashy"]
+        record["lease_expires_at"] = (datetime.utcnow() - timedelta(seconds=1)).isoformat()
+    assert row["attempts"] == 3
+
+    manager = JobManager(client, durable_settings())  # type: ignore[arg-type]
+    calls: List[str] = []
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        calls.append("ran")
+        return {}
+
+    manager.register_handler("audio_render", handler)
+    await manager.start()
+    try:
+        await asyncio.sleep(0.05)
+    finally:
+        await manager.stop()
+
+    stored = client._tables["processing_jobs"]["job_crashy"]
+    assert (stored["status"], stored["attempts"], stored["leased_by"]) == ("dead_letter", 3, None)
+    assert "lease expired" in stored["error"]
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_graceful_restarts_do_not_use_up_attempts():
+    client = LeasingSupabaseClient()
+    settings = durable_settings()
+    started = asyncio.Event()
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        started.set()
+        await asyncio.sleep(60)
+        return {}
+
+    job = None
+    for _ in range(JobRetryPolicy().max_attempts + 1):
+        # A rolling deploy: each worker picks the long job up and is stopped mid-run.
+        manager = JobManager(client, settings)  # type: ignore[arg-type]
+        manager.register_handler("audio_render", handler)
+        if job is None:
+            job = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+        started.clear()
+        await manager.start()
+        try:
+            await asyncio.wait_for(started.wait(), 1)
+        finally:
+            await manager.stop()
+
+    stored = client._tables["processing_jobs"][job.id]
+    assert (stored["status"], stored["attempts"], stored["leased_by"]) == ("queued", 0, None)
+
+
+@pytest.mark.asyncio
+async def test_durable_worker_leases_no_more_of_a_type_than_it_can_start():
+    client = LeasingSupabaseClient()
+    settings = durable_settings()
+    settings.job_type_concurrency = {"audio_render": 1}
+    manager = JobManager(client, settings)  # type: ignore[arg-type]
+    release = asyncio.Event()
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        await release.wait()
+        return {}
+
+    manager.register_handler("audio_render", handler)
+    manager.register_handler("script_generation", handler)
+    for index in range(3):
+        await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"n": index}))
+    script = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation"))
+
+    await manager.start()
+    try:
+        await asyncio.sleep(0.05)
+        leased = [row for row in client._tables["processing_jobs"].values() if row.get("leased_by")]
+        # The other audio jobs stay queued for workers with a free audio slot.
+        assert sorted(row["job_type"] for row in leased) == ["audio_render", "script_generation"]
+        assert script.id in {row["id"] for row in leased}
+
+        release.set()
+        await asyncio.sleep(0.15)
+    finally:
+        await manager.stop()
+
+    assert {row["status"] for row in client._tables["processing_jobs"].values()} == {"succeeded"}
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_enforces_type_limits_and_rejects_when_full():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_max_concurrency = 2
+    settings.job_type_concurrency = {"audio_render": 1}
+    settings.job_max_pending = 2
+    client = DummySupabaseClient()
+    manager = JobManager(client, settings)  # type: ignore[arg-type]
+    release = asyncio.Event()
+    started: List[str] = []
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        started.append(job.payload["name"])
+        await release.wait()
+        return {}
+
+    manager.register_handler("audio_render", handler)
+    manager.register_handler("script_generation", handler)
+
+    try:
+        for name, job_type in [("a1", "audio_render"), ("a2", "audio_render"), ("s1", "script_generation")]:
+            await manager.enqueue_job("user-1", JobCreate(job_type=job_type, payload={"name": name}))
+        await asyncio.sleep(0.01)
+        assert started == ["a1", "s1"]
+
+        await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"name": "a3"}))
+        with pytest.raises(JobQueueFullError) as exc:
+            await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"name": "a4"}))
+        assert exc.value.retry_after_seconds >= 1
+        assert len(client._tables["processing_jobs"]) == 4
+        assert manager.stats()["pending"] == 2
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert started == ["a1", "s1", "a2", "a3"]
+        assert manager.stats()["completed"] == 4
+    finally:
+        await manager.stop()
+
+
+def _queued(job_id: str, user_id: str, job_type: str = "audio_render", tier: str = "standard") -> QueuedJob:
+    return QueuedJob(job_id, user_id, JobCreate(job_type=job_type), tier=tier)
+
+
+def test_fair_pending_interleaves_users_by_weight_and_priority():
+    pending = FairPending(priorities={"script_generation": 10}, tier_weights={"pro": 2.0})
+    for index in range(4):
+        pending.push(_queued(f"heavy-{index}", "heavy"))
+    pending.push(_queued("light-0", "light"))
+    for index in range(3):
+        pending.push(_queued(f"pro-{index}", "pro-user", tier="pro"))
+    pending.push(_queued("script-0", "light", job_type="script_generation"))
+
+    order = []
+    while len(pending):
+        order.append(pending.pop(lambda job: True).job_id)
+
+    assert order == [
+        "script-0",
+        "heavy-0",
+        "light-0",
+        "pro-0",
+        "pro-1",
+        "heavy-1",
+        "pro-2",
+        "heavy-2",
+        "heavy-3",
+    ]
+
+
+def test_fair_pending_skips_ineligible_jobs():
+    pending = FairPending()
+    pending.push(_queued("a-render", "a"))
+    pending.push(_queued("a-script", "a", job_type="script_generation"))
+    pending.push(_queued("b-render", "b"))
+
+    job = pending.pop(lambda job: job.job_type != "audio_render")
+
+    assert job.job_id == "a-script"
+    # "a" used its turn, so "b" is next; "a" keeps its remaining job in order.
+    assert [job.job_id for job in pending] == ["b-render", "a-render"]
+    assert pending.remove("b-render").job_id == "b-render"
+    assert len(pending) == 1
+
+
+def _sum_squares(job: JobCreate) -> Dict[str, Any]:
+    # Module level so the process pool can pickle it.
+    return {"total": sum(i * i for i in range(job.payload["n"])), "pid": os.getpid()}
+
+
+def _sleep_forever(job: JobCreate) -> Dict[str, Any]:
+    time.sleep(60)
+    return {}
+
+
+def _spawn_child_and_hang(job: JobCreate) -> Dict[str, Any]:
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    Path(job.payload["pid_file"]).write_text(str(child.pid))
+    child.wait()
+    return {}
+
+
+def _running(pid: int) -> bool:
+    try:
+        # Zombies are dead; they only wait for a parent to reap them.
+        return Path(f"/proc/{pid}/stat").read_text().split()[2] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+async def _wait_for_status(manager: JobManager, job_id: str, statuses: set, timeout: float = 20.0) -> Any:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await manager.get_job("user-1", job_id)
+        if job.status in statuses or time.monotonic() > deadline:
+            return job
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_thread_and_process_executors_run_off_the_event_loop():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_process_workers = 1
+    settings.job_process_max_payload_bytes = 1_000
+    manager = JobManager(DummySupabaseClient(), settings)  # type: ignore[arg-type]
+    loop_thread = threading.get_ident()
+
+    def blocking(job: JobCreate) -> Dict[str, Any]:
+        return {"same_thread": threading.get_ident() == loop_thread}
+
+    manager.register_handler("script_generation", blocking, executor="thread")
+    manager.register_handler("audio_render", _sum_squares, executor="process")
+    with pytest.raises(ValueError):
+        manager.register_handler("audio_render", _sum_squares, executor="fiber")  # type: ignore[arg-type]
+    await manager.start()
+    try:
+        assert manager.stats()["process_pool"] == {"workers": 1, "idle": 1}
+
+        threaded = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation"))
+        rendered = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"n": 1000}))
+        too_big = await manager.enqueue_job(
+            "user-1", JobCreate(job_type="audio_render", payload={"n": 1, "blob": "x" * 2_000})
+        )
+
+        assert (await _wait_for_status(manager, threaded.id, {"succeeded"})).result == {"same_thread": False}
+        done = await _wait_for_status(manager, rendered.id, {"succeeded", "failed"})
+        assert done.result["total"] == sum(i * i for i in range(1000))
+        assert done.result["pid"] != os.getpid()
+        failed = await _wait_for_status(manager, too_big.id, {"failed"})
+        assert "process pool accepts at most 1000" in failed.error
+    finally:
+        await manager.stop()
+    assert manager.stats()["process_pool"]["workers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_process_job_replaces_its_worker():
+    pool = ProcessJobPool(workers=1, max_payload_bytes=1_000_000)
+    await pool.start()
+    try:
+        task = asyncio.create_task(pool.run(_sleep_forever, JobCreate(job_type="audio_render")))
+        await asyncio.sleep(0.5)
+        (busy,) = pool._workers
+        started = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert time.monotonic() - started < 10
+        assert not busy.process.is_alive()
+
+        result = await pool.run(_sum_squares, JobCreate(job_type="audio_render", payload={"n": 4}))
+        assert result["total"] == 14
+        assert result["pid"] != busy.process.pid
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not hasattr(os, "killpg") or not Path("/proc").exists(), reason="needs POSIX process groups")
+async def test_cancelling_a_process_job_stops_its_subprocesses():
+    pool = ProcessJobPool(workers=1, max_payload_bytes=1_000_000)
+    pid_file = Path(tempfile.mkdtemp()) / "child.pid"
+    await pool.start()
+    try:
+        task = asyncio.create_task(
+            pool.run(_spawn_child_and_hang, JobCreate(job_type="audio_encode", payload={"pid_file": str(pid_file)}))
+        )
+        deadline = time.monotonic() + 20
+        while not pid_file.exists() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        child = int(pid_file.read_text())
+        assert _running(child)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        deadline = time.monotonic() + 5
+        while _running(child) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert not _running(child)
+    finally:
+        await pool.close()
+
+
+def _render_with_progress(job: JobCreate, context: Any) -> Dict[str, Any]:
+    for step in range(1, 3):
+        context.report(percent=step * 50, stage=f"step-{step}")
+    return {"steps": 2}
+
+
+async def _collect_until_finished(subscription: Any, job_id: str) -> List[Any]:
+    events = []
+    while True:
+        event = await subscription.get(timeout=20)
+        assert event is not None
+        if event.job_id != job_id:
+            continue
+        events.append(event)
+        if event.event == "status" and event.status in {"succeeded", "failed"}:
+            return events
+
+
+@pytest.mark.asyncio
+async def test_handlers_report_progress_to_subscribers():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_process_workers = 1
+    manager = JobManager(DummySupabaseClient(), settings)  # type: ignore[arg-type]
+
+    async def script(job: JobCreate, context: Any) -> Dict[str, Any]:
+        context.report(percent=150, stage="drafting", partial={"title": "Intro"})
+        return {"ok": True}
+
+    manager.register_handler("script_generation", script)
+    manager.register_handler("audio_render", _render_with_progress, executor="process")
+    await manager.start()
+    try:
+        with manager.events.subscribe("user-1") as everything, manager.events.subscribe("user-2") as other:
+            job = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation"))
+            with manager.events.subscribe("user-1", job.id) as only_script:
+                events = await _collect_until_finished(only_script, job.id)
+            assert [(e.event, e.status, e.percent, e.stage) for e in events] == [
+                ("status", "running", None, None),
+                ("progress", None, 100.0, "drafting"),
+                ("status", "succeeded", None, None),
+            ]
+            assert events[1].partial == {"title": "Intro"}
+            assert events[2].result == {"ok": True}
+
+            render = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+            events = await _collect_until_finished(everything, render.id)
+            assert [(e.event, e.status or e.stage) for e in events] == [
+                ("status", "queued"),
+                ("status", "running"),
+                ("progress", "step-1"),
+                ("progress", "step-2"),
+                ("status", "succeeded"),
+            ]
+            assert await other.get(timeout=0.01) is None
+        assert manager.stats()["events"]["subscribers"] == 0
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_status_buffer_coalesces_progress_and_batches_outcomes():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_status_flush_seconds = 0.05
+    client = DummySupabaseClient()
+    manager = JobManager(client, settings)  # type: ignore[arg-type]
+    release = asyncio.Event()
+
+    async def handler(job: JobCreate, context: Any) -> Dict[str, Any]:
+        for percent in range(100):
+            context.report(percent=percent, stage="rendering")
+        await release.wait()
+        return {"n": job.payload["n"]}
+
+    manager.register_handler("audio_render", handler)
+    try:
+        jobs = [await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"n": n})) for n in range(3)]
+        await asyncio.sleep(0.1)
+        # 3 x (running + 100 progress reports) arrive as one batched write.
+        assert client.rpc_calls == 1
+        stored = await manager.get_job("user-1", jobs[0].id)
+        assert stored.status == "running"
+        assert stored.progress == {"percent": 99.0, "stage": "rendering"}
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert client.rpc_calls == 2
+        assert [(await manager.get_job("user-1", job.id)).result for job in jobs] == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert manager.stats()["status_writes"]["pending"] == 0
+    finally:
+        await manager.stop()
+
+
+class FlakyRpcClient(DummySupabaseClient):
+    """Has no update_processing_jobs function and fails the first PATCHes."""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+        self.patches = 0
+
+    async def rpc(self, function: str, *, payload: Dict[str, Any] | None = None, idempotent: bool = False):
+        request = httpx.Request("POST", f"https://example.supabase.co/rest/v1/rpc/{function}")
+        raise httpx.HTTPStatusError("missing", request=request, response=httpx.Response(404, request=request))
+
+    async def update(
+        self, table: str, payload: Dict[str, Any], *, filters: Dict[str, str] | None = None, options: Any = None
+    ):
+        self.patches += 1
+        if self.failures:
+            self.failures -= 1
+            raise httpx.ConnectError("connection refused")
+        return await super().update(table, payload, filters=filters, options=options)
+
+
+@pytest.mark.asyncio
+async def test_status_buffer_falls_back_to_patch_and_retries_outcomes():
+    client = FlakyRpcClient(failures=2)
+    await client.insert("processing_jobs", {"id": "job-1", "status": "running", "leased_by": "worker-a"})
+    buffer = StatusBuffer(client, "processing_jobs", flush_interval=0.01, max_batch=10)  # type: ignore[arg-type]
+    fenced = StatusBuffer(client, "processing_jobs", flush_interval=0.01, max_batch=10, owner="worker-b")  # type: ignore[arg-type]
+    try:
+        assert await buffer.finish("job-1", {"status": "succeeded"}) is True
+        assert client._tables["processing_jobs"]["job-1"]["status"] == "succeeded"
+        assert client.patches == 3
+        assert buffer.stats()["mode"] == "patch"
+        assert buffer.stats()["failed_batches"] == 2
+
+        assert await fenced.finish("job-1", {"status": "failed"}) is False
+        assert client._tables["processing_jobs"]["job-1"]["status"] == "succeeded"
+    finally:
+        await buffer.close()
+        await fenced.close()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_returns_original_job():
+    manager = JobManager(DummySupabaseClient())  # type: ignore[arg-type]
+    runs: List[Dict[str, Any]] = []
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        runs.append(job.payload)
+        return {}
+
+    manager.register_handler("script_generation", handler)
+    try:
+        request = JobCreate(job_type="script_generation", payload={"content_id": "c1"})
+
+        # Concurrent retries: both miss the lookup, one insert loses on the unique index.
+        first, second = await asyncio.gather(
+            manager.enqueue_job("user-1", request, idempotency_key="key-1"),
+            manager.enqueue_job("user-1", request, idempotency_key="key-1"),
+        )
+        third = await manager.enqueue_job("user-1", request, idempotency_key="key-1")
+        other_user = await manager.enqueue_job("user-2", request, idempotency_key="key-1")
+        assert first.id == second.id == third.id != other_user.id
+
+        with pytest.raises(IdempotencyKeyReusedError):
+            await manager.enqueue_job(
+                "user-1", JobCreate(job_type="script_generation", payload={"content_id": "c2"}), idempotency_key="key-1"
+            )
+        await asyncio.sleep(0.05)
+        assert len(runs) == 2
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_identical_jobs_reuse_cached_result_per_handler_version():
+    manager = JobManager(DummySupabaseClient())  # type: ignore[arg-type]
+    runs = 0
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        nonlocal runs
+        runs += 1
+        return {"run": runs}
+
+    manager.register_handler("script_generation", handler, cache_ttl=60)
+    manager.register_handler("audio_render", handler)
 
-    assert job.status == "queued"
-    await asyncio.sleep(0.1)
+    try:
+        first = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation", payload={"a": 1, "b": 2}))
+        # Still in flight: joins the queued job instead of starting another.
+        assert (await manager.enqueue_job("user-1", JobCreate(job_type="script_generation", payload={"b": 2, "a": 1}))).id == first.id
+        await asyncio.sleep(0.05)
+
+        cached = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation", payload={"a": 1, "b": 2}))
+        assert cached.id == first.id and cached.status == "succeeded" and cached.result == {"run": 1}
+        assert (await manager.enqueue_job("user-2", JobCreate(job_type="script_generation", payload={"a": 1, "b": 2}))).id != first.id
+        assert (await manager.enqueue_job("user-1", JobCreate(job_type="script_generation", payload={"a": 2}))).id != first.id
+
+        manager.register_handler("script_generation", handler, version="2", cache_ttl=60)
+        assert (await manager.enqueue_job("user-1", JobCreate(job_type="script_generation", payload={"a": 1, "b": 2}))).id != first.id
+
+        uncached = [await manager.enqueue_job("user-1", JobCreate(job_type="audio_render")) for _ in range(2)]
+        assert uncached[0].id != uncached[1].id
+        await asyncio.sleep(0.05)
+        assert runs == 6
+    finally:
+        await manager.stop()
+
+
+def test_job_fingerprint_is_canonical():
+    assert job_fingerprint("t", {"a": 1, "b": [1, 2]}, "1") == job_fingerprint("t", {"b": [1, 2], "a": 1}, "1")
+    assert job_fingerprint("t", {"a": 1}, "1") != job_fingerprint("t", {"a": 1}, "2")
+    assert job_fingerprint("t", {"a": 1}, "1") != job_fingerprint("u", {"a": 1}, "1")
+
+
+def _write_then_hang(job: JobCreate, context: Any) -> Dict[str, Any]:
+    with open(job.payload["path"], "w") as partial:
+        partial.write("partial render")
+    context.add_cleanup(os.remove, job.payload["path"])
+    time.sleep(60)
+    return {}
+
+
+@pytest.mark.asyncio
+async def test_cancel_job_stops_running_and_pending_jobs():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_max_concurrency = 1
+    manager = JobManager(DummySupabaseClient(), settings)  # type: ignore[arg-type]
+    cleaned: List[str] = []
+
+    async def handler(job: JobCreate, context: Any) -> Dict[str, Any]:
+        context.add_cleanup(cleaned.append, job.payload["name"])
+        await asyncio.sleep(60)
+        return {}
 
-    stored = await manager.get_job("user-1", job.id)
-    assert stored.status == "succeeded"
-    assert stored.result == {"handled": {"foo": "bar"}}
+    manager.register_handler("audio_render", handler)
+    try:
+        running = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"name": "a"}))
+        pending = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"name": "b"}))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(ValueError):
+            await manager.cancel_job("user-2", running.id)
+        cancelled = await manager.cancel_job("user-1", running.id)
+        assert cancelled.status == "cancelled"
+        await asyncio.sleep(0.05)
+        assert cleaned == ["a"]
+        # The freed slot went to the pending job.
+        assert manager.stats()["running_by_type"] == {"audio_render": 1}
+
+        assert (await manager.cancel_job("user-1", pending.id)).status == "cancelled"
+        assert (await manager.cancel_job("user-1", pending.id)).status == "cancelled"
+        await asyncio.sleep(0.05)
+        assert cleaned == ["a", "b"]
+        assert manager.stats()["running"] == 0
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_deadlines_time_out_async_thread_and_process_handlers():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_process_workers = 1
+    settings.job_type_timeouts = {"script_generation": 0.2}
+    manager = JobManager(DummySupabaseClient(), settings)  # type: ignore[arg-type]
+    stopped = threading.Event()
+
+    def cooperative(job: JobCreate, context: Any) -> Dict[str, Any]:
+        assert 0 < context.remaining() <= 0.2
+        while not context.is_cancelled():
+            time.sleep(0.01)
+        stopped.set()
+        return {}
+
+    async def slow(job: JobCreate) -> Dict[str, Any]:
+        await asyncio.sleep(60)
+        return {}
+
+    manager.register_handler("script_generation", cooperative, executor="thread")
+    manager.register_handler("audio_render", _write_then_hang, executor="process", timeout=2)
+    manager.register_handler("tts", slow, timeout=0.1)
+    await manager.start()
+    try:
+        path = Path(tempfile.mkdtemp()) / "partial.wav"
+        jobs = [
+            await manager.enqueue_job("user-1", JobCreate(job_type="script_generation")),
+            await manager.enqueue_job("user-1", JobCreate(job_type="audio_render", payload={"path": str(path)})),
+            await manager.enqueue_job("user-1", JobCreate(job_type="tts")),
+        ]
+        finished = [await _wait_for_status(manager, job.id, {"timed_out", "failed", "succeeded"}) for job in jobs]
+        assert [job.status for job in finished] == ["timed_out"] * 3
+        assert finished[2].error == "Job exceeded its 0.1s deadline"
+        assert stopped.wait(1)
+        assert not path.exists()
+        assert manager.stats()["process_pool"] == {"workers": 1, "idle": 1}
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_job_leased_by_another_worker_fences_it():
+    client = LeasingSupabaseClient()
+    api = JobManager(client, durable_settings())  # type: ignore[arg-type]
+    worker = JobManager(client, durable_settings())  # type: ignore[arg-type]
+    started = asyncio.Event()
+    cleaned = asyncio.Event()
+
+    async def on_cleanup() -> None:
+        cleaned.set()
+
+    async def handler(job: JobCreate, context: Any) -> Dict[str, Any]:
+        context.add_cleanup(on_cleanup)
+        started.set()
+        await asyncio.sleep(60)
+        return {}
+
+    for manager in (api, worker):
+        manager.register_handler("audio_render", handler)
+    job = await api.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+    await worker.start()
+    try:
+        await asyncio.wait_for(started.wait(), 1)
+        with api.events.subscribe("user-1", job.id) as subscription:
+            assert (await api.cancel_job("user-1", job.id)).status == "cancelled"
+            event = await subscription.get(timeout=1)
+        assert event is not None and (event.event, event.status) == ("status", "cancelled")
+        await asyncio.wait_for(cleaned.wait(), 1)
+        assert worker.stats()["running"] == 0
+    finally:
+        await worker.stop()
+        await api.stop()
+    stored = client._tables["processing_jobs"][job.id]
+    assert stored["status"] == "cancelled"
+    assert stored["leased_by"] is None
+
+
+def _provider_overloaded(job: JobCreate) -> Dict[str, Any]:
+    raise RetryableJobError("TTS provider overloaded", retry_after=0.01)
+
+
+def _rate_limited(attempt: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.com/v1/speech")
+    response = httpx.Response(429, headers={"Retry-After": "0"}, request=request)
+    return httpx.HTTPStatusError(f"rate limited (attempt {attempt})", request=request, response=response)
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_then_dead_lettered():
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_process_workers = 1
+    manager = JobManager(DummySupabaseClient(), settings)  # type: ignore[arg-type]
+    fast = JobRetryPolicy(max_attempts=3, backoff_seconds=0.01, max_backoff_seconds=0.05)
+    calls: Dict[str, int] = {}
+
+    async def flaky(job: JobCreate) -> Dict[str, Any]:
+        calls[job.job_type] = calls.get(job.job_type, 0) + 1
+        if job.job_type == "broken":
+            raise ValueError("bad script")
+        if job.job_type == "script_generation" and calls[job.job_type] >= 3:
+            return {"ok": True}
+        raise _rate_limited(calls[job.job_type])
+
+    for job_type in ("script_generation", "audio_render", "broken"):
+        manager.register_handler(job_type, flaky, retry=fast)
+    manager.register_handler("cover_art", _provider_overloaded, executor="process", retry=fast)
+    try:
+        recovered = await manager.enqueue_job("user-1", JobCreate(job_type="script_generation"))
+        exhausted = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+        broken = await manager.enqueue_job("user-1", JobCreate(job_type="broken"))
+        remote = await manager.enqueue_job("user-1", JobCreate(job_type="cover_art"))
+        final = {"succeeded", "failed", "dead_letter"}
+
+        job = await _wait_for_status(manager, recovered.id, final)
+        assert (job.status, job.attempts, job.error, job.result) == ("succeeded", 3, None, {"ok": True})
+        job = await _wait_for_status(manager, exhausted.id, final)
+        assert (job.status, job.attempts, job.error) == ("dead_letter", 3, "rate limited (attempt 3)")
+        job = await _wait_for_status(manager, broken.id, final)
+        assert (job.status, job.attempts, calls["broken"]) == ("failed", 1, 1)
+        # The handler's exception crosses the process boundary, so it is still seen as transient.
+        job = await _wait_for_status(manager, remote.id, final)
+        assert (job.status, job.attempts) == ("dead_letter", 3)
+        assert job.error == "RetryableJobError: TTS provider overloaded"
+    finally:
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_job_waiting_to_retry_drops_the_retry():
+    manager = JobManager(DummySupabaseClient())  # type: ignore[arg-type]
+    calls = 0
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        raise RetryableJobError("busy", retry_after=0.2)
+
+    manager.register_handler("audio_render", handler, retry=JobRetryPolicy(backoff_seconds=0.2, max_backoff_seconds=0.2))
+    job = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+    await asyncio.sleep(0.05)
+    waiting = await manager.get_job("user-1", job.id)
+    assert (waiting.status, waiting.error) == ("queued", "busy")
+    assert waiting.next_run_at is not None
+    assert manager.stats()["waiting_to_retry"] == 1
+
+    assert (await manager.cancel_job("user-1", job.id)).status == "cancelled"
+    await asyncio.sleep(0.3)
+    assert calls == 1
+    assert (await manager.get_job("user-1", job.id)).status == "cancelled"
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_durable_retries_wait_for_next_run_at():
+    client = LeasingSupabaseClient()
+    manager = JobManager(client, durable_settings())  # type: ignore[arg-type]
+    runs: List[float] = []
+
+    async def handler(job: JobCreate) -> Dict[str, Any]:
+        runs.append(time.monotonic())
+        if len(runs) == 1:
+            raise RetryableJobError("provider busy", retry_after=0.2)
+        return {"attempt": len(runs)}
 
-    jobs = await manager.list_jobs("user-1")
-    assert len(jobs) == 1
+    manager.register_handler("audio_render", handler, retry=JobRetryPolicy(backoff_seconds=0.01, max_backoff_seconds=1))
+    job = await manager.enqueue_job("user-1", JobCreate(job_type="audio_render"))
+    await manager.start()
+    try:
+        stored = await _wait_for_status(manager, job.id, {"succeeded", "failed", "dead_letter"}, timeout=5)
+    finally:
+        await manager.stop()
+    assert (stored.status, stored.attempts, stored.result) == ("succeeded", 2, {"attempt": 2})
+    assert runs[1] - runs[0] >= 0.2
+    assert client._tables["processing_jobs"][job.id]["leased_by"] is None
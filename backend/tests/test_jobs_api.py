@@ -0,0 +1,232 @@
+"""Tests for the job endpoints, including the SSE and WebSocket event streams."""
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Iterator, List
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI, HTTPException, status
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend.app.api.deps import get_auth_service, get_current_user, get_settings_dep
+from backend.app.api.v1.endpoints import jobs
+from backend.app.core.config import Settings
+from backend.app.schemas.auth import UserProfile, VerifyTokenResponse
+from backend.app.schemas.jobs import JobEvent
+from backend.app.services.jobs import JobManager
+
+from test_job_manager import DummySupabaseClient
+
+
+def _user(user_id: str) -> UserProfile:
+    return UserProfile(id=user_id, email=f"{user_id}@example.com", created_at=datetime(2024, 1, 1))
+
+
+class StubAuthService:
+    """Accepts ``token-<user id>`` as that user's access token."""
+
+    async def verify_access_token(self, token: str) -> VerifyTokenResponse:
+        if not token.startswith("token-"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+        return VerifyTokenResponse(user=_user(token.removeprefix("token-")))
+
+
+@pytest.fixture
+def settings() -> Settings:
+    settings = Settings()  # type: ignore[call-arg]
+    settings.job_events_keepalive_seconds = 0.05
+    return settings
+
+
+@pytest.fixture
+def store() -> DummySupabaseClient:
+    return DummySupabaseClient()
+
+
+@pytest.fixture
+def manager(store: DummySupabaseClient, settings: Settings) -> JobManager:
+    return JobManager(store, settings)  # type: ignore[arg-type]
+
+
+def _app(manager: JobManager, settings: Settings) -> FastAPI:
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.state.job_manager = manager
+    app.dependency_overrides[get_current_user] = lambda: _user("user-1")
+    app.dependency_overrides[get_auth_service] = StubAuthService
+    app.dependency_overrides[get_settings_dep] = lambda: settings
+    return app
+
+
+@pytest.fixture
+def api(manager: JobManager, settings: Settings) -> Iterator[TestClient]:
+    with TestClient(_app(manager, settings)) as client:
+        try:
+            yield client
+        finally:
+            client.portal.call(manager.stop)
+
+
+def test_enqueue_answers_429_with_retry_after_when_the_queue_is_full(
+    store: DummySupabaseClient, settings: Settings
+) -> None:
+    settings.job_max_concurrency = 1
+    settings.job_max_pending = 1
+    manager = JobManager(store, settings)  # type: ignore[arg-type]
+
+    async def hang(job: Any) -> dict:
+        await asyncio.sleep(3600)
+        return {}
+
+    manager.register_handler("script_generation", hang)
+    with TestClient(_app(manager, settings)) as client:
+        try:
+            # One job runs and one waits; a third would exceed job_max_pending.
+            for index in range(2):
+                accepted = client.post("/jobs", json={"job_type": "script_generation", "payload": {"n": index}})
+                assert accepted.status_code == status.HTTP_202_ACCEPTED
+            response = client.post("/jobs", json={"job_type": "script_generation", "payload": {"n": 2}})
+        finally:
+            client.portal.call(manager.stop)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json() == {"detail": "Job queue is full, retry later"}
+    assert int(response.headers["Retry-After"]) >= 1
+    assert len(store._tables["processing_jobs"]) == 2
+
+
+def _store_job(store: DummySupabaseClient, job_id: str, user_id: str, job_status: str) -> dict:
+    now = datetime.utcnow().isoformat()
+    row = {
+        "id": job_id,
+        "user_id": user_id,
+        "job_type": "script_generation",
+        "status": job_status,
+        "payload": {},
+        "created_at": now,
+        "updated_at": now,
+    }
+    store._tables.setdefault("processing_jobs", {})[job_id] = row
+    return row
+
+
+def _once_subscribed(api: TestClient, manager: JobManager, action: Callable[[], Any]) -> threading.Thread:
+    """Run ``action`` on the app's event loop once a stream has subscribed.
+
+    The test client blocks until a streamed response is complete, so whatever
+    makes the stream finish has to happen from another thread.
+    """
+
+    def run() -> None:
+        deadline = time.monotonic() + 5
+        while manager.events.stats()["subscribers"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        api.portal.call(action)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _sse_events(body: str) -> List[JobEvent]:
+    prefix = "data: "
+    return [JobEvent.model_validate_json(line[len(prefix):]) for line in body.splitlines() if line.startswith(prefix)]
+
+
+def test_event_stream_sends_the_snapshot_then_closes_after_the_terminal_event(
+    api: TestClient, manager: JobManager, store: DummySupabaseClient
+) -> None:
+    _store_job(store, "job-1", "user-1", "running")
+
+    def finish() -> None:
+        manager.events.publish("user-1", JobEvent(job_id="job-2", event="status", status="failed"))
+        manager.events.publish("user-1", JobEvent(job_id="job-1", event="progress", percent=50))
+        manager.events.publish("user-1", JobEvent(job_id="job-1", event="status", status="succeeded"))
+
+    publisher = _once_subscribed(api, manager, finish)
+    with api.stream("GET", "/jobs/job-1/events") as response:
+        body = response.read().decode()
+    publisher.join(5)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(body)
+    assert [(event.job_id, event.event, event.status) for event in events] == [
+        ("job-1", "status", "running"),
+        ("job-1", "progress", None),
+        ("job-1", "status", "succeeded"),
+    ]
+    assert manager.events.stats()["subscribers"] == 0
+
+
+def test_event_stream_of_a_finished_job_is_only_its_snapshot(
+    api: TestClient, manager: JobManager, store: DummySupabaseClient
+) -> None:
+    _store_job(store, "job-1", "user-1", "succeeded")
+
+    with api.stream("GET", "/jobs/job-1/events") as response:
+        body = response.read().decode()
+
+    assert [(event.event, event.status) for event in _sse_events(body)] == [("status", "succeeded")]
+    assert manager.events.stats()["subscribers"] == 0
+
+
+def test_event_stream_reads_the_table_for_jobs_finishing_on_another_worker(
+    api: TestClient, manager: JobManager, store: DummySupabaseClient
+) -> None:
+    row = _store_job(store, "job-1", "user-1", "running")
+
+    # No event reaches this process; the stream notices on its keep-alive poll.
+    updater = _once_subscribed(api, manager, lambda: row.update(status="failed", error="boom"))
+    with api.stream("GET", "/jobs/job-1/events") as response:
+        body = response.read().decode()
+    updater.join(5)
+
+    assert [(event.status, event.error) for event in _sse_events(body)] == [("running", None), ("failed", "boom")]
+    assert manager.events.stats()["subscribers"] == 0
+
+
+def test_event_stream_of_another_users_job_is_not_found(
+    api: TestClient, manager: JobManager, store: DummySupabaseClient
+) -> None:
+    _store_job(store, "job-1", "user-2", "running")
+
+    response = api.get("/jobs/job-1/events")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert manager.events.stats()["subscribers"] == 0
+
+
+def test_socket_pushes_only_the_callers_events_and_unsubscribes_on_disconnect(
+    api: TestClient, manager: JobManager
+) -> None:
+    with api.websocket_connect("/jobs/ws", headers={"Authorization": "Bearer token-user-1"}) as socket:
+        deadline = time.monotonic() + 5
+        while manager.events.stats()["subscribers"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        api.portal.call(
+            manager.events.publish, "user-2", JobEvent(job_id="job-2", event="status", status="running")
+        )
+        api.portal.call(
+            manager.events.publish, "user-1", JobEvent(job_id="job-1", event="status", status="running")
+        )
+
+        message = socket.receive_json()
+
+    assert (message["job_id"], message["status"]) == ("job-1", "running")
+    assert manager.events.stats()["subscribers"] == 0
+
+
+@pytest.mark.parametrize("path", ["/jobs/ws", "/jobs/ws?token=forged"])
+def test_socket_without_a_valid_token_is_refused(api: TestClient, manager: JobManager, path: str) -> None:
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with api.websocket_connect(path):
+            pass
+
+    assert exc.value.code == status.WS_1008_POLICY_VIOLATION
+    assert manager.events.stats()["subscribers"] == 0
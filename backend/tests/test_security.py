@@ -0,0 +1,133 @@
+"""Tests for local Supabase access token verification."""
+from __future__ import annotations
+
+import base64
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from backend.app.api.deps import require_metrics_token
+from backend.app.core.config import Settings
+from backend.app.core.security import InvalidTokenError, TokenRevocationStore, TokenVerifier
+
+
+@pytest.fixture()
+def settings() -> Settings:
+    return Settings(
+        supabase_url="https://example.supabase.co",
+        supabase_anon_key="anon-test",
+        supabase_service_role_key="service-test",
+        jwt_secret="secret",
+    )
+
+
+def make_token(secret: str = "secret", **overrides) -> str:
+    claims = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        "iat": int(time.time()),
+        "session_id": "session-1",
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+@pytest.fixture()
+def auth_client() -> MagicMock:
+    client = MagicMock()
+    client.get = AsyncMock()
+    return client
+
+
+@pytest.mark.anyio
+async def test_verify_returns_claims_for_valid_token(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+
+    claims = await verifier.verify(make_token(), auth_client)
+
+    assert claims is not None
+    assert claims["sub"] == "user-1"
+    auth_client.get.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_verify_rejects_expired_token(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(make_token(exp=int(time.time()) - 10), auth_client)
+
+
+@pytest.mark.anyio
+async def test_verify_rejects_wrong_audience(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(make_token(aud="service"), auth_client)
+
+
+@pytest.mark.anyio
+async def test_verify_is_inconclusive_for_unknown_signature(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+
+    assert await verifier.verify(make_token(secret="rotated"), auth_client) is None
+
+
+@pytest.mark.anyio
+async def test_revoked_session_is_rejected(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+    token = make_token()
+
+    await verifier.revoke(await verifier.verify(token, auth_client))
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(token, auth_client)
+
+
+@pytest.mark.anyio
+async def test_revocations_last_no_longer_than_the_token_lifetime(settings: Settings, auth_client: MagicMock) -> None:
+    store = TokenRevocationStore()
+    verifier = TokenVerifier(settings, store)
+    claims = await verifier.verify(make_token(exp=int(time.time()) + 10**9), auth_client)
+
+    await verifier.revoke(claims)
+
+    assert store._revoked["session-1"] <= time.time() + settings.jwt_access_token_lifetime_seconds
+
+
+@pytest.mark.anyio
+async def test_jwks_failure_is_inconclusive(settings: Settings, auth_client: MagicMock) -> None:
+    verifier = TokenVerifier(settings)
+    request = httpx.Request("GET", "https://example.supabase.co/auth/v1/.well-known/jwks.json")
+    auth_client.get.return_value = httpx.Response(503, request=request)
+    _, rest = make_token().split(".", 1)
+    # Re-label the header as RS256 with a key id so the JWKS path is exercised.
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": "key-1"}).encode()).rstrip(b"=")
+
+    result = await verifier.verify(header.decode() + "." + rest, auth_client)
+
+    assert result is None
+    auth_client.get.assert_awaited_once_with("/.well-known/jwks.json")
+
+
+@pytest.mark.anyio
+async def test_metrics_are_hidden_until_a_token_is_configured(settings: Settings) -> None:
+    with pytest.raises(HTTPException) as exc:
+        await require_metrics_token("Bearer anything", settings)
+    assert exc.value.status_code == 404
+
+    settings.metrics_token = "scrape-secret"
+    with pytest.raises(HTTPException) as exc:
+        await require_metrics_token("Bearer wrong", settings)
+    assert exc.value.status_code == 401
+    with pytest.raises(HTTPException) as exc:
+        await require_metrics_token(None, settings)
+    assert exc.value.status_code == 401
+    await require_metrics_token("Bearer scrape-secret", settings)
@@ -0,0 +1,162 @@
+"""Tests for Supabase Storage uploads and podcast audio metadata."""
+import base64
+import os
+import tempfile
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+pytest.importorskip("pydantic")
+
+from backend.app.core.config import Settings
+from backend.app.core.resilience import RetryPolicy
+from backend.app.schemas.podcasts import PodcastCreate
+from backend.app.services.podcast_service import PodcastService
+from backend.app.services.storage_service import RESUMABLE_CHUNK_BYTES, StorageService
+
+SETTINGS = Settings(
+    supabase_url="https://example.supabase.co",
+    supabase_anon_key="anon-test",
+    supabase_service_role_key="service-test",
+    jwt_secret="secret",
+)
+
+
+class FakeTusServer:
+    """Supabase Storage stand-in: single-request uploads and a TUS endpoint that fails once."""
+
+    def __init__(self, fail_patch_at: int = -1) -> None:
+        self.objects: Dict[str, bytes] = {}
+        self.metadata: Dict[str, str] = {}
+        self.patches: List[int] = []
+        self._fail_patch_at = fail_patch_at
+        self._received = bytearray()
+        self._length = 0
+        self.terminated = False
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST" and request.url.path.endswith("/upload/resumable"):
+            self._length = int(request.headers["Upload-Length"])
+            for item in request.headers["Upload-Metadata"].split(","):
+                key, value = item.split(" ")
+                self.metadata[key] = base64.b64decode(value).decode()
+            return httpx.Response(201, headers={"Location": "https://example.supabase.co/storage/v1/upload/resumable/u1"})
+        if request.method == "PATCH":
+            offset = int(request.headers["Upload-Offset"])
+            assert offset == len(self._received)
+            body = request.read()
+            assert len(body) <= RESUMABLE_CHUNK_BYTES
+            self.patches.append(offset)
+            if len(self.patches) == self._fail_patch_at:
+                # Half of the part arrived before the connection broke.
+                self._received.extend(body[: len(body) // 2])
+                return httpx.Response(503)
+            self._received.extend(body)
+            if len(self._received) == self._length:
+                self.objects[f"{self.metadata['bucketName']}/{self.metadata['objectName']}"] = bytes(self._received)
+            return httpx.Response(204, headers={"Upload-Offset": str(len(self._received))})
+        if request.method == "DELETE" and "/upload/resumable/" in request.url.path:
+            self.terminated = True
+            return httpx.Response(204)
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"Upload-Offset": str(len(self._received))})
+        if request.method == "POST" and "/object/" in request.url.path:
+            self.objects[request.url.path.split("/object/", 1)[1]] = request.read()
+            return httpx.Response(200)
+        return httpx.Response(404)
+
+
+class StorageClient:
+    def __init__(self, server: FakeTusServer) -> None:
+        self.storage = httpx.AsyncClient(
+            base_url="https://example.supabase.co/storage/v1", transport=httpx.MockTransport(server.handle)
+        )
+
+
+def _file(size: int) -> str:
+    fd, path = tempfile.mkstemp()
+    with os.fdopen(fd, "wb") as file:
+        file.write(os.urandom(size))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_large_files_upload_in_parts_and_resume_after_a_failed_part():
+    server = FakeTusServer(fail_patch_at=2)
+    storage = StorageService(StorageClient(server), SETTINGS)  # type: ignore[arg-type]
+    path = _file(2 * RESUMABLE_CHUNK_BYTES + 1234)
+
+    await storage.upload_resumable(
+        "podcast-audio",
+        "user-1/job.mp3",
+        path,
+        "audio/mpeg",
+        retry=RetryPolicy(max_retries=2, backoff_seconds=0.0, max_backoff_seconds=0.0),
+    )
+
+    with open(path, "rb") as file:
+        assert server.objects["podcast-audio/user-1/job.mp3"] == file.read()
+    assert server.metadata["contentType"] == "audio/mpeg"
+    half = RESUMABLE_CHUNK_BYTES // 2
+    # The second part is resent from the offset the server reported, not from its start.
+    assert server.patches == [0, RESUMABLE_CHUNK_BYTES, RESUMABLE_CHUNK_BYTES + half]
+    os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_failed_resumable_upload_is_terminated():
+    server = FakeTusServer(fail_patch_at=1)
+    storage = StorageService(StorageClient(server), SETTINGS)  # type: ignore[arg-type]
+    path = _file(RESUMABLE_CHUNK_BYTES + 10)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await storage.upload_resumable(
+            "podcast-audio",
+            "user-1/job.mp3",
+            path,
+            "audio/mpeg",
+            retry=RetryPolicy(max_retries=0, backoff_seconds=0.0, max_backoff_seconds=0.0),
+        )
+
+    assert server.terminated and server.objects == {}
+    os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_upload_file_sends_small_files_in_one_request():
+    server = FakeTusServer()
+    storage = StorageService(StorageClient(server), SETTINGS)  # type: ignore[arg-type]
+    path = _file(10_000)
+
+    await storage.upload_file("podcast-audio", "user-1/job.mp3", path, "audio/mpeg")
+
+    assert len(server.objects["podcast-audio/user-1/job.mp3"]) == 10_000
+    assert server.patches == []
+    os.remove(path)
+
+
+class RecordingRestClient:
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+
+    async def insert(self, table: str, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self.records.append(record)
+        return [{**record, "id": "p1", "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}]
+
+
+@pytest.mark.asyncio
+async def test_podcast_metadata_records_audio_format_and_bitrate():
+    client = RecordingRestClient()
+    service = PodcastService(client, StorageService(client, SETTINGS), SETTINGS)  # type: ignore[arg-type]
+
+    podcast = await service.create_podcast(
+        "user-1",
+        PodcastCreate(
+            script_id="s1", audio_storage_path="user-1/job.mp3", audio_bitrate_kbps=64, metadata={"title": "Ep 1"}
+        ),
+    )
+    await service.create_podcast("user-1", PodcastCreate(script_id="s1", audio_storage_path="user-1/old.WAV"))
+
+    assert podcast.metadata == {"title": "Ep 1", "audio_format": "mp3", "audio_bitrate_kbps": 64}
+    assert client.records[1]["metadata"] == {"audio_format": "wav"}
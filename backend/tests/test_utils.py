@@ -1,8 +1,66 @@
 """Utility function tests."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
 from backend.app.utils.id_generator import generate_job_id
+from backend.app.utils.metrics import LatencyHistogram
+from backend.app.utils.pagination import KEYSET_ORDER, decode_cursor, encode_cursor, next_cursor, page_query
 
 
 def test_generate_job_id_unique():
     job_ids = {generate_job_id() for _ in range(100)}
     assert len(job_ids) == 100
     assert all(job_id.startswith("job_") for job_id in job_ids)
+
+
+def test_page_query_uses_keyset_filter_for_cursor():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, "7c9e6679-7425-40de-944b-e07fc1f90ae7")
+
+    query = page_query({"user_id": "eq.u1"}, limit=20, offset=40, cursor=cursor)
+
+    assert query["order"] == KEYSET_ORDER
+    assert query["offset"] is None
+    assert query["filters"] == {
+        "user_id": "eq.u1",
+        "or": '(created_at.lt."2024-05-01T12:30:15.123456+00:00",'
+        'and(created_at.eq."2024-05-01T12:30:15.123456+00:00",id.lt."7c9e6679-7425-40de-944b-e07fc1f90ae7"))',
+    }
+    assert page_query({"user_id": "eq.u1"}, limit=20, offset=40)["offset"] == 40
+
+    with pytest.raises(HTTPException) as exc:
+        page_query({}, limit=20, cursor="not-a-cursor")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("row_id", ['x") ,id.gt.("', "row-9", "", "job_short"])
+def test_decode_cursor_rejects_malformed_row_ids(row_id):
+    cursor = encode_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), row_id)
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Invalid cursor"
+
+
+def test_next_cursor_only_for_full_pages():
+    created_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    items = [SimpleNamespace(id=f"job_{index:012d}", created_at=created_at) for index in range(3)]
+
+    assert next_cursor(items, limit=5) is None
+    assert decode_cursor(next_cursor(items, limit=3)) == (created_at.isoformat(), "job_000000000002")
+
+
+def test_latency_histogram_quantiles_stay_within_observed_range():
+    histogram = LatencyHistogram()
+    for value in [0.02] * 90 + [3.0] * 10:
+        histogram.observe(value)
+
+    stats = histogram.stats()
+    assert stats["count"] == 100
+    assert 0.01 <= stats["p50"] <= 0.025
+    assert 2.5 <= stats["p95"] <= 3.0
+    assert stats["max"] == 3.0